@@ -0,0 +1,105 @@
+"""
+Compares the throughput of serialising rows for `insert_data()`: the previous path through
+`to_dict("records")` with a null check per value, and the columnar `serialize()` generator.
+A recording connection takes the place of the database, so only the client side is timed.
+
+Usage: python benchmarks/graph_insert.py [--rows 1000000] [--batch-size 10000]
+"""
+import argparse
+import time
+from typing import Any, Hashable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from neo4j import Query, Record
+
+from nepal.graph.connection import Neo4jConnection
+
+
+class RecordingConnection(Neo4jConnection):
+    """Counts the rows sent to `query()` instead of running it against a database."""
+
+    def __init__(self) -> None:
+        self._db = None
+        self._writers = 1
+        self.rows: int = 0
+
+    def close(self) -> None:
+        pass
+
+    def query(
+        self, query: Union[str, Query], *, parameters: Optional[Mapping[Hashable, Any]] = None
+    ) -> Sequence[Record]:
+        self.rows += len(parameters["rows"]) if parameters is not None else 0
+        return []
+
+
+def as_serializable(df: pd.DataFrame) -> pd.DataFrame:
+    """Timestamps as strings, which the Neo4j driver can send."""
+    timestamps: Sequence[str] = [col for col in df.columns if df[col].dtype == "datetime64[ns]"]
+    for ts in timestamps:
+        df[ts] = df[ts].astype(str)
+
+    return df
+
+
+def drop_missing_values(rows: Sequence[Mapping[str, Any]]) -> Sequence[Mapping[str, Any]]:
+    return [{k: v for k, v in row.items() if not pd.isna(v)} for row in rows]
+
+
+def legacy_insert_data(
+    connection: Neo4jConnection, query: str, *, rows: pd.DataFrame, batch_size: int
+) -> None:
+    rows = as_serializable(rows)
+    for start, stop in connection.chunks(rows, size=batch_size):
+        payload: Sequence[Mapping[str, Any]] = rows[start:stop].to_dict("records")
+        connection.query(query, parameters={"rows": drop_missing_values(payload)})
+
+
+def frame(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    cases = rng.poisson(50, n_rows).astype(float)
+    cases[rng.random(n_rows) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "fips": [f"{i % 3000:05d}" for i in range(n_rows)],
+            "date": pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(n_rows) % 700, "D"),
+            "new_cases": cases,
+            "population": rng.integers(1_000, 1_000_000, n_rows),
+            "stringency": rng.uniform(0, 100, n_rows),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rows: pd.DataFrame = frame(args.rows)
+    query: str = "UNWIND $rows AS row RETURN count(row)"
+
+    timings: List[float] = []
+    for name in ("records", "columnar"):
+        connection = RecordingConnection()
+        start: float = time.perf_counter()
+        if name == "records":
+            legacy_insert_data(connection, query, rows=rows.copy(), batch_size=args.batch_size)
+        else:
+            connection.insert_data(
+                query, description="Rows", rows=rows, batch_size=args.batch_size
+            )
+        timings.append(time.perf_counter() - start)
+        assert connection.rows == args.rows
+
+        print(
+            f"{name:>8}: {timings[-1]:.2f}s, {args.rows / timings[-1]:,.0f} rows/s",
+            flush=True,
+        )
+
+    print(f" speedup: {timings[0] / timings[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares reading embeddings into a frame through a dict per record (as
+`CountyEmbedding.load_dataframe` used to) to the columnar `query_frame()`.
+
+The records are built in memory, so it times the client side only and needs no database.
+
+Usage: python benchmarks/graph_read.py [--nodes 100000] [--dimension 64]
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Hashable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from neo4j import Query, Record
+
+from nepal.graph.connection import Neo4jConnection
+
+
+class InMemoryConnection(Neo4jConnection):
+    """Streams prepared records instead of running the query against a database."""
+
+    def __init__(self, records: List[Record]) -> None:
+        self._db = None
+        self._writers = 1
+        self.records: List[Record] = records
+
+    def close(self) -> None:
+        pass
+
+    def query_iter(
+        self,
+        query: Union[str, Query],
+        *,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Record]:
+        return iter(self.records)
+
+
+def embeddings(n_nodes: int, dimension: int) -> List[Record]:
+    rng = np.random.default_rng(42)
+    values: List[List[float]] = rng.normal(size=(n_nodes, dimension)).tolist()
+    return [Record(zip(["nodeId", "embedding"], row)) for row in enumerate(values)]
+
+
+def legacy_frame(records: List[Record], dimension: int) -> pd.DataFrame:
+    result: pd.DataFrame = pd.DataFrame([dict(row) for row in records]).set_index("nodeId")
+    return pd.DataFrame(
+        result["embedding"].to_list(),
+        index=result.index,
+        columns=[f"emb_{_}" for _ in range(dimension)],
+    )
+
+
+def measured(action: Callable[[], pd.DataFrame]) -> Tuple[float, float, pd.DataFrame]:
+    """Seconds and peak MB allocated (beyond the records) while running the action."""
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    frame: pd.DataFrame = action()
+    seconds: float = time.perf_counter() - start
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1e6, frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=64)
+    args = parser.parse_args()
+
+    records: List[Record] = embeddings(args.nodes, args.dimension)
+    connection = InMemoryConnection(records)
+
+    results = {
+        "dict per record": measured(lambda: legacy_frame(records, args.dimension)),
+        "query_frame": measured(lambda: connection.query_frame("RETURN 1").set_index("nodeId")),
+    }
+    for name, (seconds, peak, frame) in results.items():
+        print(f"{name:>16}: {seconds:.2f}s, peak {peak:,.0f} MB, frame {frame.shape}")
+
+    legacy, columnar = results["dict per record"][2], results["query_frame"][2]
+    assert np.allclose(legacy.to_numpy(), columnar.to_numpy(), atol=1e-6)
+
+
+if __name__ == "__main__":
+    main()
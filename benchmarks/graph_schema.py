@@ -0,0 +1,181 @@
+"""
+Compares the node schema of the daily vaccinations (a node per county and day, with two
+relationships) to the series schema (date-ordered lists on the county nodes).
+
+Without a database, it counts the records either schema stores, estimates their size with
+the record sizes of the Neo4j 4.x store and times the client side of the load.
+With `--password`, it loads both schemas into `--database` (which is wiped first!)
+and times the load, reading the data back and the resulting store.
+
+Usage: python benchmarks/graph_schema.py [--counties 3000] [--days 700]
+       [--password secret --database benchmark]
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Sequence, Union
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from neo4j import Query, Record
+
+from nepal.datasets import NYTimes, Vaccinations
+from nepal.graph.connection import LocalConnection, Neo4jConnection
+from nepal.graph.model import County, CountyVaccinations, CountyVaccinationSeries, Date, Steps
+
+# bytes per record of the Neo4j 4.x record format, array properties take 128 byte blocks
+NODE, RELATIONSHIP, PROPERTY, ARRAY_BLOCK = 15, 34, 41, 128
+
+
+class RecordingConnection(Neo4jConnection):
+    """Counts the rows sent to `query()` instead of running it against a database."""
+
+    def __init__(self) -> None:
+        self._db = None
+        self._writers = 1
+        self.rows: int = 0
+
+    def close(self) -> None:
+        pass
+
+    def query(
+        self, query: Union[str, Query], *, parameters: Optional[Mapping[Hashable, Any]] = None
+    ) -> Sequence[Record]:
+        self.rows += len(parameters["rows"]) if parameters is not None else 0
+        return []
+
+
+def vaccinations(n_counties: int, n_days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    index = pd.MultiIndex.from_product(
+        [
+            [f"{i:05d}" for i in range(n_counties)],
+            pd.date_range("2021-01-01", periods=n_days, freq="D"),
+        ],
+        names=["FIPS", "Date"],
+    )
+    data = pd.DataFrame(index=index).reset_index()
+    data["FIPS"] = data["FIPS"].astype("string")
+    data["Recip_State"] = pd.array(["AL"] * len(data), dtype="string")
+    data["Metro_status"] = "Metro"
+    data["SVI_CTGY"] = "A"
+    for column in [
+        "Census2019",
+        "Census2019_5PlusPop",
+        "Census2019_5to17Pop",
+        "Census2019_18PlusPop",
+        "Census2019_65PlusPop",
+        *CountyVaccinationSeries.metrics.values(),
+    ]:
+        data[column] = rng.uniform(0, 100, len(data))
+    return data
+
+
+def estimate(data: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Records and bytes of the daily data in either schema."""
+    rows, metrics = len(data), len(CountyVaccinationSeries.metrics)
+    counties: int = data["FIPS"].nunique()
+    days: float = rows / counties
+
+    # a property record holds up to 4 values, the id string is stored inline when short
+    nodes: Dict[str, float] = {
+        "nodes": rows,
+        "relationships": 2 * rows,
+        "properties": rows * (metrics + 1),
+        "MB": (
+            rows * NODE + 2 * rows * RELATIONSHIP + rows * np.ceil((metrics + 1) / 4) * PROPERTY
+        )
+        / 1e6,
+    }
+    # every list is a property on the county node plus its blocks in the array store
+    blocks: float = np.ceil(days * 8 / ARRAY_BLOCK)
+    series: Dict[str, float] = {
+        "nodes": 0,
+        "relationships": 0,
+        "properties": counties * (metrics + 1),
+        "MB": counties * (metrics + 1) * (PROPERTY / 4 + blocks * ARRAY_BLOCK) / 1e6,
+    }
+    return {"nodes": nodes, "series": series}
+
+
+def timed(action: Callable[[], Any]) -> float:
+    start: float = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def offline(data: pd.DataFrame) -> None:
+    for schema, numbers in estimate(data).items():
+        print(
+            f"{schema:>7}: "
+            + ", ".join(f"{key} {value:,.1f}" for key, value in numbers.items())
+        )
+
+    with mock.patch.object(Vaccinations, "load", lambda self: data.copy()):
+        for step in (
+            CountyVaccinations(Vaccinations()),
+            CountyVaccinationSeries(Vaccinations()),
+        ):
+            connection = RecordingConnection()
+            seconds: float = timed(lambda: step.merge(connection))
+            print(
+                f"{type(step).__name__:>23}: {seconds:.2f}s client side, "
+                f"{connection.rows:,} rows sent"
+            )
+
+
+def online(data: pd.DataFrame, *, database: str, password: str) -> None:
+    connection = LocalConnection(database=database, password=password)
+    days = pd.DataFrame({"date": data["Date"].drop_duplicates()})
+
+    def count() -> str:
+        nodes = connection.query("MATCH (n) RETURN count(n) AS n")[0]["n"]
+        relationships = connection.query("MATCH ()-[r]->() RETURN count(r) AS n")[0]["n"]
+        return f"{nodes:,} nodes, {relationships:,} relationships"
+
+    readers: Dict[str, Callable[[], Any]] = {
+        "CountyVaccinations": lambda: connection.query(
+            f"""
+            MATCH (c:County)<-[:IN_COUNTY]-(v:Vaccinations)-[:REPORTED_ON]->(d:Date)
+            RETURN c.fips, d.id, {", ".join(f"v.{prop}" for prop in CountyVaccinationSeries.metrics)}
+            """
+        ),
+        "CountyVaccinationSeries": lambda: CountyVaccinationSeries.read(connection),
+    }
+
+    with mock.patch.object(Vaccinations, "load", lambda self: data.copy()), mock.patch.object(
+        NYTimes, "load", lambda self: days.copy()
+    ):
+        for step in (
+            CountyVaccinations(Vaccinations()),
+            CountyVaccinationSeries(Vaccinations()),
+        ):
+            name: str = type(step).__name__
+            connection.query("MATCH (n) DETACH DELETE n")
+            Steps(County(Vaccinations()), Date(NYTimes())).merge_all(connection)
+            before: str = count()
+
+            load: float = timed(lambda: step.merge(connection))
+            read: float = timed(readers[name])
+            print(f"{name:>23}: loaded in {load:.1f}s, read in {read:.1f}s")
+            print(f"{'':>23}  {before} -> {count()}")
+
+    connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counties", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=700)
+    parser.add_argument("--database", default="benchmark")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    data: pd.DataFrame = vaccinations(args.counties, args.days)
+    offline(data)
+    if args.password is not None:
+        online(data, database=args.database, password=args.password)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compares the pickled LGBMForecaster with the exported artefact for serving:
+cold start (fresh interpreter: imports + deserialisation) and per-call predict overhead.
+
+Usage: python benchmarks/serving.py [--compiled]
+"""
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Tuple
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.serving import ExportedForecaster, export
+from nepal.ml.transformers import RollingWindowSum, log_transformer
+
+COLD_PICKLE = """
+import joblib, sys
+joblib.load(sys.argv[1])
+"""
+
+COLD_EXPORT = """
+import sys
+from pathlib import Path
+from nepal.ml.serving import ExportedForecaster
+ExportedForecaster.from_export(Path(sys.argv[1]), backend=sys.argv[2])
+"""
+
+
+def panel(n_entities: int = 51, n_days: int = 400) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(42)
+    index = pd.MultiIndex.from_product(
+        [[f"S{i:02d}" for i in range(n_entities)], pd.date_range("2021-01-01", periods=n_days)],
+        names=["state", "date"],
+    )
+    y = pd.DataFrame({"new_cases": np.log1p(rng.gamma(2, 50, len(index)))}, index=index)
+    X = pd.DataFrame({"StringencyIndex": rng.uniform(0, 100, len(index))}, index=index)
+    return y, X
+
+
+def cold_start(script: str, *args: str, repeat: int = 5) -> float:
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", script, *args], check=True)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main(compiled: bool) -> None:
+    y, X = panel()
+    transformers = Pipeline(
+        [
+            (
+                "infections",
+                RollingWindowSum(
+                    "new_cases", target="infections", window=10, transformer=log_transformer
+                ),
+            )
+        ]
+    )
+    forecaster = LGBMForecaster(lgb.LGBMRegressor(verbose=-1), lag=5, transformers=transformers)
+    forecaster.fit(y, Xs=[X])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickled, folder = Path(tmp) / "forecaster.joblib", Path(tmp) / "forecaster"
+        joblib.dump(forecaster, pickled)
+        export(forecaster, folder, compile=compiled)
+
+        backends = ["booster", "compiled"] if compiled else ["booster"]
+        print(f"cold start  pickle            {cold_start(COLD_PICKLE, str(pickled)):.3f}s")
+        for backend in backends:
+            seconds = cold_start(COLD_EXPORT, str(folder), backend)
+            print(f"cold start  export/{backend:<10} {seconds:.3f}s")
+
+        X_t = np.random.default_rng(0).random(
+            (len(y.index.levels[0]), len(forecaster.booster.feature_name()))
+        )
+        frame = pd.DataFrame(X_t, columns=forecaster.booster.feature_name())
+        candidates = {
+            "pickle": forecaster,
+            **{b: ExportedForecaster.from_export(folder, backend=b) for b in backends},
+        }
+        for name, model in candidates.items():
+            seconds = (
+                min(timeit.repeat(lambda: model._predict(frame), number=200, repeat=5)) / 200
+            )
+            print(f"predict     {name:<17} {seconds * 1e6:.0f}us / call")
+
+        fh = ForecastingHorizon(list(range(1, 15)))
+        for name, model in candidates.items():
+            seconds = min(
+                timeit.repeat(lambda: model.forecast(fh=fh, y=y, Xs=[X]), number=1, repeat=3)
+            )
+            print(f"forecast    {name:<17} {seconds:.3f}s / 14 days")
+
+
+if __name__ == "__main__":
+    main(compiled="--compiled" in sys.argv)
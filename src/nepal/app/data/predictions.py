@@ -1,4 +1,5 @@
 from functools import lru_cache
+from pathlib import Path
 from typing import cast
 
 import joblib
@@ -7,23 +8,30 @@ from sklearn.pipeline import Pipeline
 from sktime.forecasting.base import ForecastingHorizon
 
 from nepal.datasets import Dataset
-from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.features.tensor import ExogenousTensor
+from nepal.ml.forecaster import Forecaster, LGBMForecaster
+from nepal.ml.serving import MANIFEST, ExportedForecaster
 from nepal.ml.transformers import LogScaler, RollingWindowSum
 
 
 class Predictions:
     def __init__(self) -> None:
-        self._model: LGBMForecaster = self._deserialize_model()
+        self._model: Forecaster = self._deserialize_model()
         self._fh: ForecastingHorizon = ForecastingHorizon(list(range(1, 15)))
 
     @classmethod
-    def _deserialize_model(cls) -> LGBMForecaster:
+    def _deserialize_model(cls) -> Forecaster:
+        exported: Path = Dataset.ROOT_DIR / "reduced" / "forecaster"
+        if (exported / MANIFEST).is_file():
+            return ExportedForecaster.from_export(exported)
+
         return cast(
             LGBMForecaster, joblib.load(Dataset.ROOT_DIR / "reduced" / "forecaster.joblib")
         )
 
     def load(self, endogenous: pd.DataFrame, exogenous: pd.DataFrame) -> pd.DataFrame:
-        forecast: pd.DataFrame = self._model.forecast(fh=self._fh, y=endogenous, Xs=[exogenous])
+        aligned: ExogenousTensor = ExogenousTensor.from_frame(exogenous)
+        forecast: pd.DataFrame = self._model.forecast(fh=self._fh, y=endogenous, Xs=[aligned])
         return (
             pd.concat([endogenous, forecast])
             .pipe(self._scale_output)
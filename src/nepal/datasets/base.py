@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Final
+from typing import Dict, Final, Type
 
 import pandas as pd
 from requests import Response
@@ -12,6 +13,10 @@ from nepal import PROJECT_ROOT
 
 from .util import progressbar
 
+# datasets are loaded concurrently, e.g. by graph steps, but each is only collected once
+_collecting: Dict[Type[Dataset], threading.Lock] = {}
+_guard: threading.Lock = threading.Lock()
+
 
 class Dataset(ABC):
     """Base class to represent datasets."""
@@ -34,9 +39,13 @@ class Dataset(ABC):
         raise NotImplementedError
 
     def load(self) -> pd.DataFrame:
-        if not self.collected():
-            logging.warning("Dataset not collected yet. Collecting...")
-            self.collect(True)
+        with _guard:
+            lock: threading.Lock = _collecting.setdefault(type(self), threading.Lock())
+
+        with lock:
+            if not self.collected():
+                logging.warning("Dataset not collected yet. Collecting...")
+                self.collect(True)
         return self._load_dataframe()
 
     @abstractmethod
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+class ImportFile(NamedTuple):
+    """
+    Nodes or relationships for `neo4j-admin import`, the columns of the frame are named
+    by the header of the tool, e.g. `fips:ID(County)`, `census:double` or `:END_ID(State)`.
+    """
+
+    kind: str
+    name: str
+    frame: pd.DataFrame
+
+    def write(self, folder: Path) -> Tuple[Path, Path]:
+        """Writes the header and the data into separate files, named after the file."""
+        header: Path = folder / f"{self.name}.header.csv"
+        data: Path = folder / f"{self.name}.csv"
+
+        header.write_text(",".join(self.frame.columns) + "\n")
+        self.frame.to_csv(data, header=False, index=False)
+        return header, data
+
+
+class BulkImport:
+    """The files of a graph, written by `Steps.export_all()` for an offline import."""
+
+    def __init__(self, folder: Path) -> None:
+        self._folder: Path = folder
+        self._files: Dict[str, List[Tuple[Path, Path]]] = {"nodes": [], "relationships": []}
+
+    @property
+    def folder(self) -> Path:
+        return self._folder
+
+    def add(self, file: ImportFile) -> Tuple[Path, Path]:
+        paths: Tuple[Path, Path] = file.write(self._folder)
+        self._files[file.kind].append(paths)
+        return paths
+
+    def command(self, database: str = "neo4j") -> Sequence[str]:
+        """
+        Arguments of `neo4j-admin import` (Neo4j 4.x) into an empty, stopped database.
+        Relationships to nodes which do not exist are skipped, as `MATCH` would skip them.
+        """
+        return [
+            "neo4j-admin",
+            "import",
+            f"--database={database}",
+            *(
+                f"--{kind}={header},{data}"
+                for kind, files in self._files.items()
+                for header, data in sorted(files)
+            ),
+            "--skip-bad-relationships=true",
+            "--skip-duplicate-nodes=true",
+        ]
+
+
+def nodes(
+    label: str,
+    data: pd.DataFrame,
+    *,
+    key: Tuple[str, str],
+    key_type: Optional[str] = None,
+    properties: Optional[Mapping[str, str]] = None,
+    name: Optional[str] = None,
+) -> ImportFile:
+    """
+    Nodes from the rows of `data`, identified by the `(property, column)` pair `key` and
+    with properties from its columns (`properties` maps property names to columns).
+    The key is stored as a string, unless it has another `key_type` such as `date`.
+    Like `MERGE ... SET`, the last row of every key wins.
+    """
+    properties = properties or {}
+    rows: pd.DataFrame = data.dropna(subset=[key[1]]).drop_duplicates(
+        subset=[key[1]], keep="last"
+    )
+
+    ids: Dict[str, pd.Series] = (
+        {f"{key[0]}:ID({label})": _strings(rows[key[1]])}
+        if key_type is None
+        else {
+            f":ID({label})": _strings(rows[key[1]]),
+            f"{key[0]}:{key_type}": _strings(rows[key[1]]),
+        }
+    )
+    frame: pd.DataFrame = pd.DataFrame(
+        {
+            **ids,
+            **{
+                f"{prop}:{_type(rows[column])}": _values(rows[column])
+                for prop, column in properties.items()
+            },
+        }
+    )
+    frame[":LABEL"] = label
+    return ImportFile(kind="nodes", name=name or label, frame=frame)
+
+
+def relationships(
+    type: str,
+    data: pd.DataFrame,
+    *,
+    start: Tuple[str, str],
+    end: Tuple[str, str],
+    properties: Optional[Mapping[str, str]] = None,
+    name: Optional[str] = None,
+) -> ImportFile:
+    """
+    Relationships from the rows of `data`, between the nodes of the `(label, column)`
+    pairs `start` and `end`. Identical rows are only imported once, as with `MERGE`.
+    """
+    properties = properties or {}
+    rows: pd.DataFrame = data.dropna(subset=[start[1], end[1]])
+
+    frame: pd.DataFrame = pd.DataFrame(
+        {
+            f":START_ID({start[0]})": _strings(rows[start[1]]),
+            f":END_ID({end[0]})": _strings(rows[end[1]]),
+            **{
+                f"{prop}:{_type(rows[column])}": _values(rows[column])
+                for prop, column in properties.items()
+            },
+        }
+    ).drop_duplicates()
+    frame[":TYPE"] = type
+    return ImportFile(kind="relationships", name=name or type, frame=frame)
+
+
+def _strings(column: pd.Series) -> pd.Series:
+    # dates are sent as strings to Neo4j, see `serialize()`, so they are written the same way
+    if column.dtype == "datetime64[ns]":
+        return column.astype(str)
+    return column.astype("string")
+
+
+def _values(column: pd.Series) -> pd.Series:
+    return _strings(column) if column.dtype == "datetime64[ns]" else column
+
+
+def _type(column: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(column.dtype):
+        return "boolean"
+    elif pd.api.types.is_integer_dtype(column.dtype):
+        return "long"
+    elif pd.api.types.is_float_dtype(column.dtype):
+        return "double"
+    return "string"
+
+
+__all__ = ["BulkImport", "ImportFile", "nodes", "relationships"]
@@ -1,36 +1,60 @@
 from __future__ import annotations
 
 import itertools
+import threading
+import time
 import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from types import TracebackType
 from typing import (
     Any,
+    Dict,
     Hashable,
     Iterable,
     Iterator,
+    List,
     Mapping,
     Optional,
     Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
     Union,
 )
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
-from neo4j import GraphDatabase, Neo4jDriver, Query, Record, Result, Session, basic_auth
+from neo4j import (
+    GraphDatabase,
+    Neo4jDriver,
+    Query,
+    Record,
+    Result,
+    Session,
+    Transaction,
+    basic_auth,
+)
+from neo4j.work.summary import ResultSummary
 from tqdm.auto import tqdm
 
+from .instrumentation import QueryLog, current_step, profiled
+
 T = TypeVar("T")
 
 
 class Neo4jConnection:
-    def __init__(self, *, uri: str, user: str, pwd: str, db: Optional[str] = None) -> None:
+    def __init__(
+        self, *, uri: str, user: str, pwd: str, db: Optional[str] = None, writers: int = 1
+    ) -> None:
         self.__driver: Neo4jDriver = GraphDatabase.driver(
             uri, auth=basic_auth(user=user, password=pwd)
         )
 
         self._db: Optional[str] = db
+        self._writers: int = writers
+        self._log: Optional[QueryLog] = None
 
     @property
     def db(self) -> Optional[str]:
@@ -40,6 +64,28 @@ class Neo4jConnection:
     def db(self, db: Optional[str]) -> None:
         self._db = db
 
+    @property
+    def writers(self) -> int:
+        """Number of sessions which `insert_data()` writes through concurrently."""
+        return self._writers
+
+    @property
+    def log(self) -> Optional[QueryLog]:
+        """The log which records every query, once the connection is instrumented."""
+        return self._log
+
+    def instrument(self, log: Optional[QueryLog] = None) -> QueryLog:
+        """
+        Records the wall time, server timings, update counters and the rows and bytes sent
+        of every query from now on into `log` (a new one by default), see `QueryLog`.
+        """
+        self._log = log if log is not None else QueryLog()
+        return self._log
+
+    def uninstrument(self) -> Optional[QueryLog]:
+        log, self._log = self._log, None
+        return log
+
     def __enter__(self) -> Neo4jConnection:
         return self
 
@@ -55,11 +101,13 @@ class Neo4jConnection:
     def close(self) -> None:
         self.__driver.close()
 
-    def session(self) -> Session:
+    def session(self, *, fetch_size: Optional[int] = None) -> Session:
+        """A session on the database, `fetch_size` records are pulled from results at once."""
+        config: Dict[str, Any] = {} if fetch_size is None else {"fetch_size": fetch_size}
         return (
-            self.__driver.session(database=self.db)
+            self.__driver.session(database=self.db, **config)
             if self.db is not None
-            else self.__driver.session()
+            else self.__driver.session(**config)
         )
 
     def is_up(self) -> bool:
@@ -74,9 +122,80 @@ class Neo4jConnection:
     def query(
         self, query: Union[str, Query], *, parameters: Optional[Mapping[Hashable, Any]] = None
     ) -> Sequence[Record]:
+        log: Optional[QueryLog] = self._log
+        if log is None:
+            with self.session() as session:
+                response: Result = session.run(query, parameters=parameters)
+                return list(response)
+
+        text: str = query.text if isinstance(query, Query) else query
+        start: float = time.perf_counter()
         with self.session() as session:
-            response: Result = session.run(query, parameters=parameters)
-            return list(response)
+            response = session.run(
+                profiled(query) if log.profiles(text) else query, parameters=parameters
+            )
+            records: List[Record] = list(response)
+            summary: ResultSummary = response.consume()
+        log.record(text, summary, start=start, end=time.perf_counter(), parameters=parameters)
+        return records
+
+    def query_iter(
+        self,
+        query: Union[str, Query],
+        *,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Record]:
+        """
+        Yields the records as the server streams them, `fetch_size` at a time, instead of
+        holding the whole result. The session stays open until the iterator is exhausted
+        or closed.
+        """
+        log: Optional[QueryLog] = self._log
+        text: str = query.text if isinstance(query, Query) else query
+        profile: bool = log is not None and log.profiles(text)
+        start: float = time.perf_counter()
+
+        with self.session(fetch_size=fetch_size) as session:
+            response: Result = session.run(
+                profiled(query) if profile else query, parameters=parameters
+            )
+            yield from response
+            if log is not None:
+                log.record(
+                    text,
+                    response.consume(),
+                    start=start,
+                    end=time.perf_counter(),
+                    parameters=parameters,
+                )
+
+    def query_frame(
+        self,
+        query: Union[str, Query],
+        *,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        fetch_size: int = 1000,
+    ) -> pd.DataFrame:
+        """
+        Reads the result into a frame column by column, one chunk of `fetch_size` records
+        at a time, without building a dict per record. Columns of lists of numbers (such
+        as embeddings) become float32 blocks named `{column}_{i}`, see `columns()`.
+        """
+        return as_frame(self.query_arrays(query, parameters=parameters, fetch_size=fetch_size))
+
+    def query_arrays(
+        self,
+        query: Union[str, Query],
+        *,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        fetch_size: int = 1000,
+    ) -> Dict[str, npt.NDArray[Any]]:
+        """Like `query_frame()`, but an array per column, lists as 2-D float32 arrays."""
+        return columns(
+            self.query_iter(query, parameters=parameters, fetch_size=fetch_size),
+            chunk_size=fetch_size,
+        )
 
     def insert_data(
         self,
@@ -85,17 +204,96 @@ class Neo4jConnection:
         description: str,
         rows: pd.DataFrame,
         batch_size: int = 10000,
+        writers: Optional[int] = None,
     ) -> None:
-        """Function to handle the updating the Neo4j database in batch mode."""
-        rows = as_serializable(rows)
+        """
+        Function to handle the updating the Neo4j database in batch mode.
+
+        With more than one writer, the batches are committed concurrently in managed write
+        transactions, which the driver retries on transient errors such as deadlocks.
+        Either way, it only returns once every batch is committed, so that the next step
+        can match the nodes of this one.
+        """
+        batches: Iterator[List[Dict[str, Any]]] = serialize(rows, batch_size=batch_size)
+        progress_bar: tqdm = tqdm(total=len(self.chunks(rows, batch_size)), desc=description)
+
+        with progress_bar:
+            if (writers or self.writers) > 1:
+                for _ in self.write_concurrently(
+                    query, batches, writers=writers or self.writers
+                ):
+                    progress_bar.update()
+            else:
+                for payload in batches:
+                    self.query(query, parameters={"rows": payload})
+                    progress_bar.update()
+
+    def write_concurrently(
+        self,
+        query: Union[str, Query],
+        batches: Iterable[Sequence[Mapping[str, Any]]],
+        *,
+        writers: int,
+        in_flight: Optional[int] = None,
+    ) -> Iterator[int]:
+        """
+        Writes the batches through a pool of `writers` sessions, one per thread, and yields
+        the size of every committed batch. At most `in_flight` batches (twice the writers by
+        default) are serialised ahead of the database. The first failure cancels the
+        batches which have not started and is raised once the running ones are done.
+        """
+        text: str = query.text if isinstance(query, Query) else query
+        limit: int = in_flight or 2 * writers
+        # the batches run on other threads, they belong to the step of the caller
+        log: Optional[QueryLog] = self._log
+        step: Optional[str] = current_step()
+        run: str = profiled(text) if log is not None and log.profiles(text) else text
 
-        for start, stop in tqdm(self.chunks(rows, size=batch_size), desc=description):
-            payload: Sequence[Mapping[str, Any]] = rows[start:stop].to_dict("records")
+        local: threading.local = threading.local()
+        sessions: List[Session] = []
+        lock: threading.Lock = threading.Lock()
 
-            self.query(
-                query,
-                parameters={"rows": drop_missing_values(payload)},
+        def write(payload: Sequence[Mapping[str, Any]]) -> int:
+            if not hasattr(local, "session"):
+                local.session = self.session()
+                with lock:
+                    sessions.append(local.session)
+
+            start: float = time.perf_counter()
+            summary: Optional[ResultSummary] = local.session.write_transaction(
+                _run_batch, run, payload
             )
+            if log is not None:
+                log.record(
+                    text,
+                    summary,
+                    start=start,
+                    end=time.perf_counter(),
+                    parameters={"rows": payload},
+                    step=step,
+                )
+            return len(payload)
+
+        pending: Set[Future[int]] = set()
+        try:
+            with ThreadPoolExecutor(max_workers=writers) as executor:
+                try:
+                    for payload in batches:
+                        if len(pending) >= limit:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            yield from (future.result() for future in done)
+                        pending.add(executor.submit(write, payload))
+
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from (future.result() for future in done)
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            for session in sessions:
+                session.close()
 
     @classmethod
     def chunks(cls, df: pd.DataFrame, size: int) -> Sequence[Tuple[int, int]]:
@@ -103,24 +301,155 @@ class Neo4jConnection:
 
 
 class LocalConnection(Neo4jConnection):
-    def __init__(self, *, database: str, password: str):
-        super().__init__(uri="bolt://localhost:7687", user="neo4j", pwd=password, db=database)
+    def __init__(self, *, database: str, password: str, writers: int = 1):
+        super().__init__(
+            uri="bolt://localhost:7687",
+            user="neo4j",
+            pwd=password,
+            db=database,
+            writers=writers,
+        )
+
+
+def _run_batch(tx: Transaction, query: str, rows: Sequence[Mapping[str, Any]]) -> ResultSummary:
+    summary: ResultSummary = tx.run(query, parameters={"rows": rows}).consume()
+    return summary
+
+
+def serialize(rows: pd.DataFrame, *, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily converts the rows into batches of maps, column by column. Every batch is sliced
+    from the NumPy arrays of the frame and turned into native Python values with `tolist()`.
+    Missing values are left out of the maps by their masks, as Neo4j does not store nulls.
+    """
+    names: List[str] = [str(name) for name in rows.columns]
+    arrays: List[npt.NDArray[Any]] = []
+    masks: List[npt.NDArray[np.bool_]] = []
+
+    for name in rows.columns:
+        column: pd.Series = rows[name]
+        masks.append(column.isna().to_numpy())
+
+        # timestamps cannot be processed by the Neo4J connector, strings can
+        if column.dtype == "datetime64[ns]":
+            arrays.append(date_strings(column))
+        elif pd.api.types.is_extension_array_dtype(column.dtype):
+            arrays.append(column.to_numpy(dtype=object, na_value=None))
+        else:
+            arrays.append(column.to_numpy())
+
+    for start, stop in pairwise(inclusive_range(0, len(rows), batch_size)):
+        partial: List[int] = [i for i, mask in enumerate(masks) if mask[start:stop].any()]
+        complete: List[int] = [i for i in range(len(names)) if i not in partial]
+
+        keys: List[str] = [names[i] for i in complete]
+        batch: List[Dict[str, Any]] = (
+            [
+                dict(zip(keys, values))
+                for values in zip(*(arrays[i][start:stop].tolist() for i in complete))
+            ]
+            if complete
+            else [{} for _ in range(start, stop)]
+        )
 
+        for i in partial:
+            values: List[Any] = arrays[i][start:stop].tolist()
+            for row in np.flatnonzero(~masks[i][start:stop]).tolist():
+                batch[row][names[i]] = values[row]
 
-def as_serializable(df: pd.DataFrame) -> pd.DataFrame:
+        yield batch
+
+
+def date_strings(column: pd.Series) -> npt.NDArray[Any]:
+    """
+    Formats timestamps as `astype(str)` does, but dates without a time of day are formatted
+    by NumPy in one go rather than one by one.
+    """
+    values: npt.NDArray[np.datetime64] = column.to_numpy()
+    days: npt.NDArray[np.datetime64] = values.astype("datetime64[D]")
+    if not (days == values)[column.notna().to_numpy()].all():
+        strings: npt.NDArray[Any] = column.astype(str).to_numpy()
+        return strings
+
+    return days.astype(str)
+
+
+def columns(
+    records: Iterable[Record], *, chunk_size: int = 1000
+) -> Dict[str, npt.NDArray[Any]]:
     """
-    Timestamp values ('datetime64') cannot be processed by the Neo4J connector,
-    hence we need to convert them to strings.
+    The values of every field of the records as an array, lists of numbers as a 2-D
+    float32 array with a row per record (missing lists are NaN rows). The records are
+    transposed in chunks, so only `chunk_size` of them are held at a time.
     """
-    timestamps: Sequence[str] = [col for col in df.columns if df[col].dtype == "datetime64[ns]"]
-    for ts in timestamps:
-        df[ts] = df[ts].astype(str)
+    iterator: Iterator[Record] = iter(records)
+    keys: List[str] = []
+    chunks: Dict[str, List[npt.NDArray[Any]]] = {}
+
+    while True:
+        chunk: List[Record] = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            break
+        if not keys:
+            keys = list(chunk[0].keys())
+            chunks = {key: [] for key in keys}
+
+        # records are tuples, so transposing them yields the values of every field
+        for key, values in zip(keys, zip(*chunk)):
+            chunks[key].append(_as_array(values))
+
+    return {key: _concatenate(parts) for key, parts in chunks.items()}
+
+
+def as_frame(arrays: Mapping[str, npt.NDArray[Any]]) -> pd.DataFrame:
+    """A frame of the arrays of `columns()`, 2-D arrays are split into numbered columns."""
+    frames: List[pd.DataFrame] = [
+        pd.DataFrame(values, columns=[f"{key}_{i}" for i in range(values.shape[1])], copy=False)
+        if values.ndim == 2
+        else pd.DataFrame({key: values})
+        for key, values in arrays.items()
+    ]
+    return pd.concat(frames, axis=1, copy=False) if frames else pd.DataFrame()
+
+
+def _as_array(values: Tuple[Any, ...]) -> npt.NDArray[Any]:
+    first: Any = next((value for value in values if value is not None), None)
+    if not isinstance(first, list):
+        array: npt.NDArray[Any] = pd.Series(values).to_numpy()
+        return array
+
+    width: int = len(first)
+    if None not in values:
+        block: npt.NDArray[np.float32] = np.array(values, dtype=np.float32)
+        return block.reshape(len(values), width)
+
+    block = np.full((len(values), width), np.nan, dtype=np.float32)
+    for row, value in enumerate(values):
+        if value is not None:
+            block[row] = value
+    return block
 
-    return df
 
+def _concatenate(parts: List[npt.NDArray[Any]]) -> npt.NDArray[Any]:
+    if len(parts) == 1:
+        return parts[0]
+    if all(part.ndim == 1 for part in parts):
+        # pandas reconciles the dtypes of the chunks, e.g. ints and floats with NaN
+        array: npt.NDArray[Any] = pd.concat(
+            [pd.Series(part) for part in parts], ignore_index=True
+        ).to_numpy()
+        return array
 
-def drop_missing_values(rows: Sequence[Mapping[str, Any]]) -> Sequence[Mapping[str, Any]]:
-    return [{k: v for k, v in row.items() if not pd.isna(v)} for row in rows]
+    rows: int = sum(len(part) for part in parts)
+    width: int = max(part.shape[1] for part in parts if part.ndim == 2)
+    block: npt.NDArray[np.float32] = np.full((rows, width), np.nan, dtype=np.float32)
+    start: int = 0
+    for part in parts:
+        # a chunk without any list holds Nones only and stays NaN
+        if part.ndim == 2:
+            block[start : start + len(part)] = part
+        start += len(part)
+    return block
 
 
 def inclusive_range(start: int, stop: int, step: int) -> Iterator[int]:
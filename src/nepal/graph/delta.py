@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+HASH: str = "__hash__"
+
+
+class Delta(NamedTuple):
+    """Rows which changed since the previous load, `deletes` only holds the key columns."""
+
+    inserts: pd.DataFrame
+    updates: pd.DataFrame
+    deletes: pd.DataFrame
+
+    @property
+    def upserts(self) -> pd.DataFrame:
+        return pd.concat([self.inserts, self.updates])
+
+    def __len__(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+class Snapshot:
+    """
+    Hashes of the rows which a step loaded into the graph last time, by their key columns,
+    stored as a Parquet file. Comparing the rows of a new load to them yields the `Delta`
+    which needs to be sent to the database, instead of merging every row again.
+    """
+
+    def __init__(self, path: Path, *, key: Sequence[str]) -> None:
+        self._path: Path = path
+        self._key: List[str] = list(key)
+        self._pending: Optional[pd.DataFrame] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> pd.DataFrame:
+        if not self._path.is_file():
+            return pd.DataFrame(columns=[*self._key, HASH])
+        return pd.read_parquet(self._path, engine="pyarrow")
+
+    def delta(self, data: pd.DataFrame) -> Delta:
+        """
+        Compares the rows to the snapshot, the last row of every key counts as in `SET`.
+        The hashes of the rows are kept until `commit()`, once they are in the database.
+        """
+        rows: pd.DataFrame = data.dropna(subset=self._key).drop_duplicates(
+            subset=self._key, keep="last"
+        )
+        rows = rows.reset_index(drop=True)
+
+        current: pd.DataFrame = rows[self._key].assign(**{HASH: _hash(rows)})
+        previous: pd.DataFrame = self.load().astype(current.dtypes.to_dict())
+
+        # left joins keep the order and length of the rows, as the snapshot keys are unique
+        unchanged: pd.Series = _found(current, previous, on=[*self._key, HASH])
+        known: pd.Series = _found(current, previous, on=self._key)
+        gone: pd.Series = ~_found(previous, current, on=self._key)
+
+        self._pending = current
+        return Delta(
+            inserts=rows[~known.to_numpy()],
+            updates=rows[(known & ~unchanged).to_numpy()],
+            deletes=previous.loc[gone.to_numpy(), self._key].reset_index(drop=True),
+        )
+
+    def forget(self, column: str, values: Iterable[object]) -> int:
+        """
+        Removes the rows whose `column` holds one of the values, so that the next `delta()`
+        sends them again. Returns the number of removed rows.
+        """
+        previous: pd.DataFrame = self.load()
+        kept: pd.DataFrame = previous[~previous[column].isin(list(values))]
+        if len(kept) < len(previous):
+            kept.to_parquet(self._path, engine="pyarrow", index=False)
+        return len(previous) - len(kept)
+
+    def commit(self) -> None:
+        """Stores the hashes of the last `delta()`, after it was sent to the database."""
+        if self._pending is None:
+            raise ValueError("There are no rows to commit, call `delta()` first.")
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._pending.to_parquet(self._path, engine="pyarrow", index=False)
+        self._pending = None
+
+
+def _hash(rows: pd.DataFrame) -> npt.NDArray[np.uint64]:
+    """Hash of every row, lists (as in series properties) are hashed as tuples."""
+    hashable: pd.DataFrame = (
+        rows.apply(
+            lambda column: column.map(
+                lambda value: tuple(value) if isinstance(value, list) else value
+            )
+            if column.dtype == object and column.map(type).eq(list).any()
+            else column
+        )
+        if len(rows) > 0
+        else rows
+    )
+    hashes: npt.NDArray[np.uint64] = pd.util.hash_pandas_object(
+        hashable, index=False
+    ).to_numpy()
+    return hashes
+
+
+def _found(left: pd.DataFrame, right: pd.DataFrame, *, on: List[str]) -> pd.Series:
+    """Whether the values of the columns `on` of every row in `left` occur in `right`."""
+    joined: pd.DataFrame = left[on].merge(right[on], on=on, how="left", indicator=True)
+    return joined["_merge"] == "both"
+
+
+__all__ = ["Delta", "Snapshot"]
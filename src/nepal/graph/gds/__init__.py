@@ -1,3 +1,14 @@
 from .embedding import BaseEmbedding, CountyEmbedding
+from .fastrp import Equivalence, FastRP, LocalCountyEmbedding, compare
+from .queries import QUERIES, QueryRegistry
 
-__all__ = ["BaseEmbedding", "CountyEmbedding"]
+__all__ = [
+    "BaseEmbedding",
+    "CountyEmbedding",
+    "Equivalence",
+    "FastRP",
+    "LocalCountyEmbedding",
+    "QUERIES",
+    "QueryRegistry",
+    "compare",
+]
@@ -1,13 +1,30 @@
+import logging
 import warnings
 from abc import ABC, abstractmethod
-from string import Template
-from typing import Sequence
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
-from neo4j import Query, Record
+from neo4j import Record
 from neo4j.exceptions import ClientError
 
+from nepal.ml.features.embedding import EmbeddingCache
+
 from .. import Connection
+from .queries import QUERIES
 
 
 class BaseEmbedding(ABC):
@@ -27,20 +44,37 @@ class BaseEmbedding(ABC):
         return self._create_projection(connection)
 
     def drop_projection(self, connection: Connection) -> Sequence[Record]:
-        template: Template = Template(
-            """
-                CALL gds.graph.drop('$projection')
-                """
-        )
-
-        query: Query = Query(template.substitute(projection=self.projection_name))
-
         try:
-            return connection.query(query)
+            return connection.query(
+                QUERIES["gds.graph.drop"], parameters={"projection": self.projection_name}
+            )
         except ClientError as e:
             warnings.warn(str(e))
             return []
 
+    def projection_exists(self, connection: Connection) -> bool:
+        records: Sequence[Record] = connection.query(
+            QUERIES["gds.graph.exists"], parameters={"projection": self.projection_name}
+        )
+        return bool(records[0]["exists"]) if records else False
+
+    def projection_identity(self, connection: Connection) -> Mapping[str, Any]:
+        """
+        When the projection was created and how many nodes and relationships it holds. A
+        projection is a copy of the graph at its creation, so this identifies the graph
+        which algorithms on the projection see, empty if there is no projection.
+        """
+        records: Sequence[Record] = connection.query(
+            QUERIES["gds.graph.list"], parameters={"projection": self.projection_name}
+        )
+        if not records:
+            return {}
+        return {
+            "created": str(records[0]["creationTime"]),
+            "nodes": int(records[0]["nodeCount"]),
+            "relationships": int(records[0]["relationshipCount"]),
+        }
+
     @abstractmethod
     def _create_projection(self, connection: Connection) -> Sequence[Record]:
         raise NotImplementedError
@@ -48,74 +82,69 @@ class BaseEmbedding(ABC):
     def estimate_memory(
         self, connection: Connection, *, embedding_dimension: int
     ) -> Sequence[Record]:
-        template: Template = Template(
-            """
-            CALL gds.fastRP.stream.estimate('$projection', {embeddingDimension: $dimension})
-            YIELD nodeCount, relationshipCount, bytesMin, bytesMax, requiredMemory
-            RETURN nodeCount, relationshipCount, bytesMin, bytesMax, requiredMemory
-            """
+        return connection.query(
+            QUERIES["gds.fastRP.stream.estimate"],
+            parameters={
+                "projection": self.projection_name,
+                "dimension": int(embedding_dimension),
+            },
         )
 
-        query: Query = Query(
-            template.substitute(
-                projection=self.projection_name, dimension=str(embedding_dimension)
+    def check_memory(
+        self,
+        connection: Connection,
+        *,
+        embedding_dimensions: Iterable[int],
+        max_bytes: Optional[int] = None,
+    ) -> Dict[int, int]:
+        """
+        The most memory which FastRP needs on the projection for each dimension, per
+        `estimate_memory()`. More than `max_bytes` for any of them raises a `MemoryError`.
+        """
+        estimates: Dict[int, int] = {}
+        for dimension in sorted(set(embedding_dimensions)):
+            records: Sequence[Record] = self.estimate_memory(
+                connection, embedding_dimension=dimension
+            )
+            estimates[dimension] = int(records[0]["bytesMax"]) if records else 0
+            logging.info(
+                f"FastRP on '{self.projection_name}' with {dimension} dimensions needs up to "
+                f"{estimates[dimension] / 1e6:,.1f} MB"
             )
-        )
-        return connection.query(query)
+
+        if max_bytes is not None and any(value > max_bytes for value in estimates.values()):
+            raise MemoryError(
+                f"FastRP needs up to {max(estimates.values()):,} bytes, "
+                f"but only {max_bytes:,} bytes are allowed."
+            )
+        return estimates
 
 
 class CountyEmbedding(BaseEmbedding):
+    # node properties of the projection which FastRP reads, see `embedding_parameters()`
+    features: ClassVar[Sequence[str]] = (
+        "census",
+        "pop_under_5",
+        "pop_5_to_17",
+        "pop_18_to_65",
+        "pop_plus_65",
+        "is_metro",
+        "svi_a",
+        "svi_b",
+        "svi_c",
+        "svi_d",
+    )
+
     def __init__(self, name: str = "counties", random_seed: int = 42):
         super().__init__(projection_name=name)
         self.random_seed: int = random_seed
 
     def _create_projection(self, connection: Connection) -> Sequence[Record]:
         """Creates a native projection in Neo4J"""
-        template: Template = Template(
-            """
-            CALL gds.graph.project(
-                '$projection',            
-                {
-                    County: { 
-                        properties: {
-                            census: {defaultValue: 0},
-                            pop_under_5: {defaultValue: 0},
-                            pop_5_to_17: {defaultValue: 0},
-                            pop_18_to_65: {defaultValue: 0},
-                            pop_plus_65: {defaultValue: 0},
-                            is_metro: {defaultValue: 0},
-                            svi_a: {defaultValue: 0},
-                            svi_b: {defaultValue: 0},
-                            svi_c: {defaultValue: 0},
-                            svi_d: {defaultValue: 0}
-                        }
-                    }
-                },         
-                {
-                    IS_NEAR: {
-                        properties: 'weight',
-                        orientation: 'UNDIRECTED'
-                    }
-                }
-            )
-            YIELD
-                graphName AS graph, 
-                nodeProjection, 
-                nodeCount AS nodes, 
-                relationshipProjection, 
-                relationshipCount AS rels
-            RETURN 
-                graph,
-                nodeProjection.County AS countyProjection,
-                nodes,
-                rels
-            """
-        )
-
-        query: Query = Query(template.substitute(projection=self.projection_name))
-
         try:
-            return connection.query(query)
+            return connection.query(
+                QUERIES["county.project"], parameters={"projection": self.projection_name}
+            )
         except ClientError as e:
             warnings.warn(str(e))
             return []
@@ -132,60 +161,59 @@ class CountyEmbedding(BaseEmbedding):
         property_ratio: float = 0.0,
         self_influence: float = 0.0,
     ) -> Sequence[Record]:
-        template: Template = Template(
-            """
-            CALL gds.fastRP.stream('$projection', 
-                {
-                    randomSeed: $seed,
-                    embeddingDimension: $dimension,
-                    iterationWeights: [0.0, $weight2, $weight3, $weight4],
-                    nodeSelfInfluence: $self_influence,
-                    normalizationStrength: $normalization,
-                    relationshipWeightProperty: 'weight',
-                    propertyRatio: $property_ratio,
-                    featureProperties: [
-                        'census',
-                        'pop_under_5',
-                        'pop_5_to_17',
-                        'pop_18_to_65',
-                        'pop_plus_65',
-                        'is_metro',
-                        'svi_a',
-                        'svi_b',
-                        'svi_c',
-                        'svi_d'
-                    ]
-                }
-            )
-            YIELD nodeId, embedding
-            """
+        return connection.query(
+            QUERIES["gds.fastRP.stream"],
+            parameters=self.embedding_parameters(
+                embedding_dimension=embedding_dimension,
+                weight2=weight2,
+                weight3=weight3,
+                weight4=weight4,
+                normalization=normalization,
+                property_ratio=property_ratio,
+                self_influence=self_influence,
+            ),
         )
 
-        query: Query = Query(
-            template.substitute(
-                seed=str(self.random_seed),
-                projection=self.projection_name,
-                dimension=str(embedding_dimension),
-                weight2=str(weight2),
-                weight3=str(weight3),
-                weight4=str(weight4),
-                normalization=str(normalization),
-                property_ratio=str(property_ratio),
-                self_influence=str(self_influence),
-            )
-        )
-        return connection.query(query)
+    def embedding_parameters(
+        self,
+        *,
+        embedding_dimension: int = 64,
+        weight2: float = 0.0,
+        weight3: float = 0.5,
+        weight4: float = 1.0,
+        normalization: float = -0.5,
+        property_ratio: float = 0.0,
+        self_influence: float = 0.0,
+    ) -> Mapping[Hashable, Any]:
+        """Parameters of the `gds.fastRP.stream` query, typed as GDS expects them."""
+        return {
+            "projection": self.projection_name,
+            "seed": int(self.random_seed),
+            "dimension": int(embedding_dimension),
+            "weight2": float(weight2),
+            "weight3": float(weight3),
+            "weight4": float(weight4),
+            "normalization": float(normalization),
+            "property_ratio": float(property_ratio),
+            "self_influence": float(self_influence),
+            "weight_property": "weight",
+            "features": list(self.features),
+        }
 
     @classmethod
     def node_id_to_fips_mapping(cls, connection: Connection) -> Sequence[Record]:
-        query: Query = Query(
-            """
-            MATCH (c:County) 
-            RETURN ID(c) AS nodeId, c.fips as fips
-            """
-        )
+        return connection.query(QUERIES["county.node_ids"])
 
-        return connection.query(query)
+    def fips_mapping(self, connection: Connection) -> pd.Series:
+        """The FIPS code of every county by node id."""
+        arrays: Dict[str, npt.NDArray[Any]] = connection.query_arrays(
+            QUERIES["county.node_ids"]
+        )
+        return pd.Series(
+            arrays.get("fips", np.array([], dtype=object)),
+            index=pd.Index(arrays.get("nodeId", np.array([], dtype=np.int64)), name="nodeId"),
+            name="fips",
+        )
 
     def load_dataframe(
         self,
@@ -198,32 +226,107 @@ class CountyEmbedding(BaseEmbedding):
         normalization: float = -0.5,
         property_ratio: float = 0.0,
         self_influence: float = 0.0,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> pd.DataFrame:
+        """
+        The embedding of every county, indexed by FIPS code, in the float32 columns
+        `emb_{i}`. The embeddings are streamed into a single block instead of a list per node.
+        With a `cache`, an embedding of the same parameters is only computed once per
+        projection (see `projection_identity()`). The projection is not refreshed, recreate
+        it with `create_projection(force=True)` after changing the graph.
+        """
+        parameters: Mapping[Hashable, Any] = self.embedding_parameters(
+            embedding_dimension=embedding_dimension,
+            weight2=weight2,
+            weight3=weight3,
+            weight4=weight4,
+            normalization=normalization,
+            property_ratio=property_ratio,
+            self_influence=self_influence,
+        )
+        return self._embed(connection, parameters, cache=cache)
+
+    def sweep(
+        self,
+        connection: Connection,
+        configurations: Iterable[Mapping[str, Any]],
+        *,
+        cache: Optional[EmbeddingCache] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Iterator[Tuple[Mapping[str, Any], pd.DataFrame]]:
+        """
+        Computes the embedding of every configuration (keyword arguments of
+        `load_dataframe()`) in turn and yields it with its configuration. They share one
+        projection, which is created unless it exists, and one node id mapping. Before any
+        embedding is computed, `check_memory()` makes sure each dimension fits `max_bytes`.
+        """
+        configs: List[Mapping[str, Any]] = list(configurations)
+        if not self.projection_exists(connection):
+            self.create_projection(connection)
+
+        self.check_memory(
+            connection,
+            embedding_dimensions=[config.get("embedding_dimension", 64) for config in configs],
+            max_bytes=max_bytes,
+        )
+        projection: Optional[Mapping[str, Any]] = (
+            self.projection_identity(connection) if cache is not None else None
+        )
+        fips: pd.Series = self.fips_mapping(connection)
+
+        for config in configs:
+            yield config, self._embed(
+                connection,
+                self.embedding_parameters(**config),
+                cache=cache,
+                fips=fips,
+                projection=projection,
+            )
+
+    def _embed(
+        self,
+        connection: Connection,
+        parameters: Mapping[Hashable, Any],
+        *,
+        cache: Optional[EmbeddingCache],
+        fips: Optional[pd.Series] = None,
+        projection: Optional[Mapping[str, Any]] = None,
+    ) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            arrays: Dict[str, npt.NDArray[Any]] = connection.query_arrays(
+                QUERIES["gds.fastRP.stream"], parameters=parameters
+            )
+            return self.to_frame(
+                arrays.get("nodeId", np.array([], dtype=np.int64)),
+                arrays.get("embedding", np.empty((0, int(parameters["dimension"])))),
+                fips=fips if fips is not None else self.fips_mapping(connection),
+            )
+
+        if cache is None:
+            return compute()
+        # the embedding depends on the projection of the graph, as well as the parameters
+        key: Dict[str, Any] = {
+            "algorithm": "gds.fastRP.stream",
+            "database": connection.db,
+            "graph": (
+                projection if projection is not None else self.projection_identity(connection)
+            ),
+            **{str(name): value for name, value in parameters.items()},
+        }
+        return cache.get_or_compute(key, compute)
+
+    @classmethod
+    def to_frame(
+        cls, node_ids: npt.NDArray[Any], embeddings: npt.NDArray[Any], *, fips: pd.Series
     ) -> pd.DataFrame:
-        idx: str = "nodeId"
-
-        embeddings: pd.DataFrame = pd.DataFrame(
-            [
-                dict(row)
-                for row in self.generate_embedding(
-                    connection,
-                    embedding_dimension=embedding_dimension,
-                    weight2=weight2,
-                    weight3=weight3,
-                    weight4=weight4,
-                    normalization=normalization,
-                    property_ratio=property_ratio,
-                    self_influence=self_influence,
-                )
-            ]
-        ).set_index(idx)
-
-        nodes: pd.DataFrame = pd.DataFrame(
-            [dict(row) for row in self.node_id_to_fips_mapping(connection)]
-        ).set_index(idx)
-
-        result: pd.DataFrame = nodes.join(embeddings, how="inner").set_index("fips")
+        """
+        The embeddings (a row per node id) as float32 columns `emb_{i}`, indexed by the
+        FIPS code of their node. Rows of nodes without a FIPS code are dropped.
+        """
+        positions: npt.NDArray[np.int64] = fips.index.get_indexer(node_ids)
+        found: npt.NDArray[np.bool_] = positions >= 0
         return pd.DataFrame(
-            result["embedding"].to_list(),
-            index=result.index,
-            columns=[f"emb_{_}" for _ in range(embedding_dimension)],
+            embeddings.astype(np.float32, copy=False)[found],
+            index=pd.Index(fips.to_numpy()[positions[found]], name="fips"),
+            columns=[f"emb_{_}" for _ in range(embeddings.shape[1])],
         )
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from typing import Any, ClassVar, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from scipy import sparse
+
+from nepal.datasets import CountyDistance, Vaccinations
+from nepal.ml.features.embedding import PersistableEmbedding
+
+from ..model import County, CountyDistances
+
+
+class FastRP:
+    """
+    Fast Random Projection as in `gds.fastRP`, with NumPy and SciPy instead of a database.
+
+    Every node starts from a sparse random vector, scaled by its degree to the power of
+    `normalization`. With a `property_ratio`, that share of the dimensions is a random
+    projection of the node features instead. Every iteration sums the (weighted) vectors
+    of the neighbours and normalises them, the embedding is the sum of the iterations
+    weighted by `iteration_weights`, plus the initial vector weighted by `self_influence`.
+    """
+
+    # share of the non-zero entries of the random vectors, as in very sparse projections
+    sparsity: ClassVar[float] = 1 / 3
+
+    def __init__(
+        self,
+        *,
+        embedding_dimension: int = 64,
+        iteration_weights: Sequence[float] = (0.0, 1.0, 1.0),
+        normalization: float = 0.0,
+        property_ratio: float = 0.0,
+        self_influence: float = 0.0,
+        random_seed: Optional[int] = None,
+    ) -> None:
+        if not 0.0 <= property_ratio <= 1.0:
+            raise ValueError(f"The property ratio must be within [0, 1], got {property_ratio}.")
+
+        self.embedding_dimension: int = embedding_dimension
+        self.iteration_weights: List[float] = list(iteration_weights)
+        self.normalization: float = normalization
+        self.property_ratio: float = property_ratio
+        self.self_influence: float = self_influence
+        self.random_seed: Optional[int] = random_seed
+
+    def embed(
+        self, adjacency: sparse.spmatrix, features: Optional[npt.NDArray[Any]] = None
+    ) -> npt.NDArray[np.float32]:
+        """
+        Embeddings of the nodes of the symmetric `adjacency` matrix (relationship weights
+        as values), `features` holds a row of (missing as 0) property values per node.
+        Like GDS, the degree counts the stored relationships of a node, whatever their
+        weights (even 0), the weights only apply when summing the neighbours.
+        """
+        rng: np.random.Generator = np.random.default_rng(self.random_seed)
+        matrix: sparse.csr_matrix = sparse.csr_matrix(adjacency, dtype=np.float32)
+        n_nodes: int = matrix.shape[0]
+
+        property_dimension: int = int(round(self.embedding_dimension * self.property_ratio))
+        if property_dimension > 0 and (features is None or features.shape[1] == 0):
+            raise ValueError("A positive property ratio requires node features.")
+
+        degrees: npt.NDArray[np.float64] = np.asarray(matrix.getnnz(axis=1), dtype=np.float64)
+        scaling: npt.NDArray[np.float64] = np.where(
+            degrees > 0, np.power(np.maximum(degrees, 1.0), self.normalization), 1.0
+        )
+        initial: npt.NDArray[np.float32] = np.empty(
+            (n_nodes, self.embedding_dimension), dtype=np.float32
+        )
+        initial[:, property_dimension:] = (
+            self._random_vectors(rng, n_nodes, self.embedding_dimension - property_dimension)
+            * scaling[:, None]
+        )
+        if property_dimension > 0 and features is not None:
+            values: npt.NDArray[np.float32] = features.astype(np.float32)
+            values[np.isnan(values)] = 0.0
+            initial[:, :property_dimension] = values @ self._random_vectors(
+                rng, values.shape[1], property_dimension
+            )
+
+        embedding: npt.NDArray[np.float32] = self.self_influence * initial
+        current: npt.NDArray[np.float32] = initial
+        for weight in self.iteration_weights:
+            current = _normalized(matrix @ current)
+            if weight != 0.0:
+                embedding += weight * current
+        return embedding
+
+    @classmethod
+    def _random_vectors(
+        cls, rng: np.random.Generator, rows: int, dimension: int
+    ) -> npt.NDArray[np.float32]:
+        """Entries of +-sqrt(1 / sparsity / dimension) or 0, so the rows have unit norm."""
+        draws: npt.NDArray[np.float64] = rng.random((rows, dimension))
+        value: float = float(np.sqrt(1 / cls.sparsity / max(dimension, 1)))
+        vectors: npt.NDArray[np.float32] = np.zeros((rows, dimension), dtype=np.float32)
+        vectors[draws < cls.sparsity / 2] = value
+        vectors[draws > 1 - cls.sparsity / 2] = -value
+        return vectors
+
+
+class Equivalence(NamedTuple):
+    """
+    How similar two embeddings of the same nodes are, independent of their random bases:
+    the correlation of the cosine similarities of every node to its `k` nearest nodes in
+    the reference, and the mean share of these neighbours which the embedding agrees on.
+    Both are around 0 for unrelated embeddings, FastRP with another seed scores 0.7 - 0.9.
+    """
+
+    nodes: int
+    correlation: float
+    neighbour_overlap: float
+
+    def passed(self, *, min_correlation: float = 0.5, min_overlap: float = 0.5) -> bool:
+        return self.correlation >= min_correlation and self.neighbour_overlap >= min_overlap
+
+
+def compare(
+    embedding: pd.DataFrame, reference: pd.DataFrame, *, k: int = 10, block: int = 1024
+) -> Equivalence:
+    """
+    Compares two embeddings indexed by node, e.g. `LocalCountyEmbedding.load_dataframe()`
+    to `CountyEmbedding.load_dataframe()` (GDS) with the same parameters. As their random
+    vectors differ, their values cannot match, but the neighbourhoods of the nodes should.
+    The similarities are computed for `block` nodes at a time.
+    """
+    nodes: pd.Index = embedding.index.intersection(reference.index)
+    left: npt.NDArray[np.float32] = _normalized(embedding.loc[nodes].to_numpy(np.float32))
+    right: npt.NDArray[np.float32] = _normalized(reference.loc[nodes].to_numpy(np.float32))
+    k = min(k, len(nodes) - 1)
+    if k <= 0:
+        return Equivalence(nodes=len(nodes), correlation=1.0, neighbour_overlap=1.0)
+
+    similarities: List[List[npt.NDArray[np.float64]]] = [[], []]
+    overlaps: List[float] = []
+    for start in range(0, len(nodes), block):
+        rows: npt.NDArray[np.int64] = np.arange(start, min(start + block, len(nodes)))
+        on_left: npt.NDArray[np.float32] = left[rows] @ left.T
+        on_right: npt.NDArray[np.float32] = right[rows] @ right.T
+        nearest: List[npt.NDArray[np.int64]] = [
+            _nearest(on_left, rows, k=k),
+            _nearest(on_right, rows, k=k),
+        ]
+
+        # the similarities to the neighbours in the reference, in either embedding
+        positions: npt.NDArray[np.int64] = np.arange(len(rows))[:, None]
+        similarities[0].append(on_left[positions, nearest[1]].astype(np.float64).ravel())
+        similarities[1].append(on_right[positions, nearest[1]].astype(np.float64).ravel())
+        overlaps.extend(len(set(a.tolist()) & set(b.tolist())) / k for a, b in zip(*nearest))
+
+    return Equivalence(
+        nodes=len(nodes),
+        correlation=_correlation(np.hstack(similarities[0]), np.hstack(similarities[1])),
+        neighbour_overlap=float(np.mean(overlaps)),
+    )
+
+
+class Graph(NamedTuple):
+    """Nodes, a row of property values per node and the symmetric weighted adjacency."""
+
+    nodes: pd.Index
+    features: npt.NDArray[np.float64]
+    adjacency: sparse.csr_matrix
+
+
+class LocalCountyEmbedding:
+    """
+    The embedding of `CountyEmbedding` (same parameters and output), computed by `FastRP`
+    from the prepared data of the `County` and `CountyDistances` steps instead of GDS.
+    The projection uses the same node properties and `IS_NEAR` weights, as undirected.
+    """
+
+    # projected node property (see `CountyEmbedding.features`) and column of `County`
+    properties: ClassVar[Mapping[str, str]] = {
+        "census": "Census2019",
+        "pop_under_5": "Under5_Pop_Pct",
+        "pop_5_to_17": "Between5to17_Pop_Pct",
+        "pop_18_to_65": "Between18to65_Pop_Pct",
+        "pop_plus_65": "Plus65_Pop_Pct",
+        "is_metro": "Is_Metro",
+        "svi_a": "SVI_A",
+        "svi_b": "SVI_B",
+        "svi_c": "SVI_C",
+        "svi_d": "SVI_D",
+    }
+
+    def __init__(
+        self,
+        *,
+        counties: Optional[County] = None,
+        distances: Optional[CountyDistances] = None,
+        random_seed: int = 42,
+    ) -> None:
+        self._counties: County = counties or County(Vaccinations())
+        self._distances: CountyDistances = distances or CountyDistances(
+            CountyDistance(radius=100)
+        )
+        self.random_seed: int = random_seed
+
+    def graph(self) -> Graph:
+        """The counties, their property matrix and the adjacency of their distances."""
+        counties: pd.DataFrame = self._counties.prepare_data().drop_duplicates(
+            subset=["FIPS"], keep="last"
+        )
+        fips: pd.Index = pd.Index(counties["FIPS"].astype(str), name="fips")
+        features: npt.NDArray[np.float64] = (
+            counties[list(self.properties.values())].astype(np.float64).fillna(0.0).to_numpy()
+        )
+
+        # like `MATCH` in `CountyDistances`, relationships need both of their counties
+        distances: pd.DataFrame = self._distances.prepare_data()
+        start: npt.NDArray[np.int64] = fips.get_indexer(distances["county1"].astype(str))
+        end: npt.NDArray[np.int64] = fips.get_indexer(distances["county2"].astype(str))
+        weights: npt.NDArray[np.float64] = (
+            distances["weight"].astype(np.float64).fillna(0.0).to_numpy()
+        )
+        valid: npt.NDArray[np.bool_] = (start >= 0) & (end >= 0) & (start != end)
+
+        # `MERGE (a)-[r:IS_NEAR]-(b)` keeps one relationship per pair, the last weight wins
+        pairs: pd.DataFrame = pd.DataFrame(
+            {
+                "low": np.minimum(start, end)[valid],
+                "high": np.maximum(start, end)[valid],
+                "weight": weights[valid],
+            }
+        ).drop_duplicates(subset=["low", "high"], keep="last")
+        # both directions at once, as adding the transpose would drop relationships of weight 0
+        low, high = pairs["low"].to_numpy(), pairs["high"].to_numpy()
+        weight: npt.NDArray[np.float64] = pairs["weight"].to_numpy()
+        adjacency: sparse.csr_matrix = sparse.coo_matrix(
+            (np.r_[weight, weight], (np.r_[low, high], np.r_[high, low])),
+            shape=(len(fips), len(fips)),
+            dtype=np.float32,
+        ).tocsr()
+        return Graph(nodes=fips, features=features, adjacency=adjacency)
+
+    def load_dataframe(
+        self,
+        *,
+        embedding_dimension: int = 64,
+        weight2: float = 0.0,
+        weight3: float = 0.5,
+        weight4: float = 1.0,
+        normalization: float = -0.5,
+        property_ratio: float = 0.0,
+        self_influence: float = 0.0,
+        graph: Optional[Graph] = None,
+    ) -> pd.DataFrame:
+        """Same as `CountyEmbedding.load_dataframe()`, `graph` is prepared unless given."""
+        graph = graph if graph is not None else self.graph()
+        fast_rp: FastRP = FastRP(
+            embedding_dimension=embedding_dimension,
+            iteration_weights=[0.0, weight2, weight3, weight4],
+            normalization=normalization,
+            property_ratio=property_ratio,
+            self_influence=self_influence,
+            random_seed=self.random_seed,
+        )
+        return pd.DataFrame(
+            fast_rp.embed(graph.adjacency, graph.features),
+            index=graph.nodes,
+            columns=[f"emb_{_}" for _ in range(embedding_dimension)],
+        )
+
+    def store(self, identifier: str = "counties", **parameters: Any) -> pd.DataFrame:
+        """Computes the embedding and stores it as `PersistableEmbedding(identifier)`."""
+        embedding: pd.DataFrame = self.load_dataframe(**parameters)
+        PersistableEmbedding(identifier).store(embedding)
+        return embedding
+
+
+def _normalized(vectors: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    norms: npt.NDArray[np.float32] = np.sqrt(np.sum(vectors * vectors, axis=1, keepdims=True))
+    normalized: npt.NDArray[np.float32] = vectors / np.where(norms > 0, norms, 1.0)
+    return normalized.astype(np.float32, copy=False)
+
+
+def _correlation(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> float:
+    a, b = a - a.mean(), b - b.mean()
+    scale: float = float(np.sqrt(np.sum(a * a) * np.sum(b * b)))
+    return float(np.sum(a * b)) / scale if scale > 0 else 0.0
+
+
+def _nearest(
+    similarities: npt.NDArray[np.float32], rows: npt.NDArray[np.int64], *, k: int
+) -> npt.NDArray[np.int64]:
+    """The `k` most similar nodes of every row, apart from the node itself."""
+    similarities[np.arange(len(rows)), rows] = -np.inf
+    nearest: npt.NDArray[np.int64] = np.argpartition(-similarities, k, axis=1)[:, :k]
+    return nearest
+
+
+__all__ = ["Equivalence", "FastRP", "Graph", "LocalCountyEmbedding", "compare"]
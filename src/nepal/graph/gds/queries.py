@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator
+
+from neo4j import Query
+
+
+class QueryRegistry:
+    """
+    Named Cypher queries, which take all their values as `$` parameters. The text of a
+    query never changes with its parameters, so Neo4j plans it once and reuses the plan
+    from its query cache for every later call, e.g. throughout an embedding sweep.
+    """
+
+    def __init__(self) -> None:
+        self._queries: Dict[str, Query] = {}
+
+    def register(self, name: str, text: str) -> Query:
+        if name in self._queries:
+            raise ValueError(f"A query named '{name}' is already registered.")
+
+        self._queries[name] = Query(text)
+        return self._queries[name]
+
+    def __getitem__(self, name: str) -> Query:
+        return self._queries[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._queries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._queries)
+
+
+QUERIES: QueryRegistry = QueryRegistry()
+
+QUERIES.register(
+    "gds.graph.drop",
+    """
+    CALL gds.graph.drop($projection)
+    """,
+)
+
+QUERIES.register(
+    "gds.graph.exists",
+    """
+    CALL gds.graph.exists($projection)
+    YIELD exists
+    RETURN exists
+    """,
+)
+
+QUERIES.register(
+    "gds.graph.list",
+    """
+    CALL gds.graph.list($projection)
+    YIELD creationTime, nodeCount, relationshipCount
+    RETURN creationTime, nodeCount, relationshipCount
+    """,
+)
+
+QUERIES.register(
+    "gds.fastRP.stream.estimate",
+    """
+    CALL gds.fastRP.stream.estimate($projection, {embeddingDimension: $dimension})
+    YIELD nodeCount, relationshipCount, bytesMin, bytesMax, requiredMemory
+    RETURN nodeCount, relationshipCount, bytesMin, bytesMax, requiredMemory
+    """,
+)
+
+QUERIES.register(
+    "gds.fastRP.stream",
+    """
+    CALL gds.fastRP.stream($projection,
+        {
+            randomSeed: $seed,
+            embeddingDimension: $dimension,
+            iterationWeights: [0.0, $weight2, $weight3, $weight4],
+            nodeSelfInfluence: $self_influence,
+            normalizationStrength: $normalization,
+            relationshipWeightProperty: $weight_property,
+            propertyRatio: $property_ratio,
+            featureProperties: $features
+        }
+    )
+    YIELD nodeId, embedding
+    """,
+)
+
+QUERIES.register(
+    "county.project",
+    """
+    CALL gds.graph.project(
+        $projection,
+        {
+            County: {
+                properties: {
+                    census: {defaultValue: 0},
+                    pop_under_5: {defaultValue: 0},
+                    pop_5_to_17: {defaultValue: 0},
+                    pop_18_to_65: {defaultValue: 0},
+                    pop_plus_65: {defaultValue: 0},
+                    is_metro: {defaultValue: 0},
+                    svi_a: {defaultValue: 0},
+                    svi_b: {defaultValue: 0},
+                    svi_c: {defaultValue: 0},
+                    svi_d: {defaultValue: 0}
+                }
+            }
+        },
+        {
+            IS_NEAR: {
+                properties: 'weight',
+                orientation: 'UNDIRECTED'
+            }
+        }
+    )
+    YIELD
+        graphName AS graph,
+        nodeProjection,
+        nodeCount AS nodes,
+        relationshipProjection,
+        relationshipCount AS rels
+    RETURN
+        graph,
+        nodeProjection.County AS countyProjection,
+        nodes,
+        rels
+    """,
+)
+
+QUERIES.register(
+    "county.node_ids",
+    """
+    MATCH (c:County)
+    RETURN ID(c) AS nodeId, c.fips as fips
+    """,
+)
+
+__all__ = ["QUERIES", "QueryRegistry"]
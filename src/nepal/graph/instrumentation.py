@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+    overload,
+)
+
+import pandas as pd
+from neo4j import Query
+from neo4j.packstream import Packer
+from neo4j.work.summary import ResultSummary
+
+_scope: threading.local = threading.local()
+
+
+@contextmanager
+def step(name: str) -> Iterator[None]:
+    """Attributes the queries of the current thread to the step `name`, see `QueryLog`."""
+    previous: Optional[str] = current_step()
+    _scope.step = name
+    try:
+        yield
+    finally:
+        _scope.step = previous
+
+
+def current_step() -> Optional[str]:
+    step: Optional[str] = getattr(_scope, "step", None)
+    return step
+
+
+class QueryStats(NamedTuple):
+    """
+    What a query cost, `start` and `wall` are seconds (from the creation of the log) on
+    the client, `available_after` and `consumed_after` are milliseconds on the server
+    until the first record was available and until the result was consumed.
+    """
+
+    step: Optional[str]
+    query: str
+    start: float
+    wall: float
+    available_after: Optional[int]
+    consumed_after: Optional[int]
+    counters: Mapping[str, int]
+    rows: int
+    bytes: int
+    thread: int
+    plan: Optional[Mapping[str, Any]]
+
+
+class QueryLog:
+    """
+    Collects the `QueryStats` of every query of an instrumented connection, see
+    `Neo4jConnection.instrument()`. The queries which `profile` selects (by their text) are
+    run with `PROFILE`, which adds their plan with the rows and db hits of every operator.
+    """
+
+    def __init__(self, *, profile: Optional[Callable[[str], bool]] = None) -> None:
+        self._profile: Optional[Callable[[str], bool]] = profile
+        self._stats: List[QueryStats] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._origin: float = time.perf_counter()
+
+    def __iter__(self) -> Iterator[QueryStats]:
+        with self._lock:
+            return iter(list(self._stats))
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def profiles(self, query: str) -> bool:
+        return self._profile is not None and self._profile(query)
+
+    def record(
+        self,
+        query: str,
+        summary: Optional[ResultSummary],
+        *,
+        start: float,
+        end: float,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        step: Optional[str] = None,
+    ) -> QueryStats:
+        """Adds a query which ran from `start` to `end` (`time.perf_counter()`)."""
+        rows: Any = (parameters or {}).get("rows")
+        stats: QueryStats = QueryStats(
+            step=step or current_step(),
+            query=query,
+            start=start - self._origin,
+            wall=end - start,
+            available_after=summary.result_available_after if summary else None,
+            consumed_after=summary.result_consumed_after if summary else None,
+            counters=dict(vars(summary.counters)) if summary else {},
+            rows=len(rows) if isinstance(rows, list) else 0,
+            bytes=packed_size(parameters),
+            thread=threading.get_ident(),
+            plan=summary.profile if summary else None,
+        )
+        with self._lock:
+            self._stats.append(stats)
+        return stats
+
+    def frame(self) -> pd.DataFrame:
+        """One row per query, with a column per counter."""
+        stats: List[QueryStats] = list(self)
+        frame: pd.DataFrame = pd.DataFrame(
+            [stats._asdict() for stats in stats], columns=list(QueryStats._fields)
+        )
+        for column in ["available_after", "consumed_after"]:
+            frame[column] = pd.to_numeric(frame[column])
+        counters: pd.DataFrame = (
+            pd.DataFrame([stats.counters for stats in stats], index=frame.index)
+            .fillna(0)
+            .astype(int)
+        )
+        return pd.concat([frame.drop(columns=["counters", "plan"]), counters], axis=1)
+
+    def report(self) -> pd.DataFrame:
+        """
+        Totals per step and query, the queries which took longest first. The query is
+        shortened to its first line, which tells the queries of a step apart.
+        """
+        frame: pd.DataFrame = self.frame()
+        frame["step"] = frame["step"].fillna("-")
+        frame["query"] = frame["query"].map(_first_line)
+        frame = frame.drop(columns=["start", "thread"]).rename(columns={"wall": "seconds"})
+        report: pd.DataFrame = frame.groupby(["step", "query"]).agg(
+            {
+                **{
+                    column: "sum" for column in frame.columns if column not in ["step", "query"]
+                },
+                "seconds": ["count", "sum"],
+            }
+        )
+        report.columns = pd.Index(
+            [
+                "calls" if aggregate == "count" else column
+                for column, aggregate in report.columns.to_flat_index()
+            ]
+        )
+        return report.sort_values("seconds", ascending=False)
+
+    def write_trace(self, path: Path) -> Path:
+        """
+        Writes the queries as a Chrome trace (open it in chrome://tracing or Perfetto):
+        a track per thread with the queries and a track with the span of every step.
+        """
+        stats: List[QueryStats] = list(self)
+        threads: Dict[int, int] = {
+            thread: i + 1 for i, thread in enumerate(dict.fromkeys(s.thread for s in stats))
+        }
+        events: List[Dict[str, Any]] = [
+            *(
+                {"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": name}}
+                for name, tid in [("steps", 0), *((f"thread {i}", i) for i in threads.values())]
+            ),
+            *(
+                {
+                    "ph": "X",
+                    "name": _first_line(s.query),
+                    "cat": s.step or "-",
+                    "pid": 1,
+                    "tid": threads[s.thread],
+                    "ts": s.start * 1e6,
+                    "dur": s.wall * 1e6,
+                    "args": {
+                        "step": s.step,
+                        "query": s.query,
+                        "available_after_ms": s.available_after,
+                        "consumed_after_ms": s.consumed_after,
+                        "rows": s.rows,
+                        "bytes": s.bytes,
+                        **s.counters,
+                    },
+                }
+                for s in stats
+            ),
+        ]
+
+        spans: Dict[str, List[float]] = {}
+        for s in stats:
+            if s.step is not None:
+                span: List[float] = spans.setdefault(s.step, [s.start, s.start + s.wall])
+                span[0], span[1] = min(span[0], s.start), max(span[1], s.start + s.wall)
+        events.extend(
+            {
+                "ph": "X",
+                "name": name,
+                "cat": "step",
+                "pid": 1,
+                "tid": 0,
+                "ts": first * 1e6,
+                "dur": (last - first) * 1e6,
+            }
+            for name, (first, last) in spans.items()
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        return path
+
+    def plans(self) -> Mapping[str, Mapping[str, Any]]:
+        """The last plan of every profiled query, by its text."""
+        return {s.query: s.plan for s in self if s.plan is not None}
+
+
+@overload
+def profiled(query: str) -> str:
+    ...
+
+
+@overload
+def profiled(query: Query) -> Query:
+    ...
+
+
+def profiled(query: Union[str, Query]) -> Union[str, Query]:
+    """The query prefixed with `PROFILE`."""
+    if isinstance(query, Query):
+        return Query(f"PROFILE {query.text}", metadata=query.metadata, timeout=query.timeout)
+    return f"PROFILE {query}"
+
+
+def packed_size(parameters: Optional[Mapping[Hashable, Any]]) -> int:
+    """Bytes which the driver sends for the parameters, as packed by its PackStream."""
+    if not parameters:
+        return 0
+
+    buffer: io.BytesIO = io.BytesIO()
+    Packer(buffer).pack(dict(parameters))
+    return len(buffer.getvalue())
+
+
+def _first_line(query: str) -> str:
+    return next((line.strip() for line in query.splitlines() if line.strip()), "")
+
+
+__all__ = ["QueryLog", "QueryStats", "current_step", "packed_size", "profiled", "step"]
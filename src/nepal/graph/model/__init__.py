@@ -1,14 +1,20 @@
-from .base import Steps
+from .base import Mergeable, Steps, StepTiming
 from .county import County, CountyDistances, CountyVaccinations
 from .date import Date
+from .series import CountyVaccinationSeries, SeriesSchema, StateMeasureSeries
 from .state import State, StateMeasures
 
 __all__ = [
     "County",
     "CountyDistances",
     "CountyVaccinations",
+    "CountyVaccinationSeries",
     "Date",
+    "Mergeable",
+    "SeriesSchema",
     "State",
     "StateMeasures",
+    "StateMeasureSeries",
+    "StepTiming",
     "Steps",
 ]
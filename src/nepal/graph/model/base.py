@@ -1,14 +1,42 @@
 from __future__ import annotations
 
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
 import pandas as pd
 
+from ..bulk import BulkImport, ImportFile
 from ..connection import Neo4jConnection as Connection
+from ..delta import Delta, Snapshot
+from ..instrumentation import step as query_step
 
 
 class Mergeable(ABC):
+    # steps of these types are merged first, as this step matches their nodes
+    requires: ClassVar[Tuple[Type[Mergeable], ...]] = ()
+    # columns of the prepared data which identify what a row creates, see `sync()`
+    key: ClassVar[Sequence[str]] = ()
+    # columns of the prepared data which hold the (single column) key of a required step
+    references: ClassVar[Mapping[str, Type[Mergeable]]] = {}
+
     @abstractmethod
     def merge(self, connection: Connection) -> None:
         raise NotImplementedError
@@ -16,6 +44,68 @@ class Mergeable(ABC):
     def prepare_data(self) -> pd.DataFrame:
         raise NotImplementedError
 
+    @classmethod
+    def create_constraint(cls, connection: Connection) -> None:
+        pass
+
+    @classmethod
+    def key_id(cls) -> str:
+        """
+        Cypher expression of the id which joins the `key` columns of a `row`, so that
+        `upsert()` and `delete()` of nodes with a composite key identify them alike.
+        """
+        return ' + "," + '.join(f'coalesce(row.{column}, "")' for column in cls.key)
+
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
+        """Creates or updates what the rows (by default all prepared data) describe."""
+        raise NotImplementedError
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        """Removes what the key columns of the rows identify."""
+        raise NotImplementedError
+
+    def sync(self, connection: Connection, snapshot: Snapshot) -> Delta:
+        """
+        Only sends the rows which changed since the `snapshot` of the previous load,
+        the snapshot is updated once they are committed.
+        """
+        self.create_constraint(connection)
+        delta: Delta = snapshot.delta(self.data())
+
+        if len(delta.deletes) > 0:
+            self.delete(connection, delta.deletes)
+        if len(delta.inserts) + len(delta.updates) > 0:
+            self.upsert(connection, delta.upserts)
+
+        snapshot.commit()
+        return delta
+
+    def import_files(self) -> Sequence[ImportFile]:
+        """The nodes and relationships which `merge()` would create, for an offline import."""
+        raise NotImplementedError
+
+    def prefetch(self) -> None:
+        """Prepares the data ahead of `merge()`, e.g. while other steps are merged."""
+        self._prepared: Optional[pd.DataFrame] = self.prepare_data()
+
+    def data(self) -> pd.DataFrame:
+        """The prefetched data (only once, to free its memory) or freshly prepared data."""
+        prepared: Optional[pd.DataFrame] = self.__dict__.pop("_prepared", None)
+        return prepared if prepared is not None else self.prepare_data()
+
+
+class StepTiming(NamedTuple):
+    """
+    Seconds spent on a step, `merge` covers writing its import files in `export_all()`.
+    The `start` and `end` of the merge are relative to the start of all steps.
+    """
+
+    step: str
+    prepare: float
+    merge: float
+    start: float
+    end: float
+
 
 class Steps:
     def __init__(self, *steps: Mergeable) -> None:
@@ -25,9 +115,151 @@ class Steps:
         self._steps.extend(steps)
         return self
 
-    def merge_all(self, connection: Connection) -> None:
-        for step in self._steps:
-            step.merge(connection)
+    def __iter__(self) -> Iterator[Mergeable]:
+        return iter(self._steps)
+
+    def dependencies(self) -> Dict[int, Set[int]]:
+        """Positions of the steps which every step requires, among the steps at hand."""
+        return {
+            i: {
+                j
+                for j, other in enumerate(self._steps)
+                if j != i and isinstance(other, step.requires)
+            }
+            for i, step in enumerate(self._steps)
+        }
+
+    def merge_all(
+        self, connection: Connection, workers: Optional[int] = None
+    ) -> Sequence[StepTiming]:
+        """
+        Prepares the data of all steps concurrently and merges every step as soon as the
+        steps it requires are merged, on up to `workers` threads (one per step by default).
+        A step has committed all its batches before the steps which require it start,
+        so relationships always find their nodes.
+        """
+        return self._run(lambda step: step.merge(connection), workers=workers)
+
+    def sync_all(
+        self, connection: Connection, folder: Path, workers: Optional[int] = None
+    ) -> Sequence[StepTiming]:
+        """
+        Like `merge_all()`, but every step only sends the rows which changed since the
+        previous sync, compared to its snapshot in `folder` (see `Mergeable.sync()`).
+        Nodes which a step creates or deletes have lost the relationships and properties of
+        the steps which require it, so their rows which reference them are sent again.
+        """
+        changed: Dict[Type[Mergeable], pd.DataFrame] = {}
+
+        def sync(step: Mergeable) -> None:
+            snapshot: Snapshot = Snapshot(
+                folder / f"{type(step).__name__}.parquet", key=step.key
+            )
+            for column, required in step.references.items():
+                for kind, keys in list(changed.items()):
+                    if issubclass(kind, required):
+                        snapshot.forget(column, keys[required.key[0]])
+
+            delta: Delta = step.sync(connection, snapshot)
+            changed[type(step)] = pd.concat(
+                [delta.inserts[list(step.key)], delta.deletes[list(step.key)]]
+            )
+
+        return self._run(sync, workers=workers)
+
+    def _run(
+        self, action: Callable[[Mergeable], Any], *, workers: Optional[int]
+    ) -> Sequence[StepTiming]:
+        dependencies: Dict[int, Set[int]] = self.dependencies()
+        origin: float = time.perf_counter()
+        prepare: Dict[int, float] = {}
+        timings: Dict[int, StepTiming] = {}
+
+        def prefetch(i: int) -> None:
+            start: float = time.perf_counter()
+            self._steps[i].prefetch()
+            prepare[i] = time.perf_counter() - start
+
+        def merge(i: int) -> None:
+            start: float = time.perf_counter()
+            # an instrumented connection attributes the queries to the step
+            with query_step(type(self._steps[i]).__name__):
+                action(self._steps[i])
+            end: float = time.perf_counter()
+            timings[i] = StepTiming(
+                step=type(self._steps[i]).__name__,
+                prepare=prepare[i],
+                merge=end - start,
+                start=start - origin,
+                end=end - origin,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers or max(1, len(self._steps))) as executor:
+            running: Dict[Future[None], Tuple[str, int]] = {
+                executor.submit(prefetch, i): ("prepared", i) for i in range(len(self._steps))
+            }
+            prepared: Set[int] = set()
+            merged: Set[int] = set()
+            started: Set[int] = set()
+
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, i = running.pop(future)
+                        future.result()
+                        (prepared if stage == "prepared" else merged).add(i)
+
+                    for i in sorted(prepared - started):
+                        if dependencies[i] <= merged:
+                            started.add(i)
+                            running[executor.submit(merge, i)] = ("merged", i)
+
+                    if not running and len(merged) < len(self._steps):
+                        raise ValueError("The steps depend on each other in a cycle.")
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        return self._report([timings[i] for i in range(len(self._steps))])
+
+    def export_all(
+        self, bulk: BulkImport, workers: Optional[int] = None
+    ) -> Sequence[StepTiming]:
+        """
+        Writes the import files of all steps into the folder of `bulk` concurrently,
+        on up to `workers` threads (one per step by default).
+        """
+        bulk.folder.mkdir(parents=True, exist_ok=True)
+        origin: float = time.perf_counter()
+
+        def export(step: Mergeable) -> StepTiming:
+            start: float = time.perf_counter()
+            step.prefetch()
+            prepared: float = time.perf_counter()
+            for file in step.import_files():
+                bulk.add(file)
+            end: float = time.perf_counter()
+            return StepTiming(
+                step=type(step).__name__,
+                prepare=prepared - start,
+                merge=end - prepared,
+                start=prepared - origin,
+                end=end - origin,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers or max(1, len(self._steps))) as executor:
+            return self._report(list(executor.map(export, self._steps)))
+
+    @classmethod
+    def _report(cls, timings: List[StepTiming]) -> List[StepTiming]:
+        for timing in timings:
+            logging.info(
+                f"{timing.step}: prepared in {timing.prepare:.1f}s, "
+                f"done in {timing.merge:.1f}s ({timing.start:.1f}s - {timing.end:.1f}s)"
+            )
+        return timings
 
 
-__all__ = ["Connection", "Mergeable", "Steps"]
+__all__ = ["Connection", "Mergeable", "StepTiming", "Steps"]
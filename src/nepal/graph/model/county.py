@@ -1,19 +1,28 @@
+from typing import Optional, Sequence
+
 import numpy as np
 import pandas as pd
 from neo4j import Query
 
 from nepal.datasets import CountyDistance, Dataset, Vaccinations
 
+from ..bulk import ImportFile, nodes, relationships
 from .base import Connection, Mergeable
+from .date import Date
+from .state import State
 
 
 class County(Mergeable):
+    requires = (State,)
+    key = ["FIPS"]
+    references = {"RegionCode": State}
+
     def __init__(self, dataset: Vaccinations):
         self._dataset: Dataset = dataset
 
     def merge(self, connection: Connection) -> None:
         self.create_constraint(connection)
-        self.insert_and_connect_nodes(connection)
+        self.upsert(connection)
 
     @classmethod
     def create_constraint(cls, connection: Connection) -> None:
@@ -88,12 +97,12 @@ class County(Mergeable):
             ]
         ]
 
-    def insert_and_connect_nodes(self, connection: Connection) -> None:
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
             """
             UNWIND $rows AS row
             MERGE (c:County {fips: row.FIPS})
-            ON CREATE SET 
+            SET
                 c.census = row.Census2019,
                 c.pop_under_5 = row.Under5_Pop_Pct,
                 c.pop_5_to_17 = row.Between5to17_Pop_Pct,
@@ -106,31 +115,115 @@ class County(Mergeable):
                 c.svi_d = row.SVI_D
             
             WITH c, row
+            OPTIONAL MATCH (c)-[moved:IN_STATE]->(other:State)
+            WHERE other.code <> row.RegionCode
+            DELETE moved
+
+            WITH DISTINCT c, row
             MATCH (s:State {code: row.RegionCode})
             MERGE (c)-[:IN_STATE]->(s)
             """
         )
 
-        rows: pd.DataFrame = self.prepare_data()
-        connection.insert_data(query, description="County nodes", rows=rows, batch_size=5000)
+        data: pd.DataFrame = self.data() if rows is None else rows
+        connection.insert_data(query, description="County nodes", rows=data, batch_size=5000)
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            """
+            UNWIND $rows AS row
+            MATCH (c:County {fips: row.FIPS})
+            DETACH DELETE c
+            """
+        )
+
+        connection.insert_data(query, description="Deleted counties", rows=rows)
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data()
+        return [
+            nodes(
+                "County",
+                data,
+                key=("fips", "FIPS"),
+                properties={
+                    "census": "Census2019",
+                    "pop_under_5": "Under5_Pop_Pct",
+                    "pop_5_to_17": "Between5to17_Pop_Pct",
+                    "pop_18_to_65": "Between18to65_Pop_Pct",
+                    "pop_plus_65": "Plus65_Pop_Pct",
+                    "is_metro": "Is_Metro",
+                    "svi_a": "SVI_A",
+                    "svi_b": "SVI_B",
+                    "svi_c": "SVI_C",
+                    "svi_d": "SVI_D",
+                },
+            ),
+            relationships(
+                "IN_STATE",
+                data,
+                start=("County", "FIPS"),
+                end=("State", "RegionCode"),
+                name="County_IN_STATE",
+            ),
+        ]
 
 
 class CountyDistances(Mergeable):
+    requires = (County,)
+    key = ["county1", "county2"]
+    references = {"county1": County, "county2": County}
+
     def __init__(self, dataset: CountyDistance):
         self._dataset: CountyDistance = dataset
 
     def merge(self, connection: Connection) -> None:
+        self.upsert(connection)
+
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
             """
             UNWIND $rows as row
             MATCH (a:County {fips: row.county1})
             MATCH (b:County {fips: row.county2})
-            MERGE (a)-[:IS_NEAR {weight: row.weight}]-(b)
+            MERGE (a)-[r:IS_NEAR]-(b)
+            SET r.weight = row.weight
             """
         )
 
-        rows: pd.DataFrame = self.prepare_data()
-        connection.insert_data(query, description="County distances", rows=rows)
+        data: pd.DataFrame = self.data() if rows is None else rows
+        connection.insert_data(query, description="County distances", rows=data)
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            """
+            UNWIND $rows as row
+            MATCH (:County {fips: row.county1})-[r:IS_NEAR]-(:County {fips: row.county2})
+            DELETE r
+            """
+        )
+
+        connection.insert_data(query, description="Deleted distances", rows=rows)
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data()
+
+        # the relationships are merged regardless of their direction, keep one per pair
+        swap: pd.Series = data["county1"] > data["county2"]
+        pairs: pd.DataFrame = data.assign(
+            county1=data["county1"].where(~swap, data["county2"]),
+            county2=data["county2"].where(~swap, data["county1"]),
+        ).drop_duplicates()
+
+        return [
+            relationships(
+                "IS_NEAR",
+                pairs,
+                start=("County", "county1"),
+                end=("County", "county2"),
+                properties={"weight": "weight"},
+            )
+        ]
 
     def prepare_data(self) -> pd.DataFrame:
         radius: int = int(self._dataset.radius)
@@ -141,12 +234,16 @@ class CountyDistances(Mergeable):
 
 
 class CountyVaccinations(Mergeable):
+    requires = (Date, County)
+    key = ["FIPS", "Date"]
+    references = {"FIPS": County}
+
     def __init__(self, dataset: Vaccinations):
         self._dataset: Dataset = dataset
 
     def merge(self, connection: Connection) -> None:
         self.create_constraint(connection)
-        self.insert_nodes(connection)
+        self.upsert(connection)
 
     @classmethod
     def create_constraint(cls, connection: Connection) -> None:
@@ -175,12 +272,12 @@ class CountyVaccinations(Mergeable):
             ]
         ]
 
-    def insert_nodes(self, connection: Connection) -> None:
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
-            """
+            f"""
             UNWIND $rows AS row
-            MERGE (v:Vaccinations {id: coalesce(row.FIPS, "") + ',' + coalesce(row.Date, "")})
-            ON CREATE SET 
+            MERGE (v:Vaccinations {{id: {self.key_id()}}})
+            SET
                 v.completeness = row.Completeness_pct,
                 v.dose1_pop = row.Administered_Dose1_Pop_Pct,
                 v.dose1_18plus = row.Administered_Dose1_Recip_18PlusPop_Pct,
@@ -194,13 +291,61 @@ class CountyVaccinations(Mergeable):
                 v.booster_65plus = row.Booster_Doses_65Plus_Vax_Pct
             
             WITH v, row
-            MATCH (d:Date {id: date(row.Date)})
-            MATCH (c:County {fips: row.FIPS})
+            MATCH (d:Date {{id: date(row.Date)}})
+            MATCH (c:County {{fips: row.FIPS}})
             MERGE (c)<-[:IN_COUNTY]-(v)-[:REPORTED_ON]->(d)
             """
         )
 
-        rows: pd.DataFrame = self.prepare_data()
+        data: pd.DataFrame = self.data() if rows is None else rows
+        connection.insert_data(
+            query, description="Vaccination nodes", rows=data, batch_size=5000
+        )
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (v:Vaccinations {{id: {self.key_id()}}})
+            DETACH DELETE v
+            """
+        )
+
         connection.insert_data(
-            query, description="Vaccination nodes", rows=rows, batch_size=5000
+            query, description="Deleted vaccinations", rows=rows, batch_size=5000
         )
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data()
+
+        # vaccinations are only created together with their county and date
+        data = data.dropna(subset=["FIPS", "Date"])
+        data = data.assign(
+            id=data["FIPS"] + "," + data["Date"].astype(str), day=data["Date"].astype(str)
+        )
+        return [
+            nodes(
+                "Vaccinations",
+                data,
+                key=("id", "id"),
+                properties={
+                    "completeness": "Completeness_pct",
+                    "dose1_pop": "Administered_Dose1_Pop_Pct",
+                    "dose1_18plus": "Administered_Dose1_Recip_18PlusPop_Pct",
+                    "dose1_65plus": "Administered_Dose1_Recip_65PlusPop_Pct",
+                    "series_complete": "Series_Complete_Pop_Pct",
+                    "series_complete_18plus": "Series_Complete_18PlusPop_Pct",
+                    "series_complete_65plus": "Series_Complete_65PlusPop_Pct",
+                    "booster_pop": "Booster_Doses_Vax_Pct",
+                    "booster_18plus": "Booster_Doses_18Plus_Vax_Pct",
+                    "booster_50plus": "Booster_Doses_50Plus_Vax_Pct",
+                    "booster_65plus": "Booster_Doses_65Plus_Vax_Pct",
+                },
+            ),
+            relationships(
+                "IN_COUNTY", data, start=("Vaccinations", "id"), end=("County", "FIPS")
+            ),
+            relationships(
+                "REPORTED_ON", data, start=("Vaccinations", "id"), end=("Date", "day")
+            ),
+        ]
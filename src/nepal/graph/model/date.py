@@ -1,18 +1,24 @@
+from typing import Optional, Sequence
+
 import pandas as pd
 from neo4j import Query
 
 from nepal.datasets import Dataset, NYTimes
 
+from ..bulk import ImportFile, nodes, relationships
+from ..delta import Delta, Snapshot
 from .base import Connection, Mergeable
 
 
 class Date(Mergeable):
+    key = ["date"]
+
     def __init__(self, dataset: NYTimes):
         self._dataset: Dataset = dataset
 
     def merge(self, connection: Connection) -> None:
         self.create_constraint(connection)
-        self.insert_nodes(connection)
+        self.upsert(connection)
         self.connect_nodes(connection)
 
     @classmethod
@@ -26,7 +32,13 @@ class Date(Mergeable):
 
         return data[["date"]].drop_duplicates()
 
-    def insert_nodes(self, connection: Connection) -> None:
+    def sync(self, connection: Connection, snapshot: Snapshot) -> Delta:
+        delta: Delta = super().sync(connection, snapshot)
+        if len(delta.inserts) > 0:
+            self.connect_nodes(connection)
+        return delta
+
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
             """
             UNWIND $rows AS row
@@ -34,9 +46,32 @@ class Date(Mergeable):
             """
         )
 
-        data: pd.DataFrame = self.prepare_data()
+        data: pd.DataFrame = self.data() if rows is None else rows
         return connection.insert_data(query, description="Date nodes", rows=data)
 
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            """
+            UNWIND $rows AS row
+            MATCH (d:Date {id: date(row.date)})
+            DETACH DELETE d
+            """
+        )
+
+        connection.insert_data(query, description="Deleted dates", rows=rows)
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data().dropna()
+        previous: pd.Series = data["date"] - pd.Timedelta(days=1)
+        after: pd.DataFrame = pd.DataFrame({"date": data["date"], "previous": previous})[
+            previous.isin(data["date"])
+        ]
+
+        return [
+            nodes("Date", data, key=("id", "date"), key_type="date"),
+            relationships("IS_AFTER", after, start=("Date", "date"), end=("Date", "previous")),
+        ]
+
     @classmethod
     def connect_nodes(cls, connection: Connection) -> None:
         query: Query = Query(
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, ClassVar, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from neo4j import Query, Record
+
+from nepal.datasets import GovernmentResponse, Vaccinations
+
+from ..connection import date_strings, pairwise
+from .base import Connection, Mergeable
+from .county import County, CountyVaccinations
+from .state import State, StateMeasures
+
+
+class SeriesSchema(Mergeable):
+    """
+    Stores the daily metrics of an entity as date-ordered list properties on its node,
+    instead of a node per entity and day with two relationships. A few thousand nodes then
+    hold the same data as millions of nodes and relationships, and `MERGE` matches them
+    on their unique key rather than on concatenated strings.
+    """
+
+    # label, key property and key column of the nodes which hold the lists
+    label: ClassVar[str]
+    key_property: ClassVar[str]
+    key_column: ClassVar[str]
+    # the column of the days, and the list property they are stored in
+    date: ClassVar[str]
+    dates: ClassVar[str]
+    # list properties and the columns of their values
+    metrics: ClassVar[Mapping[str, str]]
+    # progress bar and rows per batch, every row holds all days of an entity
+    description: ClassVar[str]
+    batch_size: ClassVar[int]
+
+    def merge(self, connection: Connection) -> None:
+        self.upsert(connection)
+
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
+        data: pd.DataFrame = self.data() if rows is None else rows
+        connection.insert_data(
+            self.upsert_query(),
+            description=self.description,
+            rows=data,
+            batch_size=self.batch_size,
+        )
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        connection.insert_data(
+            self.delete_query(), description=f"Deleted {self.description.lower()}", rows=rows
+        )
+
+    @classmethod
+    def to_series(cls, data: pd.DataFrame) -> pd.DataFrame:
+        """One row per entity, its dates and metrics as lists ordered by date."""
+        rows: pd.DataFrame = data.dropna(subset=[cls.key_column, cls.date])
+        rows = rows.sort_values([cls.key_column, cls.date], kind="stable").drop_duplicates(
+            subset=[cls.key_column, cls.date], keep="last"
+        )
+
+        # the rows of every entity are contiguous now, slice the columns at their boundaries
+        keys: npt.NDArray[Any] = rows[cls.key_column].to_numpy()
+        bounds: List[int] = [
+            0,
+            *(np.flatnonzero(keys[1:] != keys[:-1]) + 1).tolist(),
+            len(keys),
+        ]
+        slices: List[slice] = [slice(start, stop) for start, stop in pairwise(bounds)]
+
+        columns: Dict[str, npt.NDArray[Any]] = {
+            cls.date: date_strings(rows[cls.date]),
+            **{
+                column: rows[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                for column in cls.metrics.values()
+            },
+        }
+        return pd.DataFrame(
+            {
+                cls.key_column: [keys[part.start] for part in slices],
+                **{
+                    column: [values[part].tolist() for part in slices]
+                    for column, values in columns.items()
+                },
+            }
+        )
+
+    @classmethod
+    def read(cls, connection: Connection, keys: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Reads the metrics back as a frame indexed by key and date, one row per day."""
+        condition: str = f"AND n.{cls.key_property} IN $keys" if keys is not None else ""
+        metrics: str = ", ".join(f"n.{prop} AS {prop}" for prop in cls.metrics)
+        query: Query = Query(
+            f"""
+            MATCH (n:{cls.label})
+            WHERE n.{cls.dates} IS NOT NULL {condition}
+            RETURN n.{cls.key_property} AS key, [d IN n.{cls.dates} | toString(d)] AS dates,
+                {metrics}
+            """
+        )
+
+        records: Sequence[Record] = connection.query(
+            query, parameters={"keys": list(keys) if keys is not None else None}
+        )
+        lengths: List[int] = [len(record["dates"]) for record in records]
+        index: pd.MultiIndex = pd.MultiIndex.from_arrays(
+            [
+                np.repeat(
+                    np.array([record["key"] for record in records], dtype=object), lengths
+                ),
+                pd.to_datetime(_flatten(records, "dates")),
+            ],
+            names=[cls.key_column, cls.date],
+        )
+        return pd.DataFrame(
+            {
+                column: np.asarray(_flatten(records, prop), dtype=np.float64)
+                for prop, column in cls.metrics.items()
+            },
+            index=index,
+        )
+
+    @classmethod
+    def upsert_query(cls) -> Query:
+        assignments: str = ",\n".join(
+            [
+                f"n.{cls.dates} = [d IN row.{cls.date} | date(d)]",
+                *(f"n.{prop} = row.{column}" for prop, column in cls.metrics.items()),
+            ]
+        )
+        return Query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (n:{cls.label} {{{cls.key_property}: row.{cls.key_column}}})
+            SET {assignments}
+            """
+        )
+
+    @classmethod
+    def delete_query(cls) -> Query:
+        return Query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (n:{cls.label} {{{cls.key_property}: row.{cls.key_column}}})
+            REMOVE {", ".join(f"n.{prop}" for prop in [cls.dates, *cls.metrics])}
+            """
+        )
+
+
+class CountyVaccinationSeries(SeriesSchema):
+    """Vaccinations as list properties of the counties, see `SeriesSchema`."""
+
+    requires = (County,)
+    key = ["FIPS"]
+    references = {"FIPS": County}
+    description = "Vaccination series"
+    batch_size = 100
+
+    label = "County"
+    key_property = "fips"
+    key_column = "FIPS"
+    date = "Date"
+    dates = "vaccination_dates"
+    metrics = {
+        "completeness": "Completeness_pct",
+        "dose1_pop": "Administered_Dose1_Pop_Pct",
+        "dose1_18plus": "Administered_Dose1_Recip_18PlusPop_Pct",
+        "dose1_65plus": "Administered_Dose1_Recip_65PlusPop_Pct",
+        "series_complete": "Series_Complete_Pop_Pct",
+        "series_complete_18plus": "Series_Complete_18PlusPop_Pct",
+        "series_complete_65plus": "Series_Complete_65PlusPop_Pct",
+        "booster_pop": "Booster_Doses_Vax_Pct",
+        "booster_18plus": "Booster_Doses_18Plus_Vax_Pct",
+        "booster_50plus": "Booster_Doses_50Plus_Vax_Pct",
+        "booster_65plus": "Booster_Doses_65Plus_Vax_Pct",
+    }
+
+    def __init__(self, dataset: Vaccinations):
+        self._nodes: CountyVaccinations = CountyVaccinations(dataset)
+
+    def prepare_data(self) -> pd.DataFrame:
+        return self.to_series(self._nodes.prepare_data())
+
+
+class StateMeasureSeries(SeriesSchema):
+    """Government measures as list properties of the states, see `SeriesSchema`."""
+
+    requires = (State,)
+    key = ["RegionCode"]
+    references = {"RegionCode": State}
+    description = "Measure series"
+    batch_size = 10
+
+    label = "State"
+    key_property = "code"
+    key_column = "RegionCode"
+    date = "Date"
+    dates = "measure_dates"
+    metrics = {
+        "stringency": "StringencyIndex",
+        "government_response": "GovernmentResponseIndex",
+        "containment_health": "ContainmentHealthIndex",
+        "economic_support": "EconomicSupportIndex",
+    }
+
+    def __init__(self, dataset: GovernmentResponse):
+        self._nodes: StateMeasures = StateMeasures(dataset)
+
+    def prepare_data(self) -> pd.DataFrame:
+        return self.to_series(self._nodes.prepare_data())
+
+
+def _flatten(records: Sequence[Record], field: str) -> List[Any]:
+    return list(itertools.chain.from_iterable(record[field] for record in records))
+
+
+__all__ = ["CountyVaccinationSeries", "SeriesSchema", "StateMeasureSeries"]
@@ -1,18 +1,24 @@
+from typing import Optional, Sequence
+
 import pandas as pd
 from neo4j import Query
 
 from nepal.datasets import Dataset, GovernmentResponse
 
+from ..bulk import ImportFile, nodes, relationships
 from .base import Connection, Mergeable
+from .date import Date
 
 
 class State(Mergeable):
+    key = ["RegionCode"]
+
     def __init__(self, dataset: GovernmentResponse):
         self._dataset: Dataset = dataset
 
     def merge(self, connection: Connection) -> None:
         self.create_constraint(connection)
-        self.insert_nodes(connection)
+        self.upsert(connection)
 
     @classmethod
     def create_constraint(cls, connection: Connection) -> None:
@@ -28,26 +34,47 @@ class State(Mergeable):
         data_us: pd.DataFrame = data[data["CountryName"] == "United States"]
         return data_us[["RegionName", "RegionCode"]].dropna()
 
-    def insert_nodes(self, connection: Connection) -> None:
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
             """
             UNWIND $rows AS row
             MERGE (s:State {code: row.RegionCode})
-            ON CREATE SET s.name = row.RegionName
+            SET s.name = row.RegionName
             """
         )
 
-        data: pd.DataFrame = self.prepare_data()
+        data: pd.DataFrame = self.data() if rows is None else rows
         return connection.insert_data(query, description="State nodes", rows=data)
 
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            """
+            UNWIND $rows AS row
+            MATCH (s:State {code: row.RegionCode})
+            DETACH DELETE s
+            """
+        )
+
+        connection.insert_data(query, description="Deleted states", rows=rows)
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data()
+        return [
+            nodes("State", data, key=("code", "RegionCode"), properties={"name": "RegionName"})
+        ]
+
 
 class StateMeasures(Mergeable):
+    requires = (Date, State)
+    key = ["RegionCode", "Date"]
+    references = {"RegionCode": State}
+
     def __init__(self, dataset: GovernmentResponse):
         self._dataset: Dataset = dataset
 
     def merge(self, connection: Connection) -> None:
         self.create_constraint(connection)
-        self.insert_nodes(connection)
+        self.upsert(connection)
 
     @classmethod
     def create_constraint(cls, connection: Connection) -> None:
@@ -58,28 +85,69 @@ class StateMeasures(Mergeable):
             """
         )
 
-    def insert_nodes(self, connection: Connection) -> None:
+    def upsert(self, connection: Connection, rows: Optional[pd.DataFrame] = None) -> None:
         query: Query = Query(
-            """
+            f"""
             UNWIND $rows AS row
-            MERGE (m:Measures {id: coalesce(row.RegionCode, "") + "," + coalesce(row.Date, "")})
-            ON CREATE SET 
+            MERGE (m:Measures {{id: {self.key_id()}}})
+            SET
                 m.stringency = row.StringencyIndex,
                 m.government_response = row.GovernmentResponseIndex,
                 m.containment_health = row.ContainmentHealthIndex,
-                m.economic_support = row.economicSupportIndex
+                m.economic_support = row.EconomicSupportIndex
             
             WITH m, row
-            MATCH (d:Date {id: date(row.Date)})
-            MATCH (s:State {code: row.RegionCode})
+            MATCH (d:Date {{id: date(row.Date)}})
+            MATCH (s:State {{code: row.RegionCode}})
             MERGE (s)<-[:IN_STATE]-(m)-[:ACTIVE_ON]->(d)
         """
         )
 
-        rows: pd.DataFrame = self.prepare_data()
+        data: pd.DataFrame = self.data() if rows is None else rows
+        connection.insert_data(
+            query, description="Government measures", rows=data, batch_size=5000
+        )
+
+    def delete(self, connection: Connection, rows: pd.DataFrame) -> None:
+        query: Query = Query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (m:Measures {{id: {self.key_id()}}})
+            DETACH DELETE m
+            """
+        )
+
         connection.insert_data(
-            query, description="Government measures", rows=rows, batch_size=5000
+            query, description="Deleted measures", rows=rows, batch_size=5000
+        )
+
+    def import_files(self) -> Sequence[ImportFile]:
+        data: pd.DataFrame = self.data()
+        data = data.assign(
+            id=data["RegionCode"] + "," + data["Date"].astype(str),
+            day=data["Date"].astype(str),
         )
+        return [
+            nodes(
+                "Measures",
+                data,
+                key=("id", "id"),
+                properties={
+                    "stringency": "StringencyIndex",
+                    "government_response": "GovernmentResponseIndex",
+                    "containment_health": "ContainmentHealthIndex",
+                    "economic_support": "EconomicSupportIndex",
+                },
+            ),
+            relationships(
+                "IN_STATE",
+                data,
+                start=("Measures", "id"),
+                end=("State", "RegionCode"),
+                name="Measures_IN_STATE",
+            ),
+            relationships("ACTIVE_ON", data, start=("Measures", "id"), end=("Date", "day")),
+        ]
 
     def prepare_data(self) -> pd.DataFrame:
         data: pd.DataFrame = self._dataset.load()
@@ -1,33 +1,105 @@
 from __future__ import annotations
 
-from typing import Any, Hashable, Mapping, Sequence
+import logging
+import shlex
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Final, Hashable, Literal, Mapping, Optional, Sequence
 
-from nepal.datasets import CountyDistance, GovernmentResponse, NYTimes, Vaccinations
+from nepal.datasets import (
+    CountyDistance,
+    Dataset,
+    GovernmentResponse,
+    NYTimes,
+    Vaccinations,
+)
 
+from .bulk import BulkImport
 from .connection import LocalConnection, Neo4jConnection
+from .instrumentation import QueryLog
 from .model import (
     County,
     CountyDistances,
     CountyVaccinations,
+    CountyVaccinationSeries,
     Date,
     State,
     StateMeasures,
+    StateMeasureSeries,
     Steps,
+    StepTiming,
 )
 
 
 class GraphDB:
+    snapshots: Final[Path] = Dataset.ROOT_DIR / "snapshots"
+
     def __init__(self, connection: Neo4jConnection):
         self._connection: Neo4jConnection = connection
 
     @classmethod
-    def local(cls, db: str, pwd: str) -> GraphDB:
-        return cls(LocalConnection(database=db, password=pwd))
+    def local(cls, db: str, pwd: str, writers: int = 1) -> GraphDB:
+        return cls(LocalConnection(database=db, password=pwd, writers=writers))
 
     def close(self) -> None:
         self._connection.close()
 
-    def populate_database(self, full_load: bool = False) -> None:
+    def instrument(self, profile: Optional[Callable[[str], bool]] = None) -> QueryLog:
+        """
+        Records every query of the following loads, the queries which `profile` selects
+        by their text are run with `PROFILE`. Its `report()` sums them up per step and
+        `write_trace()` shows them on a timeline, see `QueryLog`.
+        """
+        return self._connection.instrument(QueryLog(profile=profile))
+
+    def populate_database(
+        self,
+        full_load: bool = False,
+        workers: Optional[int] = None,
+        mode: Literal["merge", "sync", "bulk"] = "merge",
+        folder: Optional[Path] = None,
+        schema: Literal["nodes", "series"] = "nodes",
+    ) -> Sequence[StepTiming]:
+        """
+        Merges the steps on up to `workers` threads, see `Steps.merge_all()`.
+
+        The `sync` mode only sends the rows which were added, changed or removed since the
+        previous sync, by comparing them to snapshots of that load (see `Steps.sync_all()`).
+        The `bulk` mode writes the steps as CSV files into `folder` instead, which
+        `neo4j-admin import` loads into an empty database far faster (its command is logged).
+        Once the database is started again, `create_constraints()` adds the constraints.
+
+        With the `series` schema, a full load stores vaccinations and measures as lists on
+        the county and state nodes instead of a node per day, see `SeriesSchema`.
+        """
+        if mode == "bulk" and schema == "series":
+            raise ValueError("Bulk imports only support the node schema.")
+
+        steps: Steps = self.steps(full_load, schema=schema)
+        if mode == "merge":
+            return steps.merge_all(self._connection, workers=workers)
+        elif mode == "sync":
+            return steps.sync_all(self._connection, self.snapshot_folder, workers=workers)
+
+        bulk: BulkImport = BulkImport(folder or Dataset.ROOT_DIR / "import")
+        timings: Sequence[StepTiming] = steps.export_all(bulk, workers=workers)
+        logging.info(f"Import with: {shlex.join(bulk.command(self._connection.db or 'neo4j'))}")
+        return timings
+
+    @property
+    def snapshot_folder(self) -> Path:
+        return self.snapshots / (self._connection.db or "neo4j")
+
+    def create_constraints(
+        self, full_load: bool = False, schema: Literal["nodes", "series"] = "nodes"
+    ) -> None:
+        for step in self.steps(full_load, schema=schema):
+            step.create_constraint(self._connection)
+
+    @classmethod
+    def steps(
+        cls, full_load: bool = False, schema: Literal["nodes", "series"] = "nodes"
+    ) -> Steps:
         infections: NYTimes = NYTimes()
         measures: GovernmentResponse = GovernmentResponse()
         vaccinations: Vaccinations = Vaccinations()
@@ -39,17 +111,23 @@ class GraphDB:
             CountyDistances(distances),
         )
 
-        if full_load:
+        if full_load and schema == "series":
+            steps.add(
+                StateMeasureSeries(measures),
+                CountyVaccinationSeries(vaccinations),
+            )
+        elif full_load:
             steps.add(
                 Date(infections),
                 StateMeasures(measures),
                 CountyVaccinations(vaccinations),
             )
 
-        steps.merge_all(self._connection)
+        return steps
 
     def wipe_database(self) -> Sequence[Mapping[Hashable, Any]]:
-        """Remove all nodes and relationships."""
+        """Remove all nodes and relationships, the next sync loads everything again."""
+        shutil.rmtree(self.snapshot_folder, ignore_errors=True)
         return self._connection.query(
             """
             MATCH (n) 
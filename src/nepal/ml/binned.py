@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import contextlib
+import tempfile
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, Final, Iterable, Mapping, Optional, Type
+
+import lightgbm as lgb
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from nepal.datasets import Dataset
+from nepal.ml.features.tensor import Exogenous
+from nepal.ml.forecaster import LGBMForecaster
+
+
+class BinnedDataset:
+    """
+    LightGBM training data binned once over the full date range of a panel.
+
+    Every fit on a pandas frame makes LightGBM bin all features from scratch, even though
+    cross-validation folds and tuning trials mostly share the same rows. Fits on a subset
+    of this dataset reuse its bins and skip the feature histogram construction.
+    The features of every row only depend on its own past, which is why rows can be shared
+    between folds; this assumes the forecaster's transformers are causal.
+
+    Every build writes its binary file to a folder of its own, so that concurrent runs of
+    the same forecaster never load each other's bins. Used as a context manager, the
+    folder is removed on exit.
+    """
+
+    storage: Final[Path] = Dataset.ROOT_DIR / "binned"
+
+    def __init__(self, path: Path, *, index: pd.MultiIndex, params: Mapping[str, Any]) -> None:
+        self._path: Path = path
+        self._index: pd.MultiIndex = index
+        self._params: Dict[str, Any] = dict(params)
+        self._dataset: Optional[lgb.Dataset] = None
+
+    @classmethod
+    def build(
+        cls,
+        forecaster: LGBMForecaster,
+        y: pd.DataFrame,
+        Xs: Optional[Iterable[Exogenous]] = None,
+        *,
+        name: Optional[str] = None,
+    ) -> BinnedDataset:
+        X_t, y_t = forecaster.design_matrix(y, Xs or [])
+        params: Dict[str, Any] = forecaster.train_params
+
+        dataset: lgb.Dataset = lgb.Dataset(
+            X_t, label=y_t, params=params, free_raw_data=False
+        ).construct()
+
+        cls.storage.mkdir(parents=True, exist_ok=True)
+        folder: Path = Path(
+            tempfile.mkdtemp(prefix=f"{name or forecaster.name}-", dir=cls.storage)
+        )
+        path: Path = folder / "dataset.bin"
+        dataset.save_binary(str(path))
+
+        binned: BinnedDataset = cls(path, index=X_t.index, params=params)
+        binned._dataset = dataset
+        return binned
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def index(self) -> pd.MultiIndex:
+        return self._index
+
+    @property
+    def dataset(self) -> lgb.Dataset:
+        """The binned dataset, loaded from its binary file when used in another process."""
+        if self._dataset is None:
+            # the binary file is the only raw data here, which LightGBM cannot subset
+            self._dataset = lgb.Dataset(
+                str(self._path), params=self._params, free_raw_data=True
+            ).construct()
+        return self._dataset
+
+    def remove(self) -> None:
+        """Removes the binary file, after which other processes can no longer load it."""
+        self._path.unlink(missing_ok=True)
+        with contextlib.suppress(OSError):
+            self._path.parent.rmdir()
+
+    def __enter__(self) -> BinnedDataset:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.remove()
+
+    def positions(self, index: pd.Index) -> npt.NDArray[np.int64]:
+        positions: npt.NDArray[np.int64] = self._index.get_indexer(index)
+        if (positions < 0).any():
+            raise ValueError("Some rows are not part of the binned dataset.")
+        return np.sort(positions)
+
+    def subset(self, index: pd.Index) -> lgb.Dataset:
+        return self.dataset.subset(self.positions(index).tolist())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # LightGBM datasets wrap a native handle, other processes reload the binary file
+        state: Dict[str, Any] = self.__dict__.copy()
+        state["_dataset"] = None
+        return state
+
+
+__all__ = ["BinnedDataset"]
@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
 from pathlib import Path
-from typing import Final
+from typing import Any, Callable, Dict, Final, List, Mapping, Optional
 
 import pandas as pd
 
@@ -25,3 +31,107 @@ class PersistableEmbedding:
 
     def load(self) -> pd.DataFrame:
         return pd.read_parquet(self.path, engine="pyarrow")
+
+
+class EmbeddingCache:
+    """
+    Embeddings by the parameters which produced them, as Parquet files named after the
+    hash of the parameters, each with a metadata file which holds the parameters and when
+    the embedding was created and last used (nanoseconds since the epoch).
+    Beyond `max_entries`, the least recently used embeddings are removed.
+    """
+
+    storage: Final[Path] = PersistableEmbedding.destination / "cache"
+
+    def __init__(self, folder: Optional[Path] = None, *, max_entries: int = 64) -> None:
+        self._folder: Path = folder or self.storage
+        self._max_entries: int = max_entries
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def folder(self) -> Path:
+        return self._folder
+
+    @classmethod
+    def key(cls, parameters: Mapping[str, Any]) -> str:
+        text: str = json.dumps(parameters, sort_keys=True, default=repr)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    def get(self, parameters: Mapping[str, Any]) -> Optional[pd.DataFrame]:
+        key: str = self.key(parameters)
+        with self._lock:
+            metadata: Optional[Dict[str, Any]] = self._metadata(key)
+            if metadata is None:
+                return None
+
+            embedding: pd.DataFrame = pd.read_parquet(
+                self._file(key, ".parquet"), engine="pyarrow"
+            )
+            self._write_metadata(key, {**metadata, "used": time.time_ns()})
+            return embedding
+
+    def put(self, parameters: Mapping[str, Any], embedding: pd.DataFrame) -> str:
+        """Stores the embedding, its metadata file is written last to mark it as complete."""
+        key: str = self.key(parameters)
+        with self._lock:
+            self._folder.mkdir(parents=True, exist_ok=True)
+            embedding.to_parquet(self._file(key, ".parquet"), engine="pyarrow", index=True)
+
+            now: int = time.time_ns()
+            self._write_metadata(
+                key,
+                {
+                    "parameters": json.loads(json.dumps(parameters, default=repr)),
+                    "shape": list(embedding.shape),
+                    "created": now,
+                    "used": now,
+                },
+            )
+            self._evict()
+        return key
+
+    def get_or_compute(
+        self, parameters: Mapping[str, Any], compute: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        cached: Optional[pd.DataFrame] = self.get(parameters)
+        if cached is not None:
+            return cached
+
+        embedding: pd.DataFrame = compute()
+        self.put(parameters, embedding)
+        return embedding
+
+    def entries(self) -> pd.DataFrame:
+        """The key, parameters, shape and times of every embedding, most recently used first."""
+        rows: List[Dict[str, Any]] = [
+            {"key": path.stem, **json.loads(path.read_text())}
+            for path in self._folder.glob("*.json")
+        ]
+        frame: pd.DataFrame = pd.DataFrame(
+            rows, columns=["key", "parameters", "shape", "created", "used"]
+        )
+        return frame.sort_values("used", ascending=False, ignore_index=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in [*self._folder.glob("*.json"), *self._folder.glob("*.parquet")]:
+                path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        keys: List[str] = self.entries()["key"].tolist()
+        for key in keys[self._max_entries :]:
+            self._file(key, ".json").unlink(missing_ok=True)
+            self._file(key, ".parquet").unlink(missing_ok=True)
+
+    def _metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        path: Path = self._file(key, ".json")
+        if not path.is_file():
+            return None
+        metadata: Dict[str, Any] = json.loads(path.read_text())
+        return metadata
+
+    def _write_metadata(self, key: str, metadata: Mapping[str, Any]) -> None:
+        self._file(key, ".json").write_text(json.dumps(metadata))
+
+    def _file(self, key: str, suffix: str) -> Path:
+        return self._folder / f"{key}{suffix}"
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+
+class ExogenousTensor:
+    """
+    Exogenous features pre-aligned on a dense `entities x dates x features` grid.
+
+    Joining a MultiIndex DataFrame on every fit and every forecasting step is expensive,
+    while the exogenous data itself never changes. This class aligns it once,
+    after which features can be assembled through integer gather operations.
+    """
+
+    def __init__(
+        self,
+        values: npt.NDArray[Any],
+        *,
+        entities: pd.Index,
+        dates: pd.DatetimeIndex,
+        columns: Sequence[str],
+        names: Sequence[Optional[str]],
+    ) -> None:
+        if values.shape != (len(entities), len(dates), len(columns)):
+            raise ValueError(
+                f"Shape {values.shape} does not match the provided labels "
+                f"({len(entities)}, {len(dates)}, {len(columns)})."
+            )
+
+        self._values: npt.NDArray[Any] = values
+        self._entities: pd.Index = entities
+        self._dates: pd.DatetimeIndex = dates
+        self._columns: Sequence[str] = list(columns)
+        self._names: Sequence[Optional[str]] = list(names)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> ExogenousTensor:
+        """Aligns a DataFrame indexed by (entity, ..., date) onto a dense daily grid."""
+        if not isinstance(df.index, pd.MultiIndex):
+            raise ValueError("Only works for DataFrames with a MultiIndex")
+
+        keys: pd.Index = df.index.droplevel(-1)
+        timestamps: pd.DatetimeIndex = pd.DatetimeIndex(df.index.get_level_values(-1))
+
+        entities: pd.Index = keys.unique()
+        dates: pd.DatetimeIndex = pd.date_range(
+            start=timestamps.min(), end=timestamps.max(), freq="D"
+        )
+
+        values: npt.NDArray[Any] = np.full(
+            (len(entities), len(dates), len(df.columns)), np.nan, dtype="float64"
+        )
+        values[entities.get_indexer(keys), cls._days_since(timestamps, dates[0])] = df.to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+
+        return cls(
+            values, entities=entities, dates=dates, columns=df.columns, names=df.index.names
+        )
+
+    @property
+    def values(self) -> npt.NDArray[Any]:
+        return self._values
+
+    @property
+    def entities(self) -> pd.Index:
+        return self._entities
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return self._dates
+
+    @property
+    def columns(self) -> Sequence[str]:
+        return self._columns
+
+    def truncate(
+        self, before: Optional[pd.Timestamp] = None, after: Optional[pd.Timestamp] = None
+    ) -> ExogenousTensor:
+        """Restricts the date axis without copying the underlying values."""
+        start: int = 0 if before is None else int(self._dates.searchsorted(before, side="left"))
+        stop: int = (
+            len(self._dates)
+            if after is None
+            else int(self._dates.searchsorted(after, side="right"))
+        )
+
+        return ExogenousTensor(
+            self._values[:, start:stop, :],
+            entities=self._entities,
+            dates=self._dates[start:stop],
+            columns=self._columns,
+            names=self._names,
+        )
+
+    def at(self, dates: pd.DatetimeIndex) -> ExogenousTensor:
+        """Selects the given dates, which is a view if they are consecutive."""
+        positions: npt.NDArray[Any] = self._dates.get_indexer(dates)
+        if (positions < 0).any():
+            raise KeyError("Some dates are not part of the tensor.")
+
+        values: npt.NDArray[Any]
+        if len(positions) > 0 and (positions[1:] - positions[:-1] == 1).all():
+            values = self._values[:, positions[0] : positions[-1] + 1]
+        else:
+            values = self._values[:, positions]
+
+        return ExogenousTensor(
+            values,
+            entities=self._entities,
+            dates=self._dates[positions],
+            columns=self._columns,
+            names=self._names,
+        )
+
+    def select(self, entities: pd.Index) -> ExogenousTensor:
+        """Restricts the entity axis to the given entities, ignoring unknown ones."""
+        positions: npt.NDArray[Any] = self._entities.get_indexer(entities)
+        positions = positions[positions >= 0]
+
+        return ExogenousTensor(
+            self._values[positions],
+            entities=self._entities[positions],
+            dates=self._dates,
+            columns=self._columns,
+            names=self._names,
+        )
+
+    def offsets(self, index: pd.MultiIndex) -> Tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+        """Integer (entity, date) offsets of every row in the index, -1 if unknown."""
+        if index.nlevels == 2:
+            # map the (small) set of level values once, then broadcast through the codes
+            codes: npt.NDArray[Any] = index.codes[0]
+            entity: npt.NDArray[Any] = np.where(
+                codes >= 0, self._entities.get_indexer(index.levels[0])[codes], -1
+            )
+        else:
+            entity = self._entities.get_indexer(index.droplevel(-1))
+
+        codes = index.codes[-1]
+        level: pd.DatetimeIndex = pd.DatetimeIndex(index.levels[-1])
+        date: npt.NDArray[Any] = np.where(
+            codes >= 0, self._days_since(level, self._dates[0])[codes], -1
+        )
+        date[(date < 0) | (date >= len(self._dates))] = -1
+
+        return entity, date
+
+    def gather(self, index: pd.MultiIndex) -> pd.DataFrame:
+        """Equivalent of a left join of the exogenous features onto the given index."""
+        entity, date = self.offsets(index)
+        valid: npt.NDArray[Any] = (entity >= 0) & (date >= 0)
+
+        if valid.all():
+            data: npt.NDArray[Any] = self._values[entity, date]
+        else:
+            data = np.full((len(index), len(self._columns)), np.nan, dtype="float64")
+            data[valid] = self._values[entity[valid], date[valid]]
+
+        return pd.DataFrame(data, index=index, columns=self._columns)
+
+    def take(
+        self,
+        entity: npt.NDArray[Any],
+        date: npt.NDArray[Any],
+        *,
+        dtypes: Optional[Mapping[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        The rows at the (entity, date) offsets, as `offsets()` returns them, in their order.
+        With the offsets of every row and the `dtypes` of a frame, this rebuilds its rows
+        exactly, including the ones without any value.
+        """
+        levels: List[pd.Index]
+        if isinstance(self._entities, pd.MultiIndex):
+            levels = [
+                self._entities.get_level_values(level).take(entity)
+                for level in range(self._entities.nlevels)
+            ]
+        else:
+            levels = [self._entities.take(entity)]
+
+        index: pd.MultiIndex = pd.MultiIndex.from_arrays(
+            [*levels, self._dates.take(date)], names=self._names
+        )
+        frame: pd.DataFrame = pd.DataFrame(
+            self._values[entity, date], index=index, columns=self._columns
+        )
+        return frame.astype(dict(dtypes)) if dtypes is not None else frame
+
+    @classmethod
+    def _days_since(cls, timestamps: pd.DatetimeIndex, start: pd.Timestamp) -> npt.NDArray[Any]:
+        return np.asarray((timestamps - start) // pd.Timedelta(days=1), dtype="int64")
+
+
+Exogenous = Union[pd.DataFrame, ExogenousTensor]
+
+
+def join_exogenous(X: pd.DataFrame, exogenous: Exogenous) -> pd.DataFrame:
+    if isinstance(exogenous, ExogenousTensor):
+        return pd.concat([X, exogenous.gather(X.index)], axis=1, copy=False)
+    else:
+        return X.join(exogenous, how="left")
+
+
+__all__ = ["Exogenous", "ExogenousTensor", "join_exogenous"]
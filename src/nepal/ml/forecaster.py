@@ -2,17 +2,53 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Final, Iterable, Optional, TypeVar, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import joblib
 import lightgbm as lgb
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
 from sklearn.pipeline import Pipeline
 from sktime.forecasting.base import ForecastingHorizon
 
 from nepal.datasets import Dataset
+from nepal.ml.features.tensor import Exogenous, ExogenousTensor, join_exogenous
+
+if TYPE_CHECKING:
+    from nepal.ml.binned import BinnedDataset
 
 Data = TypeVar("Data", pd.DataFrame, pd.Series)
+Predict = Callable[..., npt.NDArray[Any]]
+
+
+class Forecaster(Protocol):
+    def forecast(
+        self,
+        fh: ForecastingHorizon,
+        y: pd.DataFrame,
+        *,
+        Xs: Optional[Iterable[Exogenous]] = None,
+        n_jobs: int = 1,
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        """Forecasts every series of the panel `y` over the horizon `fh`."""
 
 
 class BaseForecaster(ABC):
@@ -23,14 +59,31 @@ class BaseForecaster(ABC):
         self._lag: int = lag
         self._transformers: Pipeline = transformers or Pipeline(steps=[("passthrough", None)])
 
+    @property
+    def name(self) -> str:
+        return self._name
+
     @property
     def lag(self) -> int:
         return self._lag
 
+    @property
+    def transformers(self) -> Pipeline:
+        return self._transformers
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """The settings that determine the forecasts, which do not change by fitting."""
+        return {
+            "class": type(self).__name__,
+            "lag": self._lag,
+            "transformers": self._transformers,
+        }
+
     def fit(
         self,
         y: pd.DataFrame,
-        Xs: Optional[Iterable[pd.DataFrame]] = None,
+        Xs: Optional[Iterable[Exogenous]] = None,
         **kwargs: Any,
     ) -> BaseForecaster:
         if not Xs:
@@ -39,13 +92,11 @@ class BaseForecaster(ABC):
         return self._fit(y=y, Xs=Xs, **kwargs)
 
     @abstractmethod
-    def _fit(
-        self, y: pd.DataFrame, Xs: Iterable[pd.DataFrame], **kwargs: Any
-    ) -> BaseForecaster:
+    def _fit(self, y: pd.DataFrame, Xs: Iterable[Exogenous], **kwargs: Any) -> BaseForecaster:
         raise NotImplementedError
 
     def predict(
-        self, fh: ForecastingHorizon, Xs: Optional[Iterable[pd.DataFrame]] = None, **kwargs: Any
+        self, fh: ForecastingHorizon, Xs: Optional[Iterable[Exogenous]] = None, **kwargs: Any
     ) -> pd.DataFrame:
         if not Xs:
             Xs = []
@@ -62,13 +113,17 @@ class BaseForecaster(ABC):
         fh: ForecastingHorizon,
         y: pd.DataFrame,
         *,
-        Xs: Optional[Iterable[pd.DataFrame]] = None,
+        Xs: Optional[Iterable[Exogenous]] = None,
+        n_jobs: int = 1,
         **kwargs: Any,
     ) -> pd.DataFrame:
         if not Xs:
             Xs = []
 
-        return self._forecast(fh=fh, y=y, Xs=Xs, **kwargs)
+        if effective_n_jobs(n_jobs) == 1:
+            return self._forecast(fh=fh, y=y, Xs=Xs, **kwargs)
+        else:
+            return parallel_forecast(self, fh, y, Xs=Xs, n_jobs=n_jobs, **kwargs)
 
     @abstractmethod
     def _forecast(
@@ -76,7 +131,7 @@ class BaseForecaster(ABC):
         fh: ForecastingHorizon,
         y: pd.DataFrame,
         *,
-        Xs: Iterable[pd.DataFrame],
+        Xs: Iterable[Exogenous],
         **kwargs: Any,
     ) -> pd.DataFrame:
         raise NotImplementedError
@@ -91,7 +146,7 @@ class BaseForecaster(ABC):
             raise ValueError("Only works for DataFrame")
         else:
             if forecasting:
-                res: pd.DataFrame = self.__lagged_forecasting_features(y, lag=self.lag)
+                res: pd.DataFrame = _lagged_forecasting_features(y, lag=self.lag)
             else:
                 res = self.__lagged_training_features(y, lag=self.lag)
 
@@ -120,29 +175,6 @@ class BaseForecaster(ABC):
 
         return pd.DataFrame(data, index=y.index)
 
-    @classmethod
-    def __lagged_forecasting_features(cls, y: pd.DataFrame, *, lag: int) -> pd.DataFrame:
-        groupby_levels: Iterable[int] = range(0, y.index.nlevels - 1)
-        data: Dict[str, pd.Series] = {}
-
-        for col_name in y:
-            # keep unlagged Series
-            data[f"{col_name}_{1}"] = y[col_name]
-
-            # create lagged Series
-            for lag_ in range(2, lag + 1):
-                data[f"{col_name}_{lag_}"] = y.groupby(level=groupby_levels)[col_name].shift(
-                    lag_
-                )
-
-        res: pd.DataFrame = pd.DataFrame(data, index=y.index)
-        return cls._shift_date_index(res)
-
-    @classmethod
-    def _shift_date_index(cls, y: Data, amount: int = 1) -> Data:
-        y.index = y.index.set_levels(y.index.levels[-1].shift(amount, freq="D"), level=-1)
-        return y
-
     def persist(self) -> None:
         self.storage.mkdir(parents=True, exist_ok=True)
 
@@ -153,7 +185,53 @@ class BaseForecaster(ABC):
         return cast(BaseForecaster, joblib.load(cls.storage / f"{name}.joblib"))
 
 
-class LGBMForecaster(BaseForecaster):
+class RecursiveForecaster(BaseForecaster):
+    """
+    Forecasts recursively: every predicted day is fed back as a lagged feature
+    for the next one. Subclasses only need to provide the underlying regressor.
+    """
+
+    @abstractmethod
+    def _predict(self, X: pd.DataFrame, **kwargs: Any) -> npt.NDArray[Any]:
+        raise NotImplementedError
+
+    def _forecast(
+        self,
+        fh: ForecastingHorizon,
+        y: pd.DataFrame,
+        *,
+        Xs: Iterable[Exogenous],
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        return recursive_forecast(
+            self._predict, fh, y, Xs=Xs, lag=self.lag, transformers=self.transformers, **kwargs
+        )
+
+
+class Drift(NamedTuple):
+    """Summary of one incremental update, see `LGBMForecaster.update()`."""
+
+    cutoff: pd.Timestamp
+    rows: int
+    rounds: int
+    error_before: float
+    error_after: float
+    feature_shift: Dict[str, float]
+
+
+class DesignMatrix(NamedTuple):
+    """Features and target of every training row, see `LGBMForecaster.design_matrix()`."""
+
+    X: pd.DataFrame
+    y: pd.DataFrame
+
+    def window(self, *, before: pd.Timestamp, after: pd.Timestamp) -> DesignMatrix:
+        dates: pd.DatetimeIndex = self.X.index.get_level_values(-1)
+        rows: npt.NDArray[np.bool_] = (dates >= before) & (dates <= after)
+        return DesignMatrix(X=self.X[rows], y=self.y[rows])
+
+
+class LGBMForecaster(RecursiveForecaster):
     def __init__(
         self,
         estimator: lgb.LGBMModel,
@@ -165,83 +243,409 @@ class LGBMForecaster(BaseForecaster):
         super().__init__(name=name, lag=lag, transformers=transformers)
 
         self._model: lgb.LGBMModel = estimator
+        # the booster of the last training through `lgb.train`, which bypasses the estimator
+        self._booster: Optional[lgb.Booster] = None
+        self._reference: Optional[pd.DataFrame] = None
+        self._drift: List[Drift] = []
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # forecasters persisted before incremental updates existed lack these attributes
+        state.setdefault("_reference", None)
+        state.setdefault("_drift", [])
+        state.setdefault("_booster", None)
+        self.__dict__.update(state)
 
-    def _fit(
-        self, y: pd.DataFrame, Xs: Iterable[pd.DataFrame], **kwargs: Any
-    ) -> LGBMForecaster:
-        target: str = self.__get_target(y)
+    @property
+    def estimator(self) -> lgb.LGBMModel:
+        return self._model
+
+    @property
+    def drift(self) -> Sequence[Drift]:
+        return self._drift
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        # the number of threads does not change the model
+        params: Dict[str, Any] = self._model.get_params()
+        params.pop("n_jobs", None)
+        return {**super().config, "estimator": {"class": type(self._model).__name__, **params}}
+
+    @property
+    def booster(self) -> lgb.Booster:
+        return self._booster if self._booster is not None else self._model.booster_
+
+    @property
+    def best_iteration(self) -> Optional[int]:
+        """The boosting round chosen by early stopping, if the last fit used it."""
+        return cast(Optional[int], self.booster.best_iteration) or None
+
+    @property
+    def train_params(self) -> Dict[str, Any]:
+        """Mirrors the parameters which `LGBMModel.fit` passes on to `lgb.train`."""
+        params: Dict[str, Any] = self._model.get_params()
+        for key in ("silent", "importance_type", "n_estimators", "class_weight"):
+            params.pop(key, None)
+
+        if "verbose" not in params and "verbosity" not in params:
+            params["verbose"] = -1
+        params["objective"] = params["objective"] or "regression"
+        return params
+
+    def design_matrix(self, y: pd.DataFrame, Xs: Iterable[Exogenous]) -> DesignMatrix:
+        target: str = _get_target(y)
 
         y_trans: pd.DataFrame = self._calculate_transformed_features(y)
         y_lagged: pd.DataFrame = self._add_lagged_features(y, forecasting=False)
 
         X_t: pd.DataFrame = y_lagged.drop(columns=[target])
         for exogenous in (y_trans, *Xs):
-            X_t = X_t.join(exogenous, how="left")
+            X_t = join_exogenous(X_t, exogenous)
 
         y_t: pd.DataFrame = y_lagged[[target]]
+        return DesignMatrix(X=X_t, y=y_t)
+
+    def _fit(
+        self,
+        y: pd.DataFrame,
+        Xs: Iterable[Exogenous],
+        *,
+        dataset: Optional[BinnedDataset] = None,
+        design: Optional[DesignMatrix] = None,
+        validation: Optional[int] = None,
+        stopping_rounds: int = 10,
+        **kwargs: Any,
+    ) -> LGBMForecaster:
+        """
+        With `validation`, the most recent days of `y` are held out as evaluation set and
+        boosting stops once their loss has not improved for `stopping_rounds` rounds.
+        """
+        if dataset is not None:
+            return self._fit_binned(
+                y,
+                dataset=dataset,
+                validation=validation,
+                stopping_rounds=stopping_rounds,
+                **kwargs,
+            )
+
+        if design is not None:
+            # rows of a design matrix built over a longer period, limited to the dates of `y`
+            dates: pd.DatetimeIndex = y.index.get_level_values(-1)
+            X_t, y_t = design.window(
+                before=dates.min() + pd.Timedelta(days=self.lag), after=dates.max()
+            )
+        else:
+            X_t, y_t = self.design_matrix(y, Xs)
+
+        if validation is not None:
+            tail: npt.NDArray[np.bool_] = self._tail(X_t.index, days=validation)
+
+            kwargs["eval_set"] = [(X_t[tail], y_t[tail])]
+            kwargs["callbacks"] = [
+                *kwargs.get("callbacks", []),
+                lgb.early_stopping(stopping_rounds, verbose=False),
+            ]
+            X_t, y_t = X_t[~tail], y_t[~tail]
 
         self._model = self._model.fit(X=X_t, y=y_t, **kwargs)
+        self._booster = None
+        self._reference = self._feature_statistics(X_t)
+        self._drift = []
         return self
 
-    def _forecast(
+    def update(
         self,
-        fh: ForecastingHorizon,
         y: pd.DataFrame,
+        Xs: Optional[Iterable[Exogenous]] = None,
         *,
-        Xs: Iterable[pd.DataFrame],
+        rounds: int = 10,
+        window: Optional[int] = None,
         **kwargs: Any,
-    ) -> pd.DataFrame:
-        cutoff: pd.Timestamp = y.index.get_level_values(-1).max()
-        past: pd.Timestamp = cutoff - pd.Timedelta(days=2 * self.lag)
-        start: pd.Timestamp = cutoff + pd.Timedelta(days=1)
-
-        target: str = self.__get_target(y)
-        y_past: pd.DataFrame = y.loc[pd.IndexSlice[:, past:cutoff], :]
-
-        date: pd.Timestamp = cutoff
-        absolute: ForecastingHorizon = fh.to_absolute(cutoff=cutoff.to_period(freq="D"))
-        for period in absolute.to_pandas():
-            date = period.to_timestamp(freq="D")
+    ) -> LGBMForecaster:
+        """
+        Continues boosting the fitted model for a number of extra rounds on recent data,
+        instead of refitting on the entire history.
 
-            y_pred: pd.DataFrame = self._predict_single_iteration(
-                y=y_past, Xs=Xs, target=target, to_predict=date, **kwargs
+        `y` should hold the new days together with enough history to calculate the lagged
+        and transformed features, `window` restricts training to its most recent days.
+        Keyword arguments are passed on to `lgb.train`.
+        """
+        X_t, y_t = self.design_matrix(y, Xs or [])
+
+        cutoff: pd.Timestamp = X_t.index.get_level_values(-1).max()
+        if window is not None:
+            recent: npt.NDArray[np.bool_] = X_t.index.get_level_values(
+                -1
+            ) > cutoff - pd.Timedelta(days=window)
+            X_t, y_t = X_t[recent], y_t[recent]
+
+        error_before: float = self._absolute_error(X_t, y_t)
+
+        booster: lgb.Booster = lgb.train(
+            self.train_params,
+            train_set=lgb.Dataset(X_t, label=y_t),
+            num_boost_round=rounds,
+            init_model=self.booster,
+            **kwargs,
+        )
+        self._booster = booster
+
+        self._drift.append(
+            Drift(
+                cutoff=cutoff,
+                rows=len(X_t),
+                rounds=rounds,
+                error_before=error_before,
+                error_after=self._absolute_error(X_t, y_t),
+                feature_shift=self._feature_shift(X_t),
             )
+        )
+        return self
 
-            y_past = self._concat(y_past, y_pred)
-        return y_past.loc[pd.IndexSlice[:, start:date], :]
+    def _absolute_error(self, X: pd.DataFrame, y: pd.DataFrame) -> float:
+        return float(np.mean(np.abs(self._predict(X) - y.iloc[:, 0].to_numpy())))
 
     @classmethod
-    def __get_target(cls, y: pd.DataFrame) -> str:
-        if len(y.columns) != 1:
-            raise ValueError("More than one dependent variable defined!")
-        else:
-            target: str = y.columns[0]
-        return target
+    def _feature_statistics(cls, X: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({"mean": X.mean(), "std": X.std()})
+
+    def _feature_shift(self, X: pd.DataFrame) -> Dict[str, float]:
+        """Standardised difference between the feature means of `X` and the training data."""
+        if self._reference is None:
+            return {}
 
-    def _predict_single_iteration(
+        mean: pd.Series = X.mean()
+        std: pd.Series = self._reference["std"].replace(0, np.nan)
+        shift: pd.Series = ((mean - self._reference["mean"]) / std).fillna(0)
+        return {str(feature): float(value) for feature, value in shift.items()}
+
+    def _fit_binned(
         self,
         y: pd.DataFrame,
         *,
-        Xs: Iterable[pd.DataFrame],
-        target: str,
-        to_predict: pd.Timestamp,
+        dataset: BinnedDataset,
+        validation: Optional[int] = None,
+        stopping_rounds: int = 10,
         **kwargs: Any,
-    ) -> pd.DataFrame:
-        y_trans: pd.DataFrame = self._shift_date_index(self._calculate_transformed_features(y))
-        y_lagged: pd.DataFrame = self._add_lagged_features(y, forecasting=True)
-
-        X_t: pd.DataFrame = y_lagged.loc[pd.IndexSlice[:, to_predict], :]
-        for exogenous in (y_trans, *Xs):
-            X_t = X_t.join(exogenous, how="left")
-
-        y_pred = self._model.predict(X=self.__ffill(X_t), **kwargs)
-        return pd.DataFrame(y_pred, index=X_t.index, columns=[target])
+    ) -> LGBMForecaster:
+        """
+        Trains on the rows of a pre-binned dataset that correspond to `y`,
+        which skips building the feature histograms again.
+        Keyword arguments are passed on to `lgb.train`.
+        """
+        rows: pd.Index = self._add_lagged_features(y, forecasting=False).index
+
+        if validation is not None:
+            tail: npt.NDArray[np.bool_] = self._tail(rows, days=validation)
+
+            kwargs["valid_sets"] = [dataset.subset(rows[tail])]
+            kwargs["callbacks"] = [
+                *kwargs.get("callbacks", []),
+                lgb.early_stopping(stopping_rounds, verbose=False),
+            ]
+            rows = rows[~tail]
+
+        booster: lgb.Booster = lgb.train(
+            self.train_params,
+            train_set=dataset.subset(rows),
+            num_boost_round=self._model.n_estimators,
+            **kwargs,
+        )
+        self._booster = booster
+        self._reference = None
+        self._drift = []
+        return self
 
     @classmethod
-    def __ffill(cls, X: pd.DataFrame) -> pd.DataFrame:
-        levels: Iterable[str] = X.index.names[0:-1]
-        return X.groupby(level=levels).apply(lambda x: x.ffill())
+    def _tail(cls, index: pd.Index, *, days: int) -> npt.NDArray[np.bool_]:
+        dates: pd.DatetimeIndex = index.get_level_values(-1)
+        tail: npt.NDArray[np.bool_] = dates > dates.max() - pd.Timedelta(days=days)
+        return tail
+
+    def _predict(self, X: pd.DataFrame, **kwargs: Any) -> npt.NDArray[Any]:
+        if self._booster is not None:
+            # like the estimator, predicts with the best iteration of early stopping
+            return cast(npt.NDArray[Any], self._booster.predict(X, **kwargs))
+        return cast(npt.NDArray[Any], self._model.predict(X=X, **kwargs))
+
+
+def recursive_forecast(
+    predict: Predict,
+    fh: ForecastingHorizon,
+    y: pd.DataFrame,
+    *,
+    Xs: Iterable[Exogenous],
+    lag: int,
+    transformers: Pipeline,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Forecasts recursively: every predicted day is fed back as a lagged feature
+    for the next one. `predict` maps the features of one day to the target.
+    """
+    cutoff: pd.Timestamp = y.index.get_level_values(-1).max()
+    past: pd.Timestamp = cutoff - pd.Timedelta(days=2 * lag)
+    start: pd.Timestamp = cutoff + pd.Timedelta(days=1)
+
+    target: str = _get_target(y)
+    y_past: pd.DataFrame = y.loc[pd.IndexSlice[:, past:cutoff], :]
+
+    date: pd.Timestamp = cutoff
+    absolute: ForecastingHorizon = fh.to_absolute(cutoff=cutoff.to_period(freq="D"))
+    for period in absolute.to_pandas():
+        date = period.to_timestamp(freq="D")
+
+        y_pred: pd.DataFrame = _predict_single_iteration(
+            predict,
+            y=y_past,
+            Xs=Xs,
+            lag=lag,
+            transformers=transformers,
+            target=target,
+            to_predict=date,
+            **kwargs,
+        )
 
-    @classmethod
-    def _concat(cls, *dfs: pd.DataFrame) -> pd.DataFrame:
-        return pd.concat(dfs, join="inner", copy=False).sort_index()
+        y_past = _concat(y_past, y_pred)
+    return y_past.loc[pd.IndexSlice[:, start:date], :]
+
+
+def _predict_single_iteration(
+    predict: Predict,
+    y: pd.DataFrame,
+    *,
+    Xs: Iterable[Exogenous],
+    lag: int,
+    transformers: Pipeline,
+    target: str,
+    to_predict: pd.Timestamp,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    y_trans: pd.DataFrame = _shift_date_index(
+        transformers.fit_transform(y).drop(columns=y.columns)
+    )
+    y_lagged: pd.DataFrame = _lagged_forecasting_features(y, lag=lag).dropna()
+
+    X_t: pd.DataFrame = y_lagged.loc[pd.IndexSlice[:, to_predict], :]
+    for exogenous in (y_trans, *Xs):
+        X_t = join_exogenous(X_t, exogenous)
+
+    y_pred: npt.NDArray[Any] = predict(_ffill(X_t), **kwargs)
+    return pd.DataFrame(y_pred, index=X_t.index, columns=[target])
+
+
+def _get_target(y: pd.DataFrame) -> str:
+    if len(y.columns) != 1:
+        raise ValueError("More than one dependent variable defined!")
+    else:
+        target: str = y.columns[0]
+    return target
+
+
+def _lagged_forecasting_features(y: pd.DataFrame, *, lag: int) -> pd.DataFrame:
+    groupby_levels: Iterable[int] = range(0, y.index.nlevels - 1)
+    data: Dict[str, pd.Series] = {}
+
+    for col_name in y:
+        # keep unlagged Series
+        data[f"{col_name}_{1}"] = y[col_name]
+
+        # create lagged Series
+        for lag_ in range(2, lag + 1):
+            data[f"{col_name}_{lag_}"] = y.groupby(level=groupby_levels)[col_name].shift(lag_)
+
+    res: pd.DataFrame = pd.DataFrame(data, index=y.index)
+    return _shift_date_index(res)
+
+
+def _shift_date_index(y: Data, amount: int = 1) -> Data:
+    y.index = y.index.set_levels(y.index.levels[-1].shift(amount, freq="D"), level=-1)
+    return y
+
+
+def _ffill(X: pd.DataFrame) -> pd.DataFrame:
+    levels: Iterable[str] = X.index.names[0:-1]
+    return X.groupby(level=levels).apply(lambda x: x.ffill())
+
+
+def _concat(*dfs: pd.DataFrame) -> pd.DataFrame:
+    return pd.concat(dfs, join="inner", copy=False).sort_index()
+
+
+def parallel_forecast(
+    forecaster: Forecaster,
+    fh: ForecastingHorizon,
+    y: pd.DataFrame,
+    *,
+    Xs: Iterable[Exogenous],
+    n_jobs: int,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Every series is forecasted independently, so the entities are split into partitions
+    of balanced size, each forecasted by its own worker. The data is handed over as
+    NumPy arrays, which joblib memory-maps instead of pickling them for every worker.
+    Like in joblib, negative `n_jobs` count back from all cores (-1 uses every core).
+    """
+    if y.index.nlevels != 2:
+        raise ValueError("Parallel forecasts only work for an (entity, date) index")
+    if not y.index.is_monotonic_increasing:
+        y = y.sort_index()
+
+    entities: pd.Index = y.index.levels[0]
+    codes: npt.NDArray[Any] = y.index.codes[0]
+    dates: npt.NDArray[Any] = y.index.get_level_values(-1).to_numpy()
+    values: npt.NDArray[Any] = y.to_numpy()
+
+    aligned: List[ExogenousTensor] = [
+        X if isinstance(X, ExogenousTensor) else ExogenousTensor.from_frame(X) for X in Xs
+    ]
+
+    n_jobs = effective_n_jobs(n_jobs)
+    forecasts: List[pd.DataFrame] = Parallel(n_jobs=n_jobs, max_nbytes="1M")(
+        delayed(_forecast_partition)(
+            forecaster,
+            fh,
+            values=values[start:stop],
+            codes=codes[start:stop],
+            dates=dates[start:stop],
+            entities=entities,
+            names=y.index.names,
+            columns=y.columns,
+            Xs=aligned,
+            **kwargs,
+        )
+        for start, stop in _partitions(codes, n=n_jobs)
+    )
+    return pd.concat(forecasts, copy=False).sort_index()
+
+
+def _partitions(codes: npt.NDArray[Any], *, n: int) -> List[Tuple[int, int]]:
+    """Row ranges of about equal size, which never split the rows of one entity."""
+    starts: npt.NDArray[Any] = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    boundaries: npt.NDArray[Any] = np.asarray([0, *starts.tolist(), len(codes)])
+
+    targets: npt.NDArray[Any] = np.linspace(0, len(codes), n + 1)[1:-1]
+    cuts: List[int] = boundaries[np.searchsorted(boundaries, targets)].tolist()
+
+    edges: List[int] = sorted({0, *cuts, len(codes)})
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _forecast_partition(
+    forecaster: Forecaster,
+    fh: ForecastingHorizon,
+    *,
+    values: npt.NDArray[Any],
+    codes: npt.NDArray[Any],
+    dates: npt.NDArray[Any],
+    entities: pd.Index,
+    names: Sequence[Optional[str]],
+    columns: pd.Index,
+    Xs: Iterable[Exogenous],
+    **kwargs: Any,
+) -> pd.DataFrame:
+    index: pd.MultiIndex = pd.MultiIndex.from_arrays([entities.take(codes), dates], names=names)
+    y: pd.DataFrame = pd.DataFrame(np.array(values), index=index, columns=columns)
+
+    return forecaster.forecast(fh=fh, y=y, Xs=Xs, **kwargs)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, Optional, Protocol, Sequence, cast
+
+import joblib
+import lightgbm as lgb
+import numpy.typing as npt
+import pandas as pd
+from joblib import effective_n_jobs
+from sklearn.pipeline import Pipeline
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.features.tensor import Exogenous
+from nepal.ml.forecaster import (
+    BaseForecaster,
+    LGBMForecaster,
+    parallel_forecast,
+    recursive_forecast,
+)
+
+MANIFEST: Final[str] = "manifest.json"
+MODEL: Final[str] = "model.txt"
+TRANSFORMERS: Final[str] = "transformers.joblib"
+LIBRARY: Final[str] = "model.so"
+
+FORMAT_VERSION: Final[int] = 1
+
+
+class Predictor(Protocol):
+    def __call__(self, X: npt.NDArray[Any], **kwargs: Any) -> npt.NDArray[Any]:
+        """Predicts the target for a dense feature matrix."""
+
+
+class BoosterPredictor:
+    def __init__(self, booster: lgb.Booster) -> None:
+        self._booster: lgb.Booster = booster
+
+    @classmethod
+    def load(cls, path: Path) -> BoosterPredictor:
+        return cls(lgb.Booster(model_file=str(path)))
+
+    def __call__(self, X: npt.NDArray[Any], **kwargs: Any) -> npt.NDArray[Any]:
+        return cast(npt.NDArray[Any], self._booster.predict(X, **kwargs))
+
+
+class CompiledPredictor:
+    """Predicts through a shared library generated by treelite (optional dependency)."""
+
+    def __init__(self, path: Path) -> None:
+        try:
+            import treelite_runtime
+        except ImportError as e:
+            raise ImportError(
+                "The compiled backend requires the optional 'treelite_runtime' package."
+            ) from e
+
+        self._runtime: Any = treelite_runtime
+        self._predictor: Any = treelite_runtime.Predictor(str(path), verbose=False)
+
+    @classmethod
+    def compile(cls, model: Path, destination: Path) -> None:
+        try:
+            import treelite
+        except ImportError as e:
+            raise ImportError(
+                "Compiling a model requires the optional 'treelite' package."
+            ) from e
+
+        compiled: Any = treelite.Model.load(str(model), model_format="lightgbm")
+        compiled.export_lib(
+            toolchain="gcc",
+            libpath=str(destination),
+            params={"parallel_comp": os.cpu_count() or 1},
+            verbose=False,
+        )
+
+    def __call__(self, X: npt.NDArray[Any], **kwargs: Any) -> npt.NDArray[Any]:
+        if kwargs:
+            raise ValueError(f"The compiled backend does not support {list(kwargs)}.")
+        else:
+            return cast(npt.NDArray[Any], self._predictor.predict(self._runtime.DMatrix(X)))
+
+
+class ExportedForecaster:
+    """
+    Inference-only forecaster, rebuilt from an artefact written by `export()`.
+    It calls the LightGBM booster (or compiled trees) directly on NumPy arrays,
+    without unpickling the scikit-learn wrapper, and cannot be fitted.
+    """
+
+    backends: Final[Sequence[str]] = ("booster", "compiled")
+
+    def __init__(
+        self,
+        predictor: Predictor,
+        *,
+        features: Sequence[str],
+        lag: int,
+        transformers: Optional[Pipeline] = None,
+        name: str = "forecast",
+    ) -> None:
+        self._name: str = name
+        self._lag: int = lag
+        self._transformers: Pipeline = transformers or Pipeline(steps=[("passthrough", None)])
+        self._predictor: Predictor = predictor
+        self._features: Sequence[str] = list(features)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def lag(self) -> int:
+        return self._lag
+
+    @property
+    def transformers(self) -> Pipeline:
+        return self._transformers
+
+    @property
+    def features(self) -> Sequence[str]:
+        return self._features
+
+    @classmethod
+    def from_export(cls, folder: Path, *, backend: str = "booster") -> ExportedForecaster:
+        if backend not in cls.backends:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {cls.backends}.")
+
+        with open(folder / MANIFEST, mode="r") as handle:
+            manifest: Dict[str, Any] = json.load(handle)
+
+        if manifest["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artefact format: {manifest['format']}")
+
+        predictor: Predictor
+        if backend == "compiled":
+            if not manifest["library"]:
+                raise ValueError(f"No compiled library was exported to '{folder}'.")
+            predictor = CompiledPredictor(folder / manifest["library"])
+        else:
+            predictor = BoosterPredictor.load(folder / manifest["model"])
+
+        return cls(
+            predictor,
+            features=manifest["features"],
+            lag=manifest["lag"],
+            transformers=joblib.load(folder / manifest["transformers"]["file"]),
+            name=manifest["name"],
+        )
+
+    def forecast(
+        self,
+        fh: ForecastingHorizon,
+        y: pd.DataFrame,
+        *,
+        Xs: Optional[Iterable[Exogenous]] = None,
+        n_jobs: int = 1,
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        if not Xs:
+            Xs = []
+
+        if effective_n_jobs(n_jobs) == 1:
+            return recursive_forecast(
+                self._predict,
+                fh,
+                y,
+                Xs=Xs,
+                lag=self._lag,
+                transformers=self._transformers,
+                **kwargs,
+            )
+        else:
+            return parallel_forecast(self, fh, y, Xs=Xs, n_jobs=n_jobs, **kwargs)
+
+    def _predict(self, X: pd.DataFrame, **kwargs: Any) -> npt.NDArray[Any]:
+        return self._predictor(X[self._features].to_numpy(dtype="float64"), **kwargs)
+
+
+def export(
+    forecaster: LGBMForecaster, folder: Optional[Path] = None, *, compile: bool = False
+) -> Path:
+    """
+    Writes the fitted forecaster as a native LightGBM model file, its transformers and
+    a JSON manifest. Optionally compiles the trees into a shared library as well.
+    """
+    folder = folder or BaseForecaster.storage / forecaster.name
+    folder.mkdir(parents=True, exist_ok=True)
+
+    booster: lgb.Booster = forecaster.booster
+    booster.save_model(str(folder / MODEL))
+    joblib.dump(forecaster.transformers, folder / TRANSFORMERS)
+
+    if compile:
+        CompiledPredictor.compile(folder / MODEL, folder / LIBRARY)
+
+    manifest: Dict[str, Any] = {
+        "format": FORMAT_VERSION,
+        "name": forecaster.name,
+        "lag": forecaster.lag,
+        "features": booster.feature_name(),
+        "model": MODEL,
+        "library": LIBRARY if compile else None,
+        "transformers": {
+            "file": TRANSFORMERS,
+            "steps": [name for name, _ in forecaster.transformers.steps],
+        },
+    }
+    with open(folder / MANIFEST, mode="w") as handle:
+        json.dump(manifest, handle, indent=2)
+
+    return folder
+
+
+__all__ = ["ExportedForecaster", "export"]
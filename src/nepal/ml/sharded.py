@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import copy
+import os
+from typing import Any, Callable, Dict, Final, Hashable, Iterable, List, Mapping, Optional
+
+import pandas as pd
+from joblib import Parallel, delayed
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.features.tensor import Exogenous, ExogenousTensor
+from nepal.ml.forecaster import BaseForecaster
+
+Partitioner = Callable[[pd.Index], pd.Index]
+
+# fmt: off
+STATE_FIPS: Final[Mapping[str, str]] = {
+    "01": "AL", "02": "AK", "04": "AZ", "05": "AR", "06": "CA", "08": "CO", "09": "CT",
+    "10": "DE", "11": "DC", "12": "FL", "13": "GA", "15": "HI", "16": "ID", "17": "IL",
+    "18": "IN", "19": "IA", "20": "KS", "21": "KY", "22": "LA", "23": "ME", "24": "MD",
+    "25": "MA", "26": "MI", "27": "MN", "28": "MS", "29": "MO", "30": "MT", "31": "NE",
+    "32": "NV", "33": "NH", "34": "NJ", "35": "NM", "36": "NY", "37": "NC", "38": "ND",
+    "39": "OH", "40": "OK", "41": "OR", "42": "PA", "44": "RI", "45": "SC", "46": "SD",
+    "47": "TN", "48": "TX", "49": "UT", "50": "VT", "51": "VA", "53": "WA", "54": "WV",
+    "55": "WI", "56": "WY",
+}
+
+CENSUS_REGIONS: Final[Mapping[str, Iterable[str]]] = {
+    "Northeast": ["CT", "ME", "MA", "NH", "RI", "VT", "NJ", "NY", "PA"],
+    "Midwest": ["IL", "IN", "MI", "OH", "WI", "IA", "KS", "MN", "MO", "NE", "ND", "SD"],
+    "South": [
+        "DE", "DC", "FL", "GA", "MD", "NC", "SC", "VA", "WV",
+        "AL", "KY", "MS", "TN", "AR", "LA", "OK", "TX",
+    ],
+    "West": ["AZ", "CO", "ID", "MT", "NV", "NM", "UT", "WY", "AK", "CA", "HI", "OR", "WA"],
+}
+# fmt: on
+
+
+def state_of_county(fips: pd.Index) -> pd.Index:
+    """Partitions counties by state, the first two digits of their FIPS code."""
+    return pd.Index(fips.astype(str).str[:2])
+
+
+def census_region(codes: pd.Index) -> pd.Index:
+    """Partitions states (postal codes) or counties (FIPS codes) by census region."""
+    regions: Dict[str, str] = {
+        state: region for region, states in CENSUS_REGIONS.items() for state in states
+    }
+    states: pd.Series = pd.Series(codes.astype(str), index=codes)
+    states = states.where(~states.str.isdigit(), states.str[:2].map(STATE_FIPS))
+    return pd.Index(states.map(regions).fillna("Other"))
+
+
+class ShardedForecaster(BaseForecaster):
+    """
+    Trains one copy of a forecaster per shard of series (e.g. per state or census region),
+    in a pool of processes, and routes every series to its own shard when forecasting.
+    Shards with fewer than `min_entities` series are served by a global model instead.
+    By default, a shard needs more series than the forecaster has lags: with fewer, every
+    day of the shard holds fewer rows than lagged features and its model only memorises
+    the few series it has seen.
+    """
+
+    fallback: Final[str] = "__global__"
+
+    def __init__(
+        self,
+        forecaster: BaseForecaster,
+        *,
+        partitioner: Partitioner = state_of_county,
+        min_entities: Optional[int] = None,
+        threads: Optional[int] = None,
+        name: str = "sharded",
+    ) -> None:
+        super().__init__(name=name, lag=forecaster.lag, transformers=forecaster.transformers)
+
+        self._forecaster: BaseForecaster = forecaster
+        self._partitioner: Partitioner = partitioner
+        self._min_entities: int = forecaster.lag + 1 if min_entities is None else min_entities
+        self._threads: Optional[int] = threads
+
+        self._shards: Dict[Hashable, BaseForecaster] = {}
+        self._routes: Dict[Hashable, Hashable] = {}
+
+    @property
+    def shards(self) -> Mapping[Hashable, BaseForecaster]:
+        return self._shards
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return {
+            **super().config,
+            "forecaster": self._forecaster.config,
+            "partitioner": self._partitioner,
+            "min_entities": self._min_entities,
+        }
+
+    def _fit(
+        self, y: pd.DataFrame, Xs: Iterable[Exogenous], **kwargs: Any
+    ) -> ShardedForecaster:
+        Xs = list(Xs)
+        entities: pd.Index = self._entities(y)
+        shards: pd.Series = pd.Series(self._partitioner(entities), index=entities)
+
+        sizes: pd.Series = shards.value_counts()
+        small: pd.Index = sizes.index[sizes < self._min_entities]
+        routes: pd.Series = shards.where(~shards.isin(small), self.fallback)
+
+        members: Dict[Hashable, pd.Index] = {
+            shard: pd.Index(group.index) for shard, group in routes.groupby(routes)
+        }
+        if len(small) > 0:
+            members[self.fallback] = entities
+
+        fitted: List[BaseForecaster] = Parallel(n_jobs=self._threads or os.cpu_count())(
+            delayed(_fit_shard)(
+                copy.deepcopy(self._forecaster),
+                y=self._select(y, entities=shard_entities),
+                Xs=[self._select(X, entities=shard_entities) for X in Xs],
+                **kwargs,
+            )
+            for shard_entities in members.values()
+        )
+
+        self._shards = dict(zip(members.keys(), fitted))
+        self._routes = routes.to_dict()
+        return self
+
+    def _forecast(
+        self,
+        fh: ForecastingHorizon,
+        y: pd.DataFrame,
+        *,
+        Xs: Iterable[Exogenous],
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        entities: pd.Index = self._entities(y)
+        routes: pd.Series = pd.Series([self._route(e) for e in entities], index=entities)
+
+        Xs = list(Xs)
+        forecasts: List[pd.DataFrame] = Parallel(n_jobs=self._threads or os.cpu_count())(
+            delayed(self._shards[shard].forecast)(
+                fh=fh,
+                y=self._select(y, entities=pd.Index(group.index)),
+                Xs=[self._select(X, entities=pd.Index(group.index)) for X in Xs],
+                **kwargs,
+            )
+            for shard, group in routes.groupby(routes)
+        )
+        return pd.concat(forecasts, copy=False).sort_index()
+
+    def _route(self, entity: Hashable) -> Hashable:
+        if entity in self._routes:
+            shard: Hashable = self._routes[entity]
+        else:
+            shard = self._partitioner(pd.Index([entity]))[0]
+
+        if shard in self._shards:
+            return shard
+        elif self.fallback in self._shards:
+            return self.fallback
+        else:
+            raise ValueError(f"No shard was trained for '{entity}' and there is no fallback.")
+
+    @classmethod
+    def _entities(cls, y: pd.DataFrame) -> pd.Index:
+        return y.index.droplevel(-1).unique()
+
+    @classmethod
+    def _select(cls, data: Exogenous, *, entities: pd.Index) -> Exogenous:
+        if isinstance(data, ExogenousTensor):
+            return data.select(entities)
+        else:
+            return data[data.index.droplevel(-1).isin(entities)]
+
+
+def _fit_shard(
+    forecaster: BaseForecaster, *, y: pd.DataFrame, Xs: Iterable[Exogenous], **kwargs: Any
+) -> BaseForecaster:
+    return forecaster.fit(y=y, Xs=Xs, **kwargs)
+
+
+__all__ = ["ShardedForecaster", "census_region", "state_of_county"]
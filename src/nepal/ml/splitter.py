@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from typing import Iterator, Tuple, Union, cast
+from typing import Any, Dict, Iterator, Tuple, Union, cast
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 from sktime.forecasting.base import ForecastingHorizon
 from sktime.forecasting.model_selection import (
@@ -18,6 +20,8 @@ BaseSplitter = Union[
     SlidingWindowSplitter,
 ]
 
+Positions = Union[slice, npt.NDArray[np.intp]]
+
 
 class Splitter:
     def __init__(self, splitter: BaseSplitter) -> None:
@@ -27,23 +31,57 @@ class Splitter:
     def fh(self) -> ForecastingHorizon:
         return self._splitter.fh
 
+    @property
+    def config(self) -> Dict[str, Any]:
+        return {"class": type(self._splitter).__name__, **vars(self._splitter)}
+
     def train_test_splits(self, y: pd.DataFrame) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
         return self.generate_window_splits(y=y)
 
     def generate_window_splits(
         self, y: pd.DataFrame
     ) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
-        dates: pd.DataFrame = self._datetimeindex(y).to_frame()
+        for train, test in self.window_positions(y):
+            yield y.iloc[train], y.iloc[test]
+
+    def date_windows(
+        self, y: pd.DataFrame
+    ) -> Iterator[Tuple[pd.DatetimeIndex, pd.DatetimeIndex]]:
+        """The train and test dates of every split, without materialising the data."""
+        dates: pd.DatetimeIndex = self._datetimeindex(y)
 
         for train, test in self._splitter.split(dates):
-            idx_train: pd.Series = dates.iloc[train, 0]
-            idx_test: pd.Series = dates.iloc[test, 0]
+            yield dates[train], dates[test]
+
+    def window_positions(self, y: pd.DataFrame) -> Iterator[Tuple[Positions, Positions]]:
+        """
+        The row positions of every split, to be taken with `y.iloc` or on the raw values.
+        Positions that are contiguous, e.g. when the panel is sorted by date, become slices
+        which take views instead of copies.
+        """
+        dates: pd.DatetimeIndex = self._datetimeindex(y)
+        rows: npt.NDArray[np.intp] = dates.get_indexer(y.index.get_level_values(-1))
 
-            yield y.loc[pd.IndexSlice[:, idx_train], :], y.loc[pd.IndexSlice[:, idx_test], :]
+        n: int = len(dates)
+
+        for train, test in self._splitter.split(dates):
+            yield self._positions(rows, train, n=n), self._positions(rows, test, n=n)
 
     def get_n_splits(self, y: pd.DataFrame) -> int:
-        dates: pd.DataFrame = self._datetimeindex(y).to_frame()
-        return cast(int, self._splitter.get_n_splits(dates))
+        return cast(int, self._splitter.get_n_splits(self._datetimeindex(y)))
+
+    @classmethod
+    def _positions(
+        cls, rows: npt.NDArray[np.intp], window: npt.NDArray[np.intp], *, n: int
+    ) -> Positions:
+        member: npt.NDArray[np.bool_] = np.zeros(n, dtype=np.bool_)
+        member[window] = True
+
+        positions: npt.NDArray[np.intp] = np.flatnonzero(member[rows])
+        if len(positions) > 0 and positions[-1] - positions[0] + 1 == len(positions):
+            return slice(int(positions[0]), int(positions[-1]) + 1)
+        else:
+            return positions
 
     @classmethod
     def _datetimeindex(cls, y: pd.DataFrame) -> pd.DatetimeIndex:
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Final, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.datasets import Dataset
+from nepal.ml.features.tensor import Exogenous, ExogenousTensor
+from nepal.ml.forecaster import BaseForecaster
+from nepal.ml.splitter import Splitter
+
+CONFIG: Final[str] = "config.json"
+
+
+class BacktestStore:
+    """
+    Keeps the forecasts and actuals of every backtest fold as Parquet files, in one folder
+    per configuration of forecaster, splitter and data (identified by its hash).
+    Other metrics or aggregations are calculated from the store without refitting,
+    and `backtest()` skips the folds which the store already holds.
+    """
+
+    storage: Final[Path] = Dataset.ROOT_DIR / "backtests"
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self._config: str = json.dumps(config, sort_keys=True, default=describe)
+        self._key: str = hashlib.sha256(self._config.encode()).hexdigest()[:16]
+        self._path: Path = self.storage / self._key
+
+    @classmethod
+    def of(
+        cls,
+        forecaster: BaseForecaster,
+        *,
+        splitter: Splitter,
+        y: pd.DataFrame,
+        Xs: Optional[Exogenous] = None,
+        binned: bool = False,
+        precompute: bool = False,
+        validation: Optional[int] = None,
+    ) -> BacktestStore:
+        """
+        The store of `backtest()` with the same arguments, the options `binned`, `precompute`
+        and `validation` change the forecasts, so they are part of its configuration.
+        """
+        return cls(
+            {
+                "forecaster": forecaster.config,
+                "splitter": splitter.config,
+                "data": fingerprint(y, Xs),
+                "options": {
+                    "binned": binned,
+                    "precompute": precompute,
+                    "validation": validation,
+                },
+            }
+        )
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = json.loads(self._config)
+        return config
+
+    def cutoffs(self) -> List[pd.Timestamp]:
+        return sorted(pd.Timestamp(path.stem) for path in self._path.glob("????-??-??.json"))
+
+    def write(
+        self,
+        *,
+        cutoff: pd.Timestamp,
+        start: pd.Timestamp,
+        y_true: pd.DataFrame,
+        y_pred: pd.DataFrame,
+        best_iteration: Optional[int] = None,
+    ) -> None:
+        """Stores one fold, its metadata file is written last to mark it as complete."""
+        self._path.mkdir(parents=True, exist_ok=True)
+        if not (self._path / CONFIG).is_file():
+            (self._path / CONFIG).write_text(self._config)
+
+        frame: pd.DataFrame = pd.DataFrame(
+            {
+                "actual": y_true.iloc[:, 0],
+                "forecast": y_pred.iloc[:, 0].reindex(y_true.index),
+            }
+        )
+        frame.to_parquet(self._file(cutoff, ".parquet"), engine="pyarrow", index=True)
+
+        metadata: Dict[str, Any] = {
+            "start": start.isoformat(),
+            "target": str(y_true.columns[0]),
+            "best_iteration": best_iteration,
+        }
+        self._file(cutoff, ".json").write_text(json.dumps(metadata))
+
+    def read(self, cutoff: pd.Timestamp) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+        """The actuals, forecasts and metadata of a single fold."""
+        metadata: Dict[str, Any] = json.loads(self._file(cutoff, ".json").read_text())
+        frame: pd.DataFrame = pd.read_parquet(self._file(cutoff, ".parquet"), engine="pyarrow")
+
+        target: str = metadata["target"]
+        y_true: pd.DataFrame = frame[["actual"]].rename(columns={"actual": target})
+        y_pred: pd.DataFrame = frame[["forecast"]].rename(columns={"forecast": target})
+        return y_true, y_pred, metadata
+
+    def frame(self) -> pd.DataFrame:
+        """All folds in one frame with columns `actual` and `forecast`, indexed by cutoff."""
+        return pd.concat(
+            {
+                cutoff: pd.read_parquet(self._file(cutoff, ".parquet"), engine="pyarrow")
+                for cutoff in self.cutoffs()
+            },
+            names=["cutoff"],
+        )
+
+    def scores(self, loss: Any, y: Optional[pd.DataFrame] = None) -> Sequence[float]:
+        """Scores every stored fold again, `y` provides the training data for e.g. MASE."""
+        scores: List[float] = []
+        for cutoff in self.cutoffs():
+            y_true, y_pred, metadata = self.read(cutoff)
+            y_train: Optional[pd.DataFrame] = None
+            if y is not None:
+                dates: pd.Index = y.index.get_level_values(-1)
+                y_train = y[(dates >= metadata["start"]) & (dates <= cutoff)]
+
+            scores.append(float(loss(y_true=y_true, y_pred=y_pred, y_train=y_train)))
+        return scores
+
+    def _file(self, cutoff: pd.Timestamp, suffix: str) -> Path:
+        return self._path / f"{cutoff:%Y-%m-%d}{suffix}"
+
+
+def fingerprint(y: pd.DataFrame, Xs: Optional[Exogenous] = None) -> str:
+    """Hash of the values and labels of the panel and its exogenous data."""
+    digest: Any = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(y, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([str(column) for column in y.columns]).encode())
+
+    if isinstance(Xs, ExogenousTensor):
+        digest.update(np.ascontiguousarray(Xs.values).tobytes())
+        for labels in (Xs.entities, Xs.dates):
+            digest.update(pd.util.hash_pandas_object(labels, index=False).to_numpy().tobytes())
+        digest.update(json.dumps([str(column) for column in Xs.columns]).encode())
+    elif Xs is not None:
+        digest.update(pd.util.hash_pandas_object(Xs, index=True).to_numpy().tobytes())
+        digest.update(json.dumps([str(column) for column in Xs.columns]).encode())
+
+    return str(digest.hexdigest())
+
+
+def describe(value: Any) -> Any:
+    """
+    JSON representation of the settings of estimators, splitters and functions.
+    Raises a `TypeError` for other values, their `repr()` may differ between runs.
+    """
+    if isinstance(value, ForecastingHorizon):
+        return {"values": value.to_numpy().tolist(), "relative": value.is_relative}
+    elif isinstance(value, (np.ndarray, pd.Index)):
+        return np.asarray(value).tolist()
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif callable(value) and hasattr(value, "__name__"):
+        return f"{getattr(value, '__module__', None) or 'numpy'}.{value.__name__}"
+    elif isinstance(value, BaseEstimator):
+        # estimators which follow the scikit-learn conventions, or their constructor state
+        try:
+            params: Dict[str, Any] = value.get_params(deep=False)
+        except AttributeError:
+            params = {
+                key.lstrip("_"): attribute
+                for key, attribute in vars(value).items()
+                if not key.endswith("_")
+            }
+        return {"class": type(value).__name__, **params}
+    else:
+        raise TypeError(f"Cannot describe the setting {type(value).__name__} of a backtest.")
+
+
+__all__ = ["BacktestStore", "describe", "fingerprint"]
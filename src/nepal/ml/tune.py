@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Final, List, Optional, Protocol
+
+import numpy as np
+import optuna
+import pandas as pd
+from joblib import Parallel, delayed
+from sktime.performance_metrics.forecasting import MeanAbsolutePercentageError
+
+from nepal.datasets import Dataset
+from nepal.ml.features.tensor import Exogenous, ExogenousTensor
+from nepal.ml.forecaster import BaseForecaster, LGBMForecaster
+from nepal.ml.splitter import Splitter
+from nepal.ml.validate import LossFunction, iter_scores
+
+
+class SearchSpace(Protocol):
+    def __call__(self, trial: optuna.Trial) -> BaseForecaster:
+        """Builds the forecaster for the hyperparameters suggested by the trial."""
+
+
+class Tuner:
+    """
+    Searches the hyperparameters of a forecaster with Optuna, scoring every trial
+    by cross-validation on the splits of `splitter`.
+
+    The mean loss over the folds seen so far is reported after every fold, so that a pruner
+    (median by default) stops unpromising trials before they pay for all folds.
+    With `validation`, every fold stops boosting early on its most recent training days.
+    Studies are stored in a local SQLite file and resumed when tuning again under
+    the same name.
+    """
+
+    storage: Final[Path] = Dataset.ROOT_DIR / "studies"
+
+    def __init__(
+        self,
+        search: SearchSpace,
+        *,
+        splitter: Splitter,
+        name: str = "forecast",
+        loss: LossFunction = MeanAbsolutePercentageError(),
+        pruner: Optional[optuna.pruners.BasePruner] = None,
+        sampler: Optional[optuna.samplers.BaseSampler] = None,
+        validation: Optional[int] = None,
+    ) -> None:
+        self._search: SearchSpace = search
+        self._splitter: Splitter = splitter
+        self._name: str = name
+        self._loss: LossFunction = loss
+        self._pruner: optuna.pruners.BasePruner = pruner or optuna.pruners.MedianPruner()
+        self._sampler: Optional[optuna.samplers.BaseSampler] = sampler
+        self._validation: Optional[int] = validation
+
+        # resolved here, as worker processes only receive the instance
+        self._path: Path = self.storage / f"{name}.db"
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def study(self) -> optuna.Study:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        return optuna.create_study(
+            study_name=self._name,
+            storage=f"sqlite:///{self._path}",
+            direction="minimize",
+            pruner=self._pruner,
+            sampler=self._sampler,
+            load_if_exists=True,
+        )
+
+    def tune(
+        self,
+        y: pd.DataFrame,
+        Xs: Optional[Exogenous] = None,
+        *,
+        n_trials: int,
+        trial_jobs: int = 1,
+        threads: Optional[int] = None,
+    ) -> optuna.Study:
+        """
+        Runs `n_trials` more trials, `trial_jobs` of them at the same time in separate
+        processes sharing the study. The `threads` are divided over those processes,
+        every LightGBM model trains with its share of them.
+        """
+        lgbm_threads: int = max(1, (threads or os.cpu_count() or 1) // trial_jobs)
+        shares: List[int] = [
+            n_trials // trial_jobs + (job < n_trials % trial_jobs) for job in range(trial_jobs)
+        ]
+
+        # Align the exogenous data once for all trials
+        if isinstance(Xs, pd.DataFrame):
+            Xs = ExogenousTensor.from_frame(Xs)
+
+        Parallel(n_jobs=trial_jobs, max_nbytes="1M")(
+            delayed(self._optimize)(y, Xs, n_trials=share, threads=lgbm_threads)
+            for share in shares
+            if share > 0
+        )
+        return self.study()
+
+    def _optimize(
+        self, y: pd.DataFrame, Xs: Optional[Exogenous], *, n_trials: int, threads: int
+    ) -> None:
+        def objective(trial: optuna.Trial) -> float:
+            return self._objective(trial, y, Xs, threads=threads)
+
+        self.study().optimize(objective, n_trials=n_trials)
+
+    def _objective(
+        self, trial: optuna.Trial, y: pd.DataFrame, Xs: Optional[Exogenous], *, threads: int
+    ) -> float:
+        forecaster: BaseForecaster = self._search(trial)
+        if isinstance(forecaster, LGBMForecaster):
+            forecaster.estimator.set_params(n_jobs=threads)
+
+        scores: List[float] = []
+        for fold, score in enumerate(
+            iter_scores(
+                forecaster,
+                splitter=self._splitter,
+                y=y,
+                Xs=Xs,
+                loss=self._loss,
+                validation=self._validation,
+            )
+        ):
+            scores.append(score)
+
+            trial.report(float(np.mean(scores)), step=fold)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+        return float(np.mean(scores))
+
+
+__all__ = ["SearchSpace", "Tuner"]
@@ -3,17 +3,34 @@ from __future__ import annotations
 import contextlib
 import os
 import warnings
-from typing import Any, Iterable, Optional, Protocol, Sequence, cast
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    cast,
+)
 
 import joblib
+import numpy.typing as npt
 import pandas as pd
 from joblib import Parallel, delayed
 from sktime.forecasting.base import ForecastingHorizon
 from sktime.performance_metrics.forecasting import MeanAbsolutePercentageError
 from tqdm.auto import tqdm
 
-from nepal.ml.forecaster import BaseForecaster
-from nepal.ml.splitter import Splitter
+from nepal.ml.binned import BinnedDataset
+from nepal.ml.features.tensor import Exogenous, ExogenousTensor
+from nepal.ml.forecaster import BaseForecaster, DesignMatrix, LGBMForecaster
+from nepal.ml.splitter import Positions, Splitter
+from nepal.ml.store import BacktestStore
 
 
 class LossFunction(Protocol):
@@ -21,61 +38,302 @@ class LossFunction(Protocol):
         """Calculates loss metric."""
 
 
+class Fold(NamedTuple):
+    """Outcome of a single split, see `backtest()`."""
+
+    cutoff: pd.Timestamp
+    score: float
+    best_iteration: Optional[int]
+
+
 def cross_validate(
     forecaster: BaseForecaster,
     *,
     splitter: Splitter,
     y: pd.DataFrame,
-    Xs: Optional[pd.DataFrame] = None,
+    Xs: Optional[Exogenous] = None,
     loss: LossFunction = MeanAbsolutePercentageError(),
     threads: Optional[int] = None,
+    binned: bool = False,
+    precompute: bool = False,
+    validation: Optional[int] = None,
+    store: bool = False,
 ) -> Sequence[float]:
-    if not threads:
-        threads = os.cpu_count()
+    """
+    Scores the forecaster on every split of the panel.
+
+    With `binned`, the features of the full panel are binned once for LightGBM,
+    with `precompute` they are built once and every fold trains on the rows in its window.
+    Both only apply to an LGBMForecaster with causal transformers.
+    With `validation`, every fold holds out that many of its most recent training days
+    to stop boosting early. With `store`, the forecasts are kept, see `backtest()`.
+    Up to `threads` folds (one per core by default) run at the same time.
+    """
+    folds: Sequence[Fold] = backtest(
+        forecaster,
+        splitter=splitter,
+        y=y,
+        Xs=Xs,
+        loss=loss,
+        threads=threads,
+        binned=binned,
+        precompute=precompute,
+        validation=validation,
+        store=store,
+    )
+    return [fold.score for fold in folds]
 
-    with tqdm_joblib(
-        tqdm(desc="Cross Validation", total=splitter.get_n_splits(y))
+
+def backtest(
+    forecaster: BaseForecaster,
+    *,
+    splitter: Splitter,
+    y: pd.DataFrame,
+    Xs: Optional[Exogenous] = None,
+    loss: LossFunction = MeanAbsolutePercentageError(),
+    threads: Optional[int] = None,
+    binned: bool = False,
+    precompute: bool = False,
+    validation: Optional[int] = None,
+    store: bool = False,
+) -> Sequence[Fold]:
+    """
+    Runs `cross_validate()`, but keeps the details of every fold.
+    With `store`, the forecasts of every fold are written to the `BacktestStore.of()` the
+    same arguments, folds which it already holds are scored from their stored forecasts
+    instead of fitting them again.
+    """
+    kept: Optional[BacktestStore] = (
+        BacktestStore.of(
+            forecaster,
+            splitter=splitter,
+            y=y,
+            Xs=Xs,
+            binned=binned,
+            precompute=precompute,
+            validation=validation,
+        )
+        if store
+        else None
+    )
+    stored: Set[pd.Timestamp] = set(kept.cutoffs()) if kept is not None else set()
+    with contextlib.ExitStack() as resources, tqdm_joblib(
+        tqdm(desc="Cross Validation", total=splitter.get_n_splits(y) - len(stored))
     ) as progress_bar:
-        return cast(
-            Sequence[float],
-            Parallel(n_jobs=threads)(
-                delayed(_single_run)(
-                    **{
-                        "forecaster": forecaster,
-                        "df_train": df_train,
-                        "df_test": df_test,
-                        "exogenous": Xs,
-                        "loss": loss,
-                        "fh": splitter.fh,
-                    }
-                )
-                for df_train, df_test in splitter.train_test_splits(y=y)
-            ),
+        runs: Iterator[Dict[str, Any]] = _runs(
+            forecaster,
+            splitter=splitter,
+            y=y,
+            Xs=Xs,
+            loss=loss,
+            binned=binned,
+            precompute=precompute,
+            validation=validation,
+            skip=stored,
+            resources=resources,
+        )
+        folds: List[Fold] = Parallel(
+            n_jobs=threads or os.cpu_count(), max_nbytes="1M", mmap_mode="r"
+        )(delayed(_single_run)(**run, store=kept) for run in runs)
+
+    if kept is not None:
+        cutoffs: Set[pd.Timestamp] = {train.max() for train, _ in splitter.date_windows(y)}
+        folds.extend(
+            _stored_run(kept, cutoff=cutoff, y=y, loss=loss) for cutoff in stored & cutoffs
+        )
+    return sorted(folds, key=lambda fold: fold.cutoff)
+
+
+def iter_scores(
+    forecaster: BaseForecaster,
+    *,
+    splitter: Splitter,
+    y: pd.DataFrame,
+    Xs: Optional[Exogenous] = None,
+    loss: LossFunction = MeanAbsolutePercentageError(),
+    binned: bool = False,
+    precompute: bool = False,
+    validation: Optional[int] = None,
+) -> Iterator[float]:
+    """
+    Scores the splits one by one in the current process, as opposed to `cross_validate()`,
+    so that the caller can stop early on bad results.
+    """
+    with contextlib.ExitStack() as resources:
+        for run in _runs(
+            forecaster,
+            splitter=splitter,
+            y=y,
+            Xs=Xs,
+            loss=loss,
+            binned=binned,
+            precompute=precompute,
+            validation=validation,
+            resources=resources,
+        ):
+            yield _single_run(**run).score
+
+
+def _runs(
+    forecaster: BaseForecaster,
+    *,
+    splitter: Splitter,
+    y: pd.DataFrame,
+    Xs: Optional[Exogenous],
+    loss: LossFunction,
+    binned: bool,
+    precompute: bool,
+    validation: Optional[int],
+    skip: Collection[pd.Timestamp] = (),
+    resources: contextlib.ExitStack,
+) -> Iterator[Dict[str, Any]]:
+    """
+    The arguments of `_single_run()` for every split, the binned dataset is removed when
+    the `resources` are closed, i.e. once every run has finished.
+    """
+    if validation is not None and not isinstance(forecaster, LGBMForecaster):
+        raise ValueError("Only an LGBMForecaster can stop early on a validation tail.")
+
+    # Align the exogenous data once, instead of joining it again in every fold
+    if isinstance(Xs, pd.DataFrame):
+        Xs = ExogenousTensor.from_frame(Xs)
+
+    # Bin the features of the full panel once, every fold trains on a subset of its rows
+    dataset: Optional[BinnedDataset] = None
+    if binned:
+        if not isinstance(forecaster, LGBMForecaster):
+            raise ValueError("Only an LGBMForecaster can be trained on a binned dataset.")
+        dataset = resources.enter_context(
+            BinnedDataset.build(forecaster, y, [Xs] if Xs is not None else None)
+        )
+
+    # Build the lagged, transformed and exogenous features of the full panel once
+    design: Optional[DesignMatrix] = None
+    if precompute:
+        if not isinstance(forecaster, LGBMForecaster):
+            raise ValueError("Only an LGBMForecaster can be trained on precomputed features.")
+        elif binned:
+            raise ValueError("Features are either binned or precomputed, not both.")
+        design = forecaster.design_matrix(y, [Xs] if Xs is not None else [])
+
+    # Hand the panel to the workers as one block of memory-mapped NumPy arrays,
+    # so that every fold only needs its dates and rows instead of pickled DataFrames
+    panel: Panel = Panel.from_frame(y)
+
+    for (idx_train, idx_test), (rows_train, rows_test) in zip(
+        splitter.date_windows(y=y), splitter.window_positions(y)
+    ):
+        if idx_train.max() in skip:
+            continue
+
+        yield {
+            "forecaster": forecaster,
+            "panel": panel,
+            "train": idx_train,
+            "test": idx_test,
+            "rows_train": rows_train,
+            "rows_test": rows_test,
+            "exogenous": Xs,
+            "dataset": dataset,
+            "design": design,
+            "validation": validation,
+            "loss": loss,
+            "fh": splitter.fh,
+        }
+
+
+class Panel(NamedTuple):
+    """
+    The target panel as memory-mappable arrays: its values on a dense grid, and the
+    (entity, date) offsets and dtypes of its rows, which rebuild them exactly.
+    """
+
+    values: ExogenousTensor
+    entity: npt.NDArray[Any]
+    date: npt.NDArray[Any]
+    dtypes: Dict[str, Any]
+
+    @classmethod
+    def from_frame(cls, y: pd.DataFrame) -> Panel:
+        values: ExogenousTensor = ExogenousTensor.from_frame(y)
+        entity, date = values.offsets(y.index)
+        return cls(values, entity=entity, date=date, dtypes=y.dtypes.to_dict())
+
+    def rows(self, positions: Positions) -> pd.DataFrame:
+        """The same rows as `y.iloc[positions]`."""
+        return self.values.take(
+            self.entity[positions], self.date[positions], dtypes=self.dtypes
         )
 
 
 def _single_run(
     forecaster: BaseForecaster,
     *,
-    df_train: pd.DataFrame,
-    df_test: pd.DataFrame,
-    exogenous: Optional[pd.DataFrame],
+    panel: Panel,
+    train: pd.DatetimeIndex,
+    test: pd.DatetimeIndex,
+    rows_train: Positions,
+    rows_test: Positions,
+    exogenous: Optional[ExogenousTensor],
+    dataset: Optional[BinnedDataset] = None,
+    design: Optional[DesignMatrix] = None,
+    validation: Optional[int] = None,
     loss: LossFunction,
     fh: ForecastingHorizon,
-) -> float:
+    store: Optional[BacktestStore] = None,
+) -> Fold:
+    df_train: pd.DataFrame = panel.rows(rows_train)
+    df_test: pd.DataFrame = panel.rows(rows_test)
+
     # Align indices and avoid information spill
     if exogenous is not None:
-        Xs: Iterable[pd.DataFrame] = [df_train.join(exogenous).drop(columns=df_train.columns)]
+        Xs: Iterable[Exogenous] = [exogenous.truncate(before=train.min(), after=train.max())]
     else:
         Xs = []
 
-    model = forecaster.fit(y=df_train, Xs=Xs)
+    # Only pass the options in use, other forecasters do not know them
+    options: Dict[str, Any] = {
+        "dataset": dataset,
+        "design": design,
+        "validation": validation,
+    }
+    model = forecaster.fit(
+        y=df_train, Xs=Xs, **{key: value for key, value in options.items() if value is not None}
+    )
     df_pred = model.forecast(fh=fh, y=df_train, Xs=Xs)
 
     with warnings.catch_warnings():
         warnings.simplefilter(action="ignore", category=FutureWarning)
         score: float = loss(y_true=df_test, y_pred=df_pred, y_train=df_train)
-    return score
+
+    best_iteration: Optional[int] = (
+        model.best_iteration if isinstance(model, LGBMForecaster) else None
+    )
+    if store is not None:
+        store.write(
+            cutoff=train.max(),
+            start=train.min(),
+            y_true=df_test,
+            y_pred=df_pred,
+            best_iteration=best_iteration,
+        )
+
+    return Fold(cutoff=train.max(), score=score, best_iteration=best_iteration)
+
+
+def _stored_run(
+    store: BacktestStore, *, cutoff: pd.Timestamp, y: pd.DataFrame, loss: LossFunction
+) -> Fold:
+    y_true, y_pred, metadata = store.read(cutoff)
+
+    dates: pd.Index = y.index.get_level_values(-1)
+    y_train: pd.DataFrame = y[(dates >= metadata["start"]) & (dates <= cutoff)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter(action="ignore", category=FutureWarning)
+        score: float = loss(y_true=y_true, y_pred=y_pred, y_train=y_train)
+
+    return Fold(cutoff=cutoff, score=score, best_iteration=metadata["best_iteration"])
 
 
 @contextlib.contextmanager
@@ -0,0 +1,118 @@
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+from neo4j import Query, Record
+
+from nepal.graph.connection import Neo4jConnection
+from nepal.graph.gds import QUERIES, CountyEmbedding, QueryRegistry
+from nepal.ml.features.embedding import EmbeddingCache
+
+
+class RecordingConnection(Neo4jConnection):
+    def __init__(self) -> None:
+        self._db = None
+        self._writers = 1
+        self.queries: List[Tuple[str, Mapping[Hashable, Any]]] = []
+        self.created: str = "2022-01-01T00:00:00"
+
+    def query(
+        self, query: Union[str, Query], *, parameters: Optional[Mapping[Hashable, Any]] = None
+    ) -> Sequence[Record]:
+        text: str = query.text if isinstance(query, Query) else query
+        self.queries.append((text, parameters or {}))
+        if text == QUERIES["gds.graph.exists"].text:
+            return [Record({"exists": True})]
+        elif text == QUERIES["gds.fastRP.stream.estimate"].text and parameters is not None:
+            return [Record({"bytesMax": 1000 * parameters["dimension"]})]
+        elif text == QUERIES["gds.graph.list"].text:
+            return [
+                Record({"creationTime": self.created, "nodeCount": 3, "relationshipCount": 2})
+            ]
+        return []
+
+    def query_arrays(
+        self,
+        query: Union[str, Query],
+        *,
+        parameters: Optional[Mapping[Hashable, Any]] = None,
+        fetch_size: int = 1000,
+    ) -> Dict[str, npt.NDArray[Any]]:
+        text: str = query.text if isinstance(query, Query) else query
+        self.queries.append((text, parameters or {}))
+        if text == QUERIES["county.node_ids"].text:
+            return {
+                "nodeId": np.array([7, 3, 5]),
+                "fips": np.array(["01001", "01003", "01005"]),
+            }
+
+        # node 9 has no county, the embedding of node i is filled with i
+        nodes = np.array([3, 9, 7, 5])
+        dimension = parameters["dimension"] if parameters is not None else 0
+        return {"nodeId": nodes, "embedding": np.repeat(nodes[:, None], dimension, axis=1)}
+
+
+def test_embedding_queries_only_differ_in_parameters() -> None:
+    connection = RecordingConnection()
+    for seed, dimension, weight in [(1, 8, 0.5), (2, 16, 1.0)]:
+        embedding = CountyEmbedding(name=f"counties_{seed}", random_seed=seed)
+        embedding.estimate_memory(connection, embedding_dimension=dimension)
+        embedding.generate_embedding(connection, embedding_dimension=dimension, weight4=weight)
+        embedding.drop_projection(connection)
+
+    texts = [text for text, _ in connection.queries]
+    assert texts[:3] == texts[3:]
+    assert texts[1] == QUERIES["gds.fastRP.stream"].text
+
+    parameters = connection.queries[4][1]
+    assert parameters["projection"] == "counties_2"
+    assert parameters["seed"] == 2 and parameters["dimension"] == 16
+    assert parameters["weight4"] == 1.0 and isinstance(parameters["weight4"], float)
+    assert parameters["features"] == list(CountyEmbedding.features)
+
+
+def test_registry_rejects_duplicate_names() -> None:
+    registry = QueryRegistry()
+    query = registry.register("count", "MATCH (n) RETURN count(n)")
+
+    assert registry["count"] is query and "count" in registry
+    with pytest.raises(ValueError):
+        registry.register("count", "MATCH (n) RETURN count(*)")
+
+
+def test_sweep_reuses_projection_mapping_and_cache(tmp_path: Path) -> None:
+    connection = RecordingConnection()
+    embedding = CountyEmbedding()
+    cache = EmbeddingCache(tmp_path)
+    configurations: List[Dict[str, Any]] = [
+        {"embedding_dimension": 4},
+        {"embedding_dimension": 8, "weight4": 0.5},
+        {"embedding_dimension": 4},
+    ]
+
+    results = list(embedding.sweep(connection, configurations, cache=cache, max_bytes=8000))
+    queries = [text for text, _ in connection.queries]
+
+    assert [frame.shape for _, frame in results] == [(3, 4), (3, 8), (3, 4)]
+    assert results[0][1].dtypes.unique().tolist() == [np.float32]
+    assert results[0][1]["emb_0"].to_dict() == {"01003": 3.0, "01001": 7.0, "01005": 5.0}
+    assert queries.count(QUERIES["county.node_ids"].text) == 1
+    assert queries.count(QUERIES["gds.fastRP.stream"].text) == 2
+    assert queries.count(QUERIES["gds.fastRP.stream.estimate"].text) == 2
+    assert QUERIES["county.project"].text not in queries
+    assert len(cache.entries()) == 2
+
+    # a recreated projection has new embeddings, which are only cached with a cache
+    connection.created = "2022-01-02T00:00:00"
+    count = len(connection.queries)
+    embedding.load_dataframe(connection, embedding_dimension=4)
+    assert QUERIES["gds.graph.list"].text not in [t for t, _ in connection.queries[count:]]
+    embedding.load_dataframe(connection, embedding_dimension=4, cache=cache)
+    queries = [text for text, _ in connection.queries]
+    assert queries.count(QUERIES["gds.fastRP.stream"].text) == 4
+    assert len(cache.entries()) == 3
+
+    with pytest.raises(MemoryError):
+        next(embedding.sweep(connection, configurations, max_bytes=4000))
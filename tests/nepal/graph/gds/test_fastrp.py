@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from nepal.datasets import CountyDistance, Vaccinations
+from nepal.graph.gds import FastRP, LocalCountyEmbedding, compare
+from nepal.graph.model import County, CountyDistances
+from nepal.ml.features.embedding import PersistableEmbedding
+
+
+def geometric(n_nodes: int, radius: float) -> sparse.csr_matrix:
+    """Random points in the unit square, weighted like county distances within `radius`."""
+    points = np.random.default_rng(0).uniform(size=(n_nodes, 2))
+    pairs = cKDTree(points).query_pairs(radius, output_type="ndarray")
+    distances = np.sqrt(np.sum((points[pairs[:, 0]] - points[pairs[:, 1]]) ** 2, axis=1))
+    upper = sparse.csr_matrix(
+        ((radius - distances) / radius, (pairs[:, 0], pairs[:, 1])), shape=(n_nodes, n_nodes)
+    )
+    return (upper + upper.T).tocsr()
+
+
+def test_embeddings_of_different_seeds_are_equivalent() -> None:
+    adjacency = geometric(1000, radius=0.1)
+    features = np.random.default_rng(0).normal(size=(adjacency.shape[0], 10))
+
+    def embed(seed: int) -> pd.DataFrame:
+        fast_rp = FastRP(
+            embedding_dimension=64,
+            iteration_weights=[0.0, 0.5, 1.0],
+            normalization=-0.5,
+            property_ratio=0.25,
+            random_seed=seed,
+        )
+        return pd.DataFrame(fast_rp.embed(adjacency, features))
+
+    first, second = embed(1), embed(2)
+    shuffled = second.sample(frac=1.0, random_state=0).set_axis(second.index)
+
+    assert first.to_numpy().dtype == np.float32 and first.shape == (1000, 64)
+    assert np.array_equal(first.to_numpy(), embed(1).to_numpy())
+    assert compare(first, second).passed()
+    assert not compare(first, shuffled).passed()
+
+
+def test_local_county_embedding_is_stored(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    counties = pd.DataFrame(
+        {
+            "FIPS": ["01001", "01003", "01005", "01007"],
+            **{
+                column: [1.0, 2.0, None, 4.0]
+                for column in LocalCountyEmbedding.properties.values()
+            },
+        }
+    )
+    distances = pd.DataFrame(
+        {
+            "county1": ["01001", "01003", "01003", "01005", "99999", "01007"],
+            "county2": ["01003", "01001", "01005", "01007", "01001", "01001"],
+            "weight": [0.5, 0.5, 0.2, 0.9, 1.0, None],
+        }
+    )
+    monkeypatch.setattr(County, "prepare_data", lambda self: counties)
+    monkeypatch.setattr(CountyDistances, "prepare_data", lambda self: distances)
+    monkeypatch.setattr(PersistableEmbedding, "destination", tmp_path)
+
+    embedding = LocalCountyEmbedding(
+        counties=County(Vaccinations()), distances=CountyDistances(CountyDistance(radius=100))
+    )
+    graph = embedding.graph()
+    stored = embedding.store(embedding_dimension=8, property_ratio=0.5)
+
+    assert graph.adjacency.nnz == 8 and graph.adjacency[0, 1] == pytest.approx(0.5)
+    # a relationship without weight still counts for the degree, as in GDS
+    assert graph.adjacency.getnnz(axis=1).tolist() == [2, 2, 2, 2]
+    assert list(stored.columns) == [f"emb_{i}" for i in range(8)]
+    pd.testing.assert_frame_equal(PersistableEmbedding("counties").load(), stored)
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from nepal.datasets import CountyDistance, GovernmentResponse, NYTimes
+from nepal.graph.bulk import BulkImport
+from nepal.graph.model import CountyDistances, Date, State, StateMeasures, Steps
+
+
+def test_export_all_writes_import_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    dates = pd.to_datetime(["2021-01-01", "2021-01-02", "2021-01-04"])
+    measures = pd.DataFrame(
+        {
+            "CountryName": "United States",
+            "RegionName": ["Alaska", "Alaska", "Alabama"],
+            "RegionCode": ["US_AK", "US_AK", "US_AL"],
+            "Date": dates,
+            "StringencyIndex": [1.0, None, 3.0],
+            "GovernmentResponseIndex": [1.0, 2.0, 3.0],
+            "ContainmentHealthIndex": [1.0, 2.0, 3.0],
+            "EconomicSupportIndex": [1.0, 2.0, 3.0],
+        }
+    )
+    distances = pd.DataFrame(
+        {
+            "county1": ["01001", "01003", "01001"],
+            "county2": ["01003", "01001", "01005"],
+            "mi_to_county": [10.0, 10.0, 50.0],
+        }
+    )
+    monkeypatch.setattr(GovernmentResponse, "load", lambda self: measures.copy())
+    monkeypatch.setattr(NYTimes, "load", lambda self: pd.DataFrame({"date": dates}))
+    monkeypatch.setattr(CountyDistance, "load", lambda self: distances.copy())
+
+    bulk = BulkImport(tmp_path)
+    Steps(
+        State(GovernmentResponse()),
+        CountyDistances(CountyDistance(radius=100)),
+        Date(NYTimes()),
+        StateMeasures(GovernmentResponse()),
+    ).export_all(bulk)
+
+    def read(name: str) -> pd.DataFrame:
+        header = (tmp_path / f"{name}.header.csv").read_text().strip().split(",")
+        return pd.read_csv(tmp_path / f"{name}.csv", names=header, dtype=str)
+
+    assert read("State").to_dict("records") == [
+        {"code:ID(State)": "US_AK", "name:string": "Alaska", ":LABEL": "State"},
+        {"code:ID(State)": "US_AL", "name:string": "Alabama", ":LABEL": "State"},
+    ]
+    assert read("IS_NEAR")[":START_ID(County)"].tolist() == ["01001", "01001"]
+    assert read("IS_AFTER")[":START_ID(Date)"].tolist() == ["2021-01-02"]
+    assert list(read("Date").columns) == [":ID(Date)", "id:date", ":LABEL"]
+    assert read("ACTIVE_ON")[":START_ID(Measures)"].tolist()[0] == "US_AK,2021-01-01"
+
+    command = bulk.command("covid")
+    assert "--database=covid" in command
+    assert sum(argument.startswith("--nodes=") for argument in command) == 3
+    assert sum(argument.startswith("--relationships=") for argument in command) == 4
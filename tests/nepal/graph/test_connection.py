@@ -1,6 +1,10 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
+from neo4j import Record
 
-from nepal.graph.connection import Neo4jConnection
+from nepal.graph.connection import Neo4jConnection, as_frame, columns, serialize
 
 
 def test_pairwise() -> None:
@@ -8,3 +12,93 @@ def test_pairwise() -> None:
     result = Neo4jConnection.chunks(df, 4)
 
     assert list(result) == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_serialize_matches_records() -> None:
+    df = pd.DataFrame(
+        {
+            "fips": ["01001", "01003", "01005", "01007", "01009"],
+            "date": pd.to_datetime(
+                ["2021-01-01", "2021-01-02", None, "2021-01-04", "2021-01-05"]
+            ),
+            "cases": pd.array([1, None, 3, 4, 5], dtype="Int64"),
+            "rate": [0.5, np.nan, np.nan, 1.5, 2.0],
+        }
+    )
+    # the maps of `to_dict("records")`, with timestamps as strings and without nulls
+    records = df.assign(date=df["date"].astype(str)).to_dict("records")
+    expected = [
+        {k: v for k, v in row.items() if not pd.isna(v) and v != "NaT"} for row in records
+    ]
+
+    result = [row for batch in serialize(df, batch_size=2) for row in batch]
+
+    assert result == expected
+    assert [type(row["cases"]) for row in result if "cases" in row] == [int] * 4
+    assert df["date"].dtype == "datetime64[ns]"
+
+
+class FakeSession:
+    def __init__(self, committed: List[Tuple[int, ...]]) -> None:
+        self.committed = committed
+        self.closed = False
+
+    def write_transaction(self, work: Any, query: str, rows: List[Dict[str, Any]]) -> None:
+        self.committed.append(tuple(row["id"] for row in rows))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeConnection(Neo4jConnection):
+    def __init__(self, writers: int) -> None:
+        super().__init__(uri="bolt://localhost:7687", user="neo4j", pwd="", writers=writers)
+        self.committed: List[Tuple[int, ...]] = []
+        self.sessions: List[FakeSession] = []
+
+    def session(self, *, fetch_size: Optional[int] = None) -> Any:
+        self.sessions.append(FakeSession(self.committed))
+        return self.sessions[-1]
+
+
+def test_insert_data_commits_every_batch_through_the_writers() -> None:
+    connection = FakeConnection(writers=3)
+
+    connection.insert_data(
+        "UNWIND $rows AS row",
+        description="Rows",
+        rows=pd.DataFrame({"id": range(1000)}),
+        batch_size=10,
+    )
+
+    # how many writers get to open a session depends on the scheduling of the threads
+    assert len(connection.committed) == 100
+    assert set(connection.committed) == {tuple(range(i, i + 10)) for i in range(0, 1000, 10)}
+    assert 1 <= len(connection.sessions) <= 3
+    assert all(session.closed for session in connection.sessions)
+
+
+def test_columns_turns_lists_into_float32_blocks() -> None:
+    records = [
+        Record(zip(["nodeId", "fips", "embedding"], values))
+        for values in [
+            (0, "01001", [0.5, 1.0]),
+            (1, None, None),
+            (2, "01005", [1.5, 2.0]),
+            (3, "01007", None),
+            (4, "01009", [2.5, 3.0]),
+        ]
+    ]
+
+    result = columns(records, chunk_size=2)
+    frame = as_frame(result)
+
+    assert result["embedding"].dtype == np.dtype(np.float32)
+    assert np.array_equal(
+        result["embedding"],
+        np.array([[0.5, 1.0], [np.nan, np.nan], [1.5, 2.0], [np.nan, np.nan], [2.5, 3.0]]),
+        equal_nan=True,
+    )
+    assert result["nodeId"].tolist() == [0, 1, 2, 3, 4]
+    assert list(frame.columns) == ["nodeId", "fips", "embedding_0", "embedding_1"]
+    assert frame["fips"].tolist() == ["01001", None, "01005", "01007", "01009"]
@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import pandas as pd
+import pytest
+
+from nepal.datasets import CountyDistance, GovernmentResponse, Vaccinations
+from nepal.graph.connection import Neo4jConnection
+from nepal.graph.delta import Delta, Snapshot
+from nepal.graph.model import (
+    County,
+    CountyDistances,
+    CountyVaccinations,
+    Mergeable,
+    State,
+    StateMeasures,
+    Steps,
+)
+
+
+def test_snapshot_finds_changed_rows(tmp_path: Path) -> None:
+    snapshot = Snapshot(tmp_path / "step.parquet", key=["fips", "date"])
+    dates = pd.to_datetime(["2021-01-01", "2021-01-01", "2021-01-02"])
+    before = pd.DataFrame(
+        {"fips": ["01001", "01003", "01001"], "date": dates, "cases": [1, 2, 3]}
+    )
+
+    assert len(snapshot.delta(before).inserts) == 3
+    snapshot.commit()
+
+    after = pd.DataFrame(
+        {
+            "fips": ["01001", "01001", "01005"],
+            "date": pd.to_datetime(["2021-01-01", "2021-01-02", "2021-01-02"]),
+            "cases": [1, 4, 5],
+        }
+    )
+    delta: Delta = snapshot.delta(after)
+
+    assert delta.inserts["fips"].tolist() == ["01005"]
+    assert delta.updates["cases"].tolist() == [4]
+    assert delta.deletes.to_dict("records") == [
+        {"fips": "01003", "date": pd.Timestamp("2021-01-01")}
+    ]
+
+
+def test_snapshot_hashes_lists_after_missing_values(tmp_path: Path) -> None:
+    snapshot = Snapshot(tmp_path / "step.parquet", key=["fips"])
+    before = pd.DataFrame({"fips": ["01001", "01003"], "values": [None, [1.0, 2.0]]})
+    snapshot.delta(before)
+    snapshot.commit()
+
+    after = pd.DataFrame({"fips": ["01001", "01003"], "values": [None, [1.0, 3.0]]})
+
+    assert snapshot.delta(after).updates["fips"].tolist() == ["01003"]
+
+
+@pytest.mark.parametrize(
+    "step", [StateMeasures(GovernmentResponse()), CountyVaccinations(Vaccinations())]
+)
+def test_composite_keys_are_deleted_by_the_id_they_were_merged_by(step: Mergeable) -> None:
+    queries: List[str] = []
+
+    class Connection(RecordingConnection):
+        def insert_data(
+            self, query: Any, *, description: str, rows: pd.DataFrame, **kwargs: Any
+        ) -> None:
+            queries.append(query.text)
+
+    rows = pd.DataFrame({column: ["x"] for column in step.key})
+    step.upsert(Connection(), rows)
+    step.delete(Connection(), rows)
+
+    merged, deleted = (query.split("{id: ")[1].split("})")[0] for query in queries)
+    assert merged == deleted == step.key_id()
+    assert step.key_id().count("coalesce") == 2
+
+
+class RecordingConnection(Neo4jConnection):
+    def __init__(self) -> None:
+        super().__init__(uri="bolt://localhost:7687", user="neo4j", pwd="")
+        self.calls: List[Tuple[str, List[Any]]] = []
+
+    def query(self, query: Any, *, parameters: Any = None) -> Any:
+        return []
+
+    def insert_data(
+        self, query: Any, *, description: str, rows: pd.DataFrame, **kwargs: Any
+    ) -> None:
+        self.calls.append((description, rows["RegionCode"].tolist()))
+
+
+def test_sync_sends_only_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    data = pd.DataFrame(
+        {
+            "CountryName": "United States",
+            "RegionName": ["Alaska", "Alabama"],
+            "RegionCode": ["US_AK", "US_AL"],
+        }
+    )
+    monkeypatch.setattr(GovernmentResponse, "load", lambda self: data.copy())
+    connection = RecordingConnection()
+    snapshot = Snapshot(tmp_path / "State.parquet", key=State.key)
+
+    State(GovernmentResponse()).sync(connection, snapshot)
+    State(GovernmentResponse()).sync(connection, snapshot)
+    data.loc[1, "RegionName"] = "Alabama State"
+    data.loc[0, "RegionCode"] = "US_AZ"
+    State(GovernmentResponse()).sync(connection, snapshot)
+
+    assert connection.calls == [
+        ("State nodes", ["US_AK", "US_AL"]),
+        ("Deleted states", ["US_AK"]),
+        ("State nodes", ["US_AZ", "US_AL"]),
+    ]
+
+
+def test_sync_all_resends_rows_of_recreated_nodes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    counties = pd.DataFrame({"FIPS": ["01001", "01003"], "RegionCode": "US_AL"})
+    distances = pd.DataFrame({"county1": ["01001"], "county2": ["01003"], "weight": [0.5]})
+    monkeypatch.setattr(County, "prepare_data", lambda self: counties.copy())
+    monkeypatch.setattr(CountyDistances, "prepare_data", lambda self: distances.copy())
+    calls: List[Tuple[str, int]] = []
+
+    class Connection(RecordingConnection):
+        def insert_data(
+            self, query: Any, *, description: str, rows: pd.DataFrame, **kwargs: Any
+        ) -> None:
+            calls.append((description, len(rows)))
+
+    def sync() -> None:
+        Steps(CountyDistances(CountyDistance()), County(Vaccinations())).sync_all(
+            Connection(), tmp_path, workers=1
+        )
+
+    sync()
+    sync()
+    # the county is deleted with its distances, which are sent again once it returns
+    full: pd.DataFrame = counties
+    counties = counties.iloc[:1]
+    sync()
+    counties = full
+    sync()
+
+    assert calls == [
+        ("County nodes", 2),
+        ("County distances", 1),
+        ("Deleted counties", 1),
+        ("County distances", 1),
+        ("County nodes", 1),
+        ("County distances", 1),
+    ]
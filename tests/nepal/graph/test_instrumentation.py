@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from nepal.graph.connection import Neo4jConnection
+from nepal.graph.instrumentation import QueryLog, step
+
+
+def summary(query: str, rows: int) -> Any:
+    return SimpleNamespace(
+        result_available_after=1,
+        result_consumed_after=2,
+        counters=SimpleNamespace(nodes_created=rows),
+        profile={"operatorType": "ProduceResults"} if query.startswith("PROFILE") else None,
+    )
+
+
+class FakeResult:
+    def __init__(self, query: str, rows: int) -> None:
+        self.query = query
+        self.rows = rows
+
+    def __iter__(self) -> Any:
+        return iter([])
+
+    def consume(self) -> Any:
+        return summary(self.query, self.rows)
+
+
+class FakeSession:
+    def __init__(self, queries: List[str]) -> None:
+        self.queries = queries
+
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def run(self, query: Any, parameters: Dict[str, Any]) -> FakeResult:
+        self.queries.append(query.text if hasattr(query, "text") else query)
+        return FakeResult(self.queries[-1], len(parameters["rows"]))
+
+    def write_transaction(self, work: Any, query: str, rows: List[Dict[str, Any]]) -> Any:
+        self.queries.append(query)
+        return summary(query, len(rows))
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection(Neo4jConnection):
+    def __init__(self, writers: int) -> None:
+        super().__init__(uri="bolt://localhost:7687", user="neo4j", pwd="", writers=writers)
+        self.queries: List[str] = []
+
+    def session(self, *, fetch_size: Optional[int] = None) -> Any:
+        return FakeSession(self.queries)
+
+
+def test_queries_are_recorded_per_step(tmp_path: Path) -> None:
+    rows = pd.DataFrame({"id": range(10)})
+    for writers in [1, 2]:
+        connection = FakeConnection(writers=writers)
+        log = connection.instrument(QueryLog(profile=lambda query: "MERGE" in query))
+
+        with step("Nodes"):
+            connection.insert_data(
+                "UNWIND $rows AS row\nMERGE (n:Node {id: row.id})",
+                description="Nodes",
+                rows=rows,
+                batch_size=4,
+            )
+        connection.query("MATCH (n) RETURN n", parameters={"rows": []})
+
+        assert all(query.startswith("PROFILE UNWIND") for query in connection.queries[:3])
+        assert connection.queries[3] == "MATCH (n) RETURN n"
+
+        report = log.report()
+        nodes = report.loc[("Nodes", "UNWIND $rows AS row")]
+        assert nodes["calls"] == 3 and nodes["rows"] == 10 and nodes["nodes_created"] == 10
+        assert nodes["bytes"] > 0 and nodes["consumed_after"] == 6
+        assert report.loc[("-", "MATCH (n) RETURN n"), "calls"] == 1
+        assert len(log.plans()) == 1
+
+        trace = json.loads(log.write_trace(tmp_path / "trace.json").read_text())
+        spans = [event for event in trace["traceEvents"] if event.get("cat") == "step"]
+        assert [span["name"] for span in spans] == ["Nodes"]
@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import List
+
+import pandas as pd
+import pytest
+
+from nepal.graph.connection import Neo4jConnection
+from nepal.graph.model import Mergeable, Steps
+
+
+class Step(Mergeable):
+    def __init__(self, merged: List[str], prepared: threading.Barrier) -> None:
+        self._merged = merged
+        self._barrier = prepared
+
+    def prepare_data(self) -> pd.DataFrame:
+        # every step waits for the others, which only passes if they prepare concurrently
+        self._barrier.wait(timeout=5)
+        return pd.DataFrame()
+
+    def merge(self, connection: Neo4jConnection) -> None:
+        assert self.data().empty
+        time.sleep(0.01)
+        self._merged.append(type(self).__name__)
+
+
+class Nodes(Step):
+    pass
+
+
+class Others(Step):
+    pass
+
+
+class Relationships(Step):
+    requires = (Nodes, Others)
+
+
+def test_merge_all_follows_dependencies() -> None:
+    merged: List[str] = []
+    prepared = threading.Barrier(3)
+    steps = Steps(
+        Relationships(merged, prepared), Nodes(merged, prepared), Others(merged, prepared)
+    )
+
+    timings = steps.merge_all(connection=None)  # type: ignore[arg-type]
+
+    assert merged[-1] == "Relationships"
+    assert [timing.step for timing in timings] == ["Relationships", "Nodes", "Others"]
+    assert timings[0].start >= max(timings[1].end, timings[2].end)
+
+
+def test_merge_all_rejects_cycles() -> None:
+    class First(Step):
+        pass
+
+    class Second(Step):
+        requires = (First,)
+
+    First.requires = (Second,)
+    prepared = threading.Barrier(2)
+
+    with pytest.raises(ValueError):
+        Steps(First([], prepared), Second([], prepared)).merge_all(connection=None)  # type: ignore[arg-type]
@@ -0,0 +1,47 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from nepal.graph.connection import Neo4jConnection, serialize
+from nepal.graph.model import StateMeasureSeries
+
+
+class StoredSeries(Neo4jConnection):
+    """Returns the rows of the series as if they were read back from the nodes."""
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        super().__init__(uri="bolt://localhost:7687", user="neo4j", pwd="")
+        self.rows = rows
+
+    def query(self, query: Any, *, parameters: Any = None) -> Any:
+        return [
+            {
+                "key": row["RegionCode"],
+                "dates": row["Date"],
+                **{prop: row[column] for prop, column in StateMeasureSeries.metrics.items()},
+            }
+            for row in self.rows
+        ]
+
+
+def test_series_round_trip() -> None:
+    rng = np.random.default_rng(0)
+    index = pd.MultiIndex.from_product(
+        [["US_AK", "US_AL"], pd.date_range("2021-01-01", periods=5)],
+        names=["RegionCode", "Date"],
+    )
+    measures = pd.DataFrame(
+        {column: rng.random(len(index)) for column in StateMeasureSeries.metrics.values()},
+        index=index,
+    )
+    measures.iloc[3, 0] = np.nan
+
+    series = StateMeasureSeries.to_series(measures.reset_index().sample(frac=1, random_state=0))
+    rows = [row for batch in serialize(series, batch_size=10) for row in batch]
+
+    assert len(series) == 2
+    assert rows[0]["Date"][:2] == ["2021-01-01", "2021-01-02"]
+
+    result = StateMeasureSeries.read(StoredSeries(rows))
+    pd.testing.assert_frame_equal(result, measures, check_index_type=False)
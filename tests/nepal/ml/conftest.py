@@ -0,0 +1,33 @@
+from typing import Callable
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from nepal.ml.forecaster import LGBMForecaster
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def y(rng: np.random.Generator) -> pd.DataFrame:
+    """A panel of three groups with 60 days of random values."""
+    index = pd.MultiIndex.from_product(
+        [["a", "b", "c"], pd.date_range("2021-01-01", periods=60)], names=["group", "date"]
+    )
+    return pd.DataFrame({"values": rng.random(len(index))}, index=index)
+
+
+@pytest.fixture
+def make_forecaster() -> Callable[[], LGBMForecaster]:
+    """Builds a new small forecaster on every call."""
+    return lambda: LGBMForecaster(lgb.LGBMRegressor(n_estimators=5), lag=3)
+
+
+@pytest.fixture
+def forecaster(make_forecaster: Callable[[], LGBMForecaster]) -> LGBMForecaster:
+    return make_forecaster()
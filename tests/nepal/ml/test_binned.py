@@ -0,0 +1,54 @@
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.binned import BinnedDataset
+from nepal.ml.forecaster import LGBMForecaster
+
+
+def test_fit_on_binned_subset(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    y: pd.DataFrame,
+    make_forecaster: Callable[[], LGBMForecaster],
+) -> None:
+    monkeypatch.setattr(BinnedDataset, "storage", tmp_path)
+
+    fh = ForecastingHorizon([1, 2])
+
+    with BinnedDataset.build(make_forecaster(), y) as binned:
+        with BinnedDataset.build(make_forecaster(), y) as concurrent:
+            assert binned.path != concurrent.path
+
+        # the bins of the full panel are the ones a regular fit would compute
+        full: LGBMForecaster = make_forecaster()
+        full.fit(y, dataset=binned)
+        pd.testing.assert_frame_equal(
+            full.forecast(fh=fh, y=y), make_forecaster().fit(y).forecast(fh=fh, y=y)
+        )
+
+        # a subset only approximates the bins of its own rows
+        y_train: pd.DataFrame = y[y.index.get_level_values("date") <= "2021-02-15"]
+        subset: LGBMForecaster = make_forecaster()
+        subset.fit(y_train, dataset=binned)
+        assert subset.booster.num_trees() == 5
+        assert np.allclose(
+            subset.forecast(fh=fh, y=y_train).to_numpy(),
+            make_forecaster().fit(y_train).forecast(fh=fh, y=y_train).to_numpy(),
+            atol=0.05,
+        )
+
+        # the booster of a binned fit keeps the round chosen by early stopping
+        stopped: LGBMForecaster = make_forecaster()
+        stopped.fit(y, dataset=binned, validation=10, stopping_rounds=1)
+        assert stopped.best_iteration is not None
+        assert stopped.forecast(fh=fh, y=y).notna().all(axis=None)
+
+        with pytest.raises(ValueError):
+            binned.positions(y.index)
+
+    assert not binned.path.exists()
@@ -0,0 +1,97 @@
+import datetime as dt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from nepal.ml.features.embedding import EmbeddingCache
+from nepal.ml.features.tensor import ExogenousTensor
+
+
+def test_exogenous_tensor_gather_matches_left_join() -> None:
+    exogenous = pd.DataFrame(
+        {
+            "group": [1, 1, 1, 2, 2],
+            "date": pd.to_datetime(
+                ["2021-01-01", "2021-01-02", "2021-01-04", "2021-01-02", "2021-01-03"]
+            ),
+            "x": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "z": [1, 0, 1, 0, 1],
+        }
+    ).set_index(["group", "date"])
+
+    df = pd.DataFrame(
+        {
+            "group": [1, 1, 1, 2, 2, 3],
+            "date": pd.date_range(dt.date(2021, 1, 1), dt.date(2021, 1, 3)).tolist() * 2,
+            "values": [*range(1, 7)],
+        }
+    ).set_index(["group", "date"])
+
+    result: pd.DataFrame = df.join(ExogenousTensor.from_frame(exogenous).gather(df.index))
+    expected: pd.DataFrame = df.join(exogenous.astype("float64"), how="left")
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_exogenous_tensor_truncate_hides_later_dates() -> None:
+    exogenous = pd.DataFrame(
+        {
+            "group": [1, 1, 1],
+            "date": pd.date_range(dt.date(2021, 1, 1), dt.date(2021, 1, 3)),
+            "x": [1.0, 2.0, 3.0],
+        }
+    ).set_index(["group", "date"])
+
+    tensor: ExogenousTensor = ExogenousTensor.from_frame(exogenous).truncate(
+        after=pd.Timestamp(2021, 1, 2)
+    )
+    result: pd.DataFrame = tensor.gather(exogenous.index)
+
+    expected: pd.Series = pd.Series([1.0, 2.0, np.nan], index=exogenous.index, name="x")
+
+    pd.testing.assert_series_equal(result["x"], expected)
+
+
+def test_exogenous_tensor_takes_rows_of_frame() -> None:
+    df = pd.DataFrame(
+        {
+            "group": [1, 1, 1, 2, 2],
+            "date": pd.to_datetime(
+                ["2021-01-01", "2021-01-02", "2021-01-04", "2021-01-02", "2021-01-03"]
+            ),
+            "values": [1.0, np.nan, 3.0, 4.0, 5.0],
+            "rate": np.array([0.5, np.nan, 1.5, 2.0, 2.5], dtype="float32"),
+        }
+    ).set_index(["group", "date"])
+
+    tensor: ExogenousTensor = ExogenousTensor.from_frame(df)
+    entity, date = tensor.offsets(df.index)
+    # the second row has no values, but is part of the frame
+    rows = np.array([4, 1, 2])
+
+    pd.testing.assert_frame_equal(
+        tensor.take(entity[rows], date[rows], dtypes=df.dtypes.to_dict()), df.iloc[rows]
+    )
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = EmbeddingCache(tmp_path, max_entries=2)
+    embeddings = {
+        dimension: pd.DataFrame(
+            np.full((2, dimension), dimension, dtype=np.float32),
+            index=pd.Index(["01001", "01003"], name="fips"),
+        ).rename(columns=lambda i: f"emb_{i}")
+        for dimension in [2, 4, 8]
+    }
+
+    cache.put({"dimension": 2, "seed": 42}, embeddings[2])
+    cache.put({"dimension": 4, "seed": 42}, embeddings[4])
+    # reading the first one makes the second the least recently used
+    pd.testing.assert_frame_equal(cache.get({"seed": 42, "dimension": 2}), embeddings[2])
+    cache.put({"dimension": 8, "seed": 42}, embeddings[8])
+
+    assert cache.get({"dimension": 4, "seed": 42}) is None
+    assert [entry["dimension"] for entry in cache.entries()["parameters"]] == [8, 2]
+    computed = cache.get_or_compute({"dimension": 2, "seed": 42}, lambda: embeddings[4])
+    pd.testing.assert_frame_equal(computed, embeddings[2])
@@ -0,0 +1,82 @@
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.features.tensor import ExogenousTensor
+from nepal.ml.forecaster import DesignMatrix, LGBMForecaster, _partitions
+from nepal.ml.transformers import RollingWindowSum
+
+
+def test_update_continues_boosting(y: pd.DataFrame, forecaster: LGBMForecaster) -> None:
+    dates: pd.Index = y.index.get_level_values("date")
+
+    forecaster.fit(y[dates <= "2021-02-15"])
+    forecaster.update(y[dates > "2021-02-01"], rounds=3, window=20)
+
+    assert forecaster.booster.num_trees() == 8
+    assert len(forecaster.drift) == 1
+    assert forecaster.drift[0].rows == 3 * 20
+    assert forecaster.drift[0].cutoff == pd.Timestamp("2021-03-01")
+
+
+def test_partitions_keep_entities_together() -> None:
+    codes = np.array([0, 0, 0, 1, 1, 2, 2, 2, 2, 3])
+
+    result = _partitions(codes, n=3)
+
+    assert result == [(0, 5), (5, 9), (9, 10)]
+
+
+def test_parallel_forecast_matches_serial(
+    rng: np.random.Generator, y: pd.DataFrame, forecaster: LGBMForecaster
+) -> None:
+    X = pd.DataFrame({"x": rng.random(len(y))}, index=y.index)
+
+    forecaster.fit(y, Xs=[X])
+
+    fh = ForecastingHorizon([1, 2, 3])
+    expected: pd.DataFrame = forecaster.forecast(fh=fh, y=y, Xs=[X])
+    pd.testing.assert_frame_equal(forecaster.forecast(fh=fh, y=y, Xs=[X], n_jobs=2), expected)
+    pd.testing.assert_frame_equal(forecaster.forecast(fh=fh, y=y, Xs=[X], n_jobs=-1), expected)
+    with pytest.raises(ValueError):
+        forecaster.forecast(fh=fh, y=y, Xs=[X], n_jobs=0)
+
+
+def test_precomputed_design_matrix_uses_no_future_data(
+    rng: np.random.Generator, y: pd.DataFrame
+) -> None:
+    X = ExogenousTensor.from_frame(pd.DataFrame({"x": rng.random(len(y))}, index=y.index))
+    dates: pd.Index = y.index.get_level_values("date")
+    cutoff = pd.Timestamp("2021-02-15")
+
+    forecaster = LGBMForecaster(
+        lgb.LGBMRegressor(n_estimators=5),
+        lag=3,
+        transformers=Pipeline([("sum", RollingWindowSum("values", target="sum", window=7))]),
+    )
+    design: DesignMatrix = forecaster.design_matrix(y, [X])
+
+    # scrambling every value after the cutoff must leave the earlier rows untouched
+    scrambled: pd.DataFrame = y.where((dates <= cutoff)[:, None], rng.random((len(y), 1)) * 100)
+    leaked: DesignMatrix = forecaster.design_matrix(scrambled, [X])
+
+    start = pd.Timestamp("2021-01-01")
+    result: DesignMatrix = design.window(before=start, after=cutoff)
+    expected: DesignMatrix = leaked.window(before=start, after=cutoff)
+    own: DesignMatrix = forecaster.design_matrix(y[dates <= cutoff], [X.truncate(after=cutoff)])
+
+    pd.testing.assert_frame_equal(result.X, expected.X)
+    pd.testing.assert_frame_equal(result.y, expected.y)
+    pd.testing.assert_frame_equal(result.X, own.X)
+    pd.testing.assert_frame_equal(result.y, own.y)
+
+
+def test_fit_stops_early_on_validation_tail(y: pd.DataFrame) -> None:
+    forecaster = LGBMForecaster(lgb.LGBMRegressor(n_estimators=200), lag=3)
+    forecaster.fit(y, validation=10, stopping_rounds=5)
+
+    assert forecaster.best_iteration is not None and forecaster.best_iteration < 200
+    assert forecaster.booster.num_trees() == forecaster.best_iteration
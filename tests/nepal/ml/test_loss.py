@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nepal.ml.loss import PanelLoss, mape, mase, panel_loss
+
+
+def test_panel_loss_breakdowns() -> None:
+    train = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-01", periods=3)], names=["group", "date"]
+    )
+    test = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-04", periods=2)], names=["group", "date"]
+    )
+    y_train = pd.DataFrame({"values": [1.0, 2.0, 3.0, 4.0, 4.0, 8.0]}, index=train)
+    y_true = pd.DataFrame({"values": [4.0, 5.0, 8.0, 8.0]}, index=test)
+    y_pred = pd.DataFrame({"values": [5.0, 5.0, 6.0, 4.0]}, index=test)
+
+    result: PanelLoss = panel_loss(y_true=y_true, y_pred=y_pred, y_train=y_train)
+
+    assert result.series["mae"].tolist() == pytest.approx([0.5, 3.0])
+    assert result.series["mase"].tolist() == pytest.approx([0.5, 1.5])
+    assert result.horizon["mae"].tolist() == pytest.approx([1.5, 2.0])
+    assert result.horizon["rmse"].tolist() == pytest.approx([np.sqrt(2.5), np.sqrt(8.0)])
+    assert list(result.horizon.index) == [1, 2]
+    assert result.overall["smape"] == pytest.approx(mape.function(y_true=y_true, y_pred=y_pred))
+
+
+def test_panel_loss_leaves_out_series_without_scale() -> None:
+    train = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-01", periods=3)], names=["group", "date"]
+    )
+    test = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-04", periods=2)], names=["group", "date"]
+    )
+    # "b" has no cases, so its naive forecast is perfect and its scale is zero
+    y_train = pd.DataFrame({"values": [1.0, 2.0, 3.0, 0.0, 0.0, 0.0]}, index=train)
+    y_true = pd.DataFrame({"values": [4.0, 5.0, 0.0, 1.0]}, index=test)
+    y_pred = pd.DataFrame({"values": [5.0, 5.0, 1.0, 0.0]}, index=test)
+
+    result: PanelLoss = panel_loss(y_true=y_true, y_pred=y_pred, y_train=y_train)
+
+    assert result.series["mase"].tolist() == pytest.approx([0.5, np.nan], nan_ok=True)
+    assert result.horizon["mase"].tolist() == pytest.approx([1.0, 0.0])
+    assert result.overall["mase"] == pytest.approx(0.5)
+    assert mase.function(y_true=y_true, y_pred=y_pred, y_train=y_train) == pytest.approx(0.5)
+
+
+def test_panel_loss_requires_every_prediction() -> None:
+    test = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-04", periods=2)], names=["group", "date"]
+    )
+    y_true = pd.DataFrame({"values": [4.0, 5.0, 0.0, 1.0]}, index=test)
+    y_pred = pd.DataFrame({"values": [5.0, 5.0, 1.0, 0.0]}, index=test)
+
+    with pytest.raises(ValueError):
+        panel_loss(y_true=y_true, y_pred=y_pred.iloc[:3])
+    with pytest.raises(ValueError):
+        panel_loss(y_true=y_true, y_pred=y_pred.assign(values=[5.0, np.nan, 1.0, 0.0]))
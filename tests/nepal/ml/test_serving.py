@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.serving import ExportedForecaster, export
+
+
+def test_exported_forecaster_matches_original(
+    tmp_path: Path, rng: np.random.Generator, y: pd.DataFrame, forecaster: LGBMForecaster
+) -> None:
+    X = pd.DataFrame({"x": rng.random(len(y))}, index=y.index)
+
+    forecaster.fit(y, Xs=[X])
+    exported = ExportedForecaster.from_export(export(forecaster, tmp_path))
+
+    fh = ForecastingHorizon([1, 2, 3])
+    expected: pd.DataFrame = forecaster.forecast(fh=fh, y=y, Xs=[X])
+    pd.testing.assert_frame_equal(exported.forecast(fh=fh, y=y, Xs=[X]), expected)
+    pd.testing.assert_frame_equal(exported.forecast(fh=fh, y=y, Xs=[X], n_jobs=2), expected)
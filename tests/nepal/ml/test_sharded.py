@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from sktime.forecasting.base import ForecastingHorizon
+
+from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.sharded import ShardedForecaster, census_region, state_of_county
+
+
+def test_census_region() -> None:
+    codes = pd.Index(["NY", "CA", "36061", "17031", "72001"])
+
+    result: pd.Index = census_region(codes)
+
+    assert result.tolist() == ["Northeast", "West", "Northeast", "Midwest", "Other"]
+
+
+def test_small_shards_fall_back_to_global_model(
+    rng: np.random.Generator, forecaster: LGBMForecaster
+) -> None:
+    index = pd.MultiIndex.from_product(
+        [["01001", "01003", "01005", "02013"], pd.date_range("2021-01-01", periods=60)],
+        names=["fips", "date"],
+    )
+    y = pd.DataFrame({"values": rng.random(len(index))}, index=index)
+
+    sharded = ShardedForecaster(
+        forecaster, partitioner=state_of_county, min_entities=2, threads=1
+    )
+    sharded.fit(y)
+
+    result: pd.DataFrame = sharded.forecast(fh=ForecastingHorizon([1, 2]), y=y)
+
+    assert set(sharded.shards) == {"01", ShardedForecaster.fallback}
+    assert result.index.get_level_values("fips").unique().tolist() == [
+        "01001",
+        "01003",
+        "01005",
+        "02013",
+    ]
+    assert len(result) == 8
+
+
+def test_shards_need_more_series_than_lags(forecaster: LGBMForecaster) -> None:
+    assert ShardedForecaster(forecaster).config["min_entities"] == forecaster.lag + 1
+    assert ShardedForecaster(forecaster, min_entities=2).config["min_entities"] == 2
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from sktime.forecasting.base import ForecastingHorizon
+from sktime.forecasting.model_selection import SlidingWindowSplitter
+
+from nepal.ml.splitter import Splitter
+
+
+def test_window_positions_match_date_windows() -> None:
+    index = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-01", periods=20)], names=["group", "date"]
+    )
+    y = pd.DataFrame({"values": np.arange(len(index), dtype="float64")}, index=index)
+    splitter = Splitter(
+        SlidingWindowSplitter(fh=ForecastingHorizon([1, 2]), window_length=8, step_length=5)
+    )
+
+    by_entity = list(splitter.window_positions(y))
+    by_date = list(splitter.window_positions(y.sort_index(level=["date", "group"])))
+
+    assert len(by_entity) == splitter.get_n_splits(y)
+    for (train, test), (idx_train, idx_test) in zip(by_entity, splitter.date_windows(y)):
+        pd.testing.assert_frame_equal(y.iloc[train], y.loc[pd.IndexSlice[:, idx_train], :])
+        pd.testing.assert_frame_equal(y.iloc[test], y.loc[pd.IndexSlice[:, idx_test], :])
+    assert all(isinstance(train, slice) and isinstance(test, slice) for train, test in by_date)
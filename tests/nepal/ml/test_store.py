@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+import pandas as pd
+import pytest
+from sktime.forecasting.base import ForecastingHorizon
+from sktime.forecasting.model_selection import ExpandingWindowSplitter
+
+from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.loss import mae
+from nepal.ml.splitter import Splitter
+from nepal.ml.store import BacktestStore, describe
+from nepal.ml.validate import Fold, backtest
+
+
+def test_backtest_reuses_stored_folds(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    y: pd.DataFrame,
+    forecaster: LGBMForecaster,
+) -> None:
+    monkeypatch.setattr(BacktestStore, "storage", tmp_path)
+
+    splitter = Splitter(
+        ExpandingWindowSplitter(
+            fh=ForecastingHorizon([1, 2, 3]), initial_window=30, step_length=10
+        )
+    )
+    first: Sequence[Fold] = backtest(
+        forecaster, splitter=splitter, y=y, loss=mae.function, threads=1, store=True
+    )
+
+    def refit(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("Stored folds should not be fitted again")
+
+    monkeypatch.setattr(LGBMForecaster, "_fit", refit)
+    second: Sequence[Fold] = backtest(
+        forecaster, splitter=splitter, y=y, loss=mae.function, threads=1, store=True
+    )
+    store = BacktestStore.of(forecaster, splitter=splitter, y=y)
+
+    assert store.cutoffs() == [fold.cutoff for fold in first]
+    assert [fold.score for fold in second] == pytest.approx([fold.score for fold in first])
+    assert store.scores(mae.function) == pytest.approx([fold.score for fold in first])
+    assert len(store.frame()) == len(first) * 3 * 3
+
+
+def test_backtest_keeps_other_options_apart(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, forecaster: LGBMForecaster
+) -> None:
+    monkeypatch.setattr(BacktestStore, "storage", tmp_path)
+
+    index = pd.MultiIndex.from_product(
+        [["a", "b"], pd.date_range("2021-01-01", periods=40)], names=["group", "date"]
+    )
+    y = pd.DataFrame({"values": np.arange(len(index), dtype=float)}, index=index)
+    splitter = Splitter(
+        ExpandingWindowSplitter(fh=ForecastingHorizon([1]), initial_window=30, step_length=5)
+    )
+    backtest(forecaster, splitter=splitter, y=y, loss=mae.function, threads=1, store=True)
+
+    plain = BacktestStore.of(forecaster, splitter=splitter, y=y)
+    validated = BacktestStore.of(forecaster, splitter=splitter, y=y, validation=5)
+    assert plain.key != validated.key
+    assert len(plain.cutoffs()) == 2
+    assert validated.cutoffs() == []
+
+
+def test_describe_rejects_unknown_settings() -> None:
+    with pytest.raises(TypeError):
+        describe(object())
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import lightgbm as lgb
+import optuna
+import pandas as pd
+import pytest
+from sktime.forecasting.base import ForecastingHorizon
+from sktime.forecasting.model_selection import ExpandingWindowSplitter
+
+from nepal.ml.forecaster import BaseForecaster, LGBMForecaster
+from nepal.ml.splitter import Splitter
+from nepal.ml.tune import Tuner
+
+
+def search(trial: optuna.Trial) -> BaseForecaster:
+    return LGBMForecaster(
+        lgb.LGBMRegressor(n_estimators=trial.suggest_int("n_estimators", 2, 10)),
+        lag=trial.suggest_int("lag", 1, 5),
+    )
+
+
+def test_tuner_resumes_stored_study(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, y: pd.DataFrame
+) -> None:
+    monkeypatch.setattr(Tuner, "storage", tmp_path)
+
+    splitter = Splitter(
+        ExpandingWindowSplitter(
+            fh=ForecastingHorizon([1, 2, 3]), initial_window=30, step_length=10
+        )
+    )
+
+    tuner = Tuner(search, splitter=splitter, name="test")
+    tuner.tune(y, n_trials=2)
+    study: optuna.Study = tuner.tune(y, n_trials=2, trial_jobs=2)
+
+    assert tuner.path == tmp_path / "test.db" and tuner.path.is_file()
+    assert len(study.trials) == 4
+    assert all(
+        len(trial.intermediate_values) <= splitter.get_n_splits(y) for trial in study.trials
+    )
@@ -0,0 +1,41 @@
+from typing import List, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pytest
+from sktime.forecasting.base import ForecastingHorizon
+from sktime.forecasting.model_selection import ExpandingWindowSplitter
+
+from nepal.ml.forecaster import LGBMForecaster
+from nepal.ml.loss import mae
+from nepal.ml.splitter import Splitter
+from nepal.ml.validate import cross_validate
+
+
+def test_cross_validate_keeps_rows_with_missing_values(
+    rng: np.random.Generator, y: pd.DataFrame, forecaster: LGBMForecaster
+) -> None:
+    # before the first cutoff, days without a value are kept as rows (which shifts the
+    # lags of later rows) and some days are missing altogether
+    early: npt.NDArray[np.intp] = np.flatnonzero(
+        y.index.get_level_values("date") < "2021-02-05"
+    )
+    y.iloc[rng.choice(early, size=20, replace=False), 0] = np.nan
+    y = y.drop(index=y.index[[3, 4, 65, 130]])
+
+    splitter = Splitter(
+        ExpandingWindowSplitter(fh=ForecastingHorizon([1, 2]), initial_window=40, step_length=5)
+    )
+
+    expected: List[float] = []
+    for df_train, df_test in splitter.train_test_splits(y):
+        forecaster.fit(df_train)
+        df_pred = forecaster.forecast(fh=splitter.fh, y=df_train)
+        expected.append(mae.function(y_true=df_test, y_pred=df_pred, y_train=df_train))
+
+    scores: Sequence[float] = cross_validate(
+        forecaster, splitter=splitter, y=y, loss=mae.function, threads=1
+    )
+
+    assert list(scores) == pytest.approx(expected)